@@ -0,0 +1,58 @@
+"""
+ADB 命令延迟基准：对比 AdbService 通过 socket 协议 (本地 FakeAdbServer) 与每次启动 adb 子进程 (fake_adb.py) 的单条命令延迟。
+
+用法: python benchmarks/bench_adb_client.py [次数]
+"""
+import os
+import statistics
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+os.environ['ADB'] = os.path.join(BENCH_DIR, 'fake_adb.py')
+
+from core.adb_client import AdbClient  # noqa: E402
+from core.adb_service import AdbService  # noqa: E402
+from fake_adb_server import FakeAdbServer  # noqa: E402
+
+COMMANDS = [
+    ['adb', 'devices'],
+    ['adb', '-s', 'emulator-5554', 'shell', 'ip', 'route'],
+    ['adb', 'connect', '192.168.1.23:5555'],
+]
+
+
+def measure(worker, count):
+    samples = []
+    for i in range(count):
+        cmd = COMMANDS[i % len(COMMANDS)]
+        started = time.perf_counter()
+        worker._run_adb_command_safe(cmd)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def report(name, samples):
+    samples.sort()
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{name:<12} 中位数 {statistics.median(samples):7.2f} ms   p95 {p95:7.2f} ms   共 {len(samples)} 次")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    def ip_route(serial, command):
+        return "192.168.1.0/24 dev wlan0 proto kernel scope link src 192.168.1.23\n"
+
+    with FakeAdbServer(shell_handler=ip_route) as server:
+        worker = AdbService(AdbClient(port=server.port))
+        report("socket 协议", measure(worker, count))
+
+    # 指向一个没有服务监听的端口，使 AdbService 回退到子进程路径
+    worker = AdbService(AdbClient(port=server.port))
+    report("adb 子进程", measure(worker, max(10, count // 10)))
+
+
+if __name__ == '__main__':
+    main()
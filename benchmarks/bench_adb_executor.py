@@ -0,0 +1,62 @@
+"""
+共享 ADB 执行器基准：模拟用户连续点击"刷新"与多台设备同时同步应用列表，对比合并请求前后
+实际发出的 adb 调用次数与全部完成耗时，并检查同一设备的操作是否严格串行。
+
+用法: python benchmarks/bench_adb_executor.py [刷新点击次数] [设备数量]
+"""
+import os
+import sys
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from core.adb_client import AdbClient  # noqa: E402
+from core.adb_executor import AdbExecutor, PRIORITY_HIGH, PRIORITY_LOW  # noqa: E402
+from core.adb_service import AdbService  # noqa: E402
+from fake_adb_server import FakeAdbServer  # noqa: E402
+
+
+def run(service, clicks, serials, coalesce):
+    executor = AdbExecutor(max_workers=4)
+    lock = threading.Lock()
+    busy, overlaps = set(), [0]
+
+    def per_device(serial):
+        with lock:
+            if serial in busy: overlaps[0] += 1
+            busy.add(serial)
+        try:
+            return service._run_adb_command_safe(['adb', '-s', serial, 'shell', 'pm', 'list', 'packages', '-3'])
+        finally:
+            with lock:
+                busy.discard(serial)
+
+    started = time.perf_counter()
+    tasks = [executor.submit(per_device, serial, device=serial, priority=PRIORITY_LOW)
+             for serial in serials for _ in range(3)]
+    for _ in range(clicks):
+        tasks.append(executor.submit(service.refresh_devices, priority=PRIORITY_HIGH,
+                                     key='refresh' if coalesce else None))
+    for task in tasks:
+        task.result(60)
+    elapsed = time.perf_counter() - started
+    executor.shutdown()
+    return elapsed, executor.stats, overlaps[0]
+
+
+def main():
+    clicks = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 6
+    serials = [f"emulator-{5554 + 2 * i}" for i in range(count)]
+    with FakeAdbServer(devices={serial: 'device' for serial in serials}, latency=0.02) as server:
+        service = AdbService(AdbClient(port=server.port))
+        for coalesce in (False, True):
+            elapsed, stats, overlaps = run(service, clicks, serials, coalesce)
+            print(f"{'合并刷新' if coalesce else '不合并':<6} 耗时 {elapsed * 1000:7.1f} ms   "
+                  f"实际执行 {stats['completed']:3d}   合并 {stats['coalesced']:3d}   同设备并发 {overlaps}")
+
+
+if __name__ == '__main__':
+    main()
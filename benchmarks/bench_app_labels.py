@@ -0,0 +1,59 @@
+"""
+应用名解析基准：在模拟每次 adb 调用延迟的 fake_adb.py 上，对比“每个应用一次 adb shell”与“一次 shell 会话解析全部”。
+
+用法: python benchmarks/bench_app_labels.py [应用数量] [每次调用延迟(秒)]
+"""
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+os.environ['ADB'] = os.path.join(BENCH_DIR, 'fake_adb.py')
+
+from core.adb_client import AdbClient  # noqa: E402
+from core.adb_service import AdbService  # noqa: E402
+
+
+def legacy_list_packages(worker):
+    """旧实现：先列出包，再为每个包单独执行一次 aapt"""
+    output = worker._run_adb_command_safe(['adb', 'shell', 'pm', 'list', 'packages', '-f', '-3'])
+    app_list = []
+    for line in [line.replace('package:', '').strip() for line in output.split('\n') if line]:
+        path, package = line.rsplit('=', 1)
+        try:
+            label_output = worker._run_adb_command_safe(
+                ['adb', 'shell', f"aapt d badging '{path}' | grep application-label:"], timeout=3)
+            app_list.append({'name': label_output.split("'")[1], 'package': package})
+        except Exception:
+            app_list.append({'name': package, 'package': package})
+    return app_list
+
+
+def main():
+    os.environ['FAKE_ADB_PACKAGES'] = sys.argv[1] if len(sys.argv) > 1 else '100'
+    os.environ['FAKE_ADB_LATENCY'] = sys.argv[2] if len(sys.argv) > 2 else '0.02'
+
+    # 指向没有服务监听的端口，强制走 adb 子进程路径
+    worker = AdbService(AdbClient(port=1))
+    progress = []
+    result = []
+    worker.command_finished.connect(progress.append)
+    worker.packages_listed.connect(result.extend)
+
+    started = time.perf_counter()
+    legacy = legacy_list_packages(worker)
+    legacy_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    worker.list_packages_with_names()
+    stream_time = time.perf_counter() - started
+
+    assert [app['name'] for app in legacy] == [app['name'] for app in result]
+    print(f"应用数量 {len(result)}，每次调用延迟 {float(os.environ['FAKE_ADB_LATENCY']) * 1000:.0f} ms")
+    print(f"逐个查询  {legacy_time:7.2f} s")
+    print(f"单次会话  {stream_time:7.2f} s   (进度消息 {len(progress)} 条)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+应用搜索延迟基准：10k 个应用时，对比旧的 QCompleter(MatchContains) 线性筛选与 AppSearchModel 索引查询的每次按键延迟。
+
+用法: python benchmarks/bench_app_search.py [应用数量]
+"""
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtWidgets import QApplication, QCompleter  # noqa: E402
+from PyQt6.QtCore import Qt, QStringListModel  # noqa: E402
+from features.app_search_model import AppSearchModel  # noqa: E402
+
+WORDS = ['photo', 'music', 'camera', 'wallet', 'chat', 'video', 'notes', 'maps', 'weather', 'reader',
+         'game', 'clock', 'mail', 'browser', 'fitness', 'shop', 'bank', 'news', 'radio', 'scanner']
+
+
+def synthetic_apps(count):
+    rng = random.Random(42)
+    apps = []
+    for i in range(count):
+        a, b = rng.sample(WORDS, 2)
+        apps.append({'name': f"{a.title()} {b.title()} {i}", 'package': f"com.{rng.choice(WORDS)}{i % 97}.{a}.{b}{i}"})
+    return apps
+
+
+def typed_prefixes(queries):
+    """模拟逐字输入：每个查询的每个前缀都算一次按键"""
+    return [query[:n] for query in queries for n in range(1, len(query) + 1)]
+
+
+def report(name, samples):
+    samples.sort()
+    print(f"{name:<22} 中位数 {statistics.median(samples):7.3f} ms   p95 {samples[int(len(samples) * 0.95)]:7.3f} ms"
+          f"   最大 {samples[-1]:7.3f} ms")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    QApplication(sys.argv)
+    apps = synthetic_apps(count)
+    keystrokes = typed_prefixes(['camera', 'wallet 12', 'com.music', 'weathr', 'scan'])
+
+    # 旧方案：QCompleter 在字符串模型上做 MatchContains 线性筛选
+    completer = QCompleter()
+    completer.setModel(QStringListModel([f"{app['name']} ({app['package']})" for app in apps]))
+    completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+    completer.setFilterMode(Qt.MatchFlag.MatchContains)
+    samples = []
+    for prefix in keystrokes:
+        started = time.perf_counter()
+        completer.setCompletionPrefix(prefix)
+        completer.completionCount()
+        samples.append((time.perf_counter() - started) * 1000)
+    report("QCompleter 线性筛选", samples)
+
+    model = AppSearchModel()
+    started = time.perf_counter()
+    model.set_apps(apps)
+    print(f"索引构建 ({count} 个应用)  {(time.perf_counter() - started) * 1000:7.1f} ms")
+    samples = []
+    for prefix in keystrokes:
+        started = time.perf_counter()
+        model.set_query(prefix)
+        model.rowCount()
+        samples.append((time.perf_counter() - started) * 1000)
+    report("AppSearchModel 索引", samples)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""
+编码器基准测试模式的端到端检查：scrcpy 替身按 FAKE_SCRCPY_FPS 输出脚本化的帧率，
+确认每个组合都被试跑、排名与脚本一致、失败的组合排在最后，并给出总耗时。
+
+用法: python benchmarks/bench_encoder_trials.py [每个组合的秒数]
+"""
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+os.environ['SCRCPY'] = os.path.join(BENCH_DIR, 'fake_scrcpy.py')
+os.environ.setdefault('FAKE_SCRCPY_INTERVAL', '0.1')
+# 硬件 h265 最快；软件编码器明显较慢，av1 在这台“设备”上无法启动
+os.environ['FAKE_SCRCPY_FPS'] = ("c2.qti.avc.encoder=55:57:56,c2.android.avc.encoder=24:22:25,"
+                                 "c2.qti.hevc.encoder=60:59:60,c2.android.hevc.encoder=15:16:14,av1=fail")
+
+from fake_adb_server import FakeAdbServer  # noqa: E402
+from fake_scrcpy import ENCODERS  # noqa: E402
+from core.adb_client import AdbClient  # noqa: E402
+from core.adb_service import AdbService  # noqa: E402
+from core.device_media import parse_encoders  # noqa: E402
+from core.encoder_bench import benchmark_candidates, candidate_label  # noqa: E402
+from core.process_registry import registry  # noqa: E402
+
+EXPECTED = ['h265/c2.qti.hevc.encoder', 'h264/c2.qti.avc.encoder', 'h264/c2.android.avc.encoder',
+            'h265/c2.android.hevc.encoder', 'av1/自动']
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 1
+    candidates = benchmark_candidates(parse_encoders(ENCODERS))
+    with FakeAdbServer(shell_handler=lambda serial, command: 'fake/phone:14/AP1A/1:user/release-keys\n') as server:
+        service = AdbService(AdbClient(port=server.port))
+        service.command_finished.connect(lambda message: print(f"  {message}"))
+        started = time.perf_counter()
+        fingerprint, ranking = service.benchmark_encoders('emulator-5554', candidates, 1080, seconds)
+        elapsed = time.perf_counter() - started
+
+    for index, result in enumerate(ranking, 1):
+        outcome = f"{result['fps']:g} fps (最低 {result['min_fps']}, {result['samples']} 个采样)" \
+            if result['error'] is None else f"失败: {result['error']}"
+        print(f"{index}. {candidate_label(result):<32} {outcome}")
+    order = [candidate_label(result) for result in ranking]
+    print(f"{len(candidates)} 个组合，耗时 {elapsed:.1f} s，排名{'与脚本一致' if order == EXPECTED else '与脚本不一致!'}，"
+          f"遗留进程 {registry.counters()['running']}")
+    return 0 if order == EXPECTED else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
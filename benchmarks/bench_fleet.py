@@ -0,0 +1,51 @@
+"""
+批量启动基准：用 fake_scrcpy 模拟 N 台设备，在不同并发上限/启动间隔下调用 SessionManager.start_fleet，
+报告全部启动耗时 (time-to-all-started) 与成功/失败数量。
+
+用法: python benchmarks/bench_fleet.py [设备数量] [单台启动耗时(秒)]
+"""
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+os.environ['SCRCPY'] = os.path.join(BENCH_DIR, 'fake_scrcpy.py')
+os.environ.setdefault('FAKE_SCRCPY_INTERVAL', '0.5')
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtCore import QCoreApplication, QEventLoop  # noqa: E402
+from core.session_manager import SessionManager  # noqa: E402
+
+
+def run(app, serials, concurrency, stagger):
+    manager = SessionManager()
+    finished = []
+    manager.fleet_finished.connect(finished.append)
+    manager.start_fleet(serials, [], concurrency=concurrency, stagger=stagger)
+    deadline = time.monotonic() + 120
+    while not finished and time.monotonic() < deadline:
+        app.processEvents(QEventLoop.ProcessEventsFlag.AllEvents, 50)
+        time.sleep(0.005)
+    manager.shutdown()
+    if not finished:
+        print(f"并发 {concurrency:>2}  间隔 {stagger:4.1f} 秒   超时")
+        return
+    metrics = finished[0]
+    all_started = metrics['time_to_all_started']
+    print(f"并发 {concurrency:>2}  间隔 {stagger:4.1f} 秒   成功 {metrics['started']:>3}  失败 {metrics['failed']:>2}"
+          f"   全部启动 {all_started if all_started is not None else float('nan'):6.2f} 秒")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    os.environ['FAKE_SCRCPY_STARTUP'] = sys.argv[2] if len(sys.argv) > 2 else '0.5'
+    serials = [f"emulator-{5554 + i * 2}" for i in range(count)]
+    os.environ['FAKE_SCRCPY_FAIL'] = serials[-1]
+    app = QCoreApplication(sys.argv)
+    for concurrency, stagger in ((1, 0.0), (4, 0.0), (4, 0.2), (count, 0.0)):
+        run(app, serials, concurrency, stagger)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+"""
+导入耗时基准：在全新的解释器中分别导入各模块，报告耗时 (取多次最小值) 以及是否连带加载了 PyQt6。
+无界面可用的核心模块 (QT_FREE) 必须不依赖 Qt 且导入耗时不超过预算 (默认 50 ms)，否则以断言失败结束。
+
+用法: python benchmarks/bench_import.py [重复次数] [预算毫秒]
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+QT_FREE = ['core.session_engine', 'core.adb_service', 'core.device_tracker', 'core.headless']
+MODULES = QT_FREE + ['core.session_manager', 'core.command_runner']
+PROBE = "import sys, time; t = time.perf_counter(); import {0}; print(time.perf_counter() - t, 'PyQt6' in sys.modules)"
+
+
+def measure(module):
+    output = subprocess.run([sys.executable, '-c', PROBE.format(module)], cwd=ROOT,
+                            capture_output=True, text=True, check=True).stdout.split()
+    return float(output[0]) * 1000, output[1] == 'True'
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    budget = float(sys.argv[2]) if len(sys.argv) > 2 else 50.0
+    over = []
+    for module in MODULES:
+        samples = [measure(module) for _ in range(repeat)]
+        best, uses_qt = min(ms for ms, _ in samples), samples[0][1]
+        print(f"{module:<22} {best:7.1f} ms   {'加载 PyQt6' if uses_qt else '不依赖 Qt'}")
+        if module in QT_FREE and (uses_qt or best > budget):
+            over.append(module)
+    assert not over, f"超出导入预算 {budget:g} ms 或加载了 PyQt6: {', '.join(over)}"
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+链路测速基准：用 ADB 服务替身模拟几种典型链路 (限速 + 每个请求的延迟)，
+对比实测的延迟 / 吞吐量与模拟值，并列出据此推荐的视频参数；最后用 adb 命令行替身验证子进程回退路径。
+
+用法: python benchmarks/bench_link_probe.py
+"""
+import os
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from fake_adb_server import FakeAdbServer  # noqa: E402
+from core.adb_client import AdbClient  # noqa: E402
+from core.adb_service import AdbService  # noqa: E402
+from core.link_probe import recommend_video_settings  # noqa: E402
+
+# (名称, 带宽 字节/秒, 每个请求的延迟 秒)；一次 exec 往返包含 transport 与 exec 两个请求
+LINKS = [
+    ("USB 2.0", 35_000_000, 0.0005),
+    ("5 GHz Wi-Fi", 4_000_000, 0.003),
+    ("2.4 GHz Wi-Fi", 1_200_000, 0.012),
+    ("拥挤的 2.4 GHz", 300_000, 0.030),
+]
+DISPLAY = (1080, 2400)
+
+
+def report(name, simulated_bps, measurement):
+    settings = recommend_video_settings(measurement, DISPLAY)
+    error = (measurement['throughput_bps'] / simulated_bps - 1) * 100 if simulated_bps else 0
+    print(f"{name:<16} 延迟 {measurement['rtt_ms']:6.1f} ms   吞吐 {measurement['throughput_bps'] / 1e6:7.2f} Mbit/s "
+          f"(误差 {error:+5.1f}%, {measurement['seconds']:.2f} s)   -> -b {settings['video_bit_rate']} "
+          f"-m {settings['max_size'] or '不限'} --max-fps {settings['max_fps']}")
+
+
+def main():
+    for name, bandwidth, latency in LINKS:
+        with FakeAdbServer({'192.168.1.23:5555': 'device'}, latency=latency, bandwidth=bandwidth) as server:
+            service = AdbService(AdbClient(port=server.port))
+            report(name, bandwidth * 8, service.probe_link('192.168.1.23:5555'))
+
+    # 没有 ADB 服务时回退到 adb exec-out 子进程
+    os.environ['FAKE_ADB_BANDWIDTH'] = str(4_000_000)
+    import core.adb_service
+    core.adb_service.ADB_EXECUTABLE = os.path.join(BENCH_DIR, 'fake_adb.py')
+    report("子进程 (5 GHz)", 4_000_000 * 8, AdbService(AdbClient(port=1)).probe_link('192.168.1.23:5555'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+日志归档的开销：N 个会话各提交若干批 scrcpy 风格的日志行，测量提交方 (监管线程) 每批的耗时、
+后台线程的写入吞吐与压缩率，以及突发输出超过队列上限时丢弃的行数 (提交方始终不被阻塞)。
+
+用法: python benchmarks/bench_log_archive.py [会话数] [每个会话行数] [压缩格式 auto/gzip/zstd]
+"""
+import os
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from core.log_archive import LogArchive  # noqa: E402
+
+BATCH = 200
+
+
+def make_batches(session_id, lines):
+    return [[f"INFO: [{session_id}] frame {n + i} decoded in {(n + i) % 17} ms, queue {(n + i) % 5}"
+             for i in range(BATCH)] for n in range(0, lines, BATCH)]
+
+
+def run(directory, sessions, lines, compression, max_queued_lines):
+    batches = {f"Session-{i}_dev{i}": make_batches(f"dev{i}", lines) for i in range(sessions)}
+    archive = LogArchive(directory, compression=compression, max_queued_lines=max_queued_lines)
+    worst = 0.0
+    started = time.perf_counter()
+    for n in range(lines // BATCH):
+        for session_id, session_batches in batches.items():
+            t = time.perf_counter()
+            archive.submit(session_id, session_batches[n])
+            worst = max(worst, time.perf_counter() - t)
+    submitted = time.perf_counter() - started
+    archive.close(timeout=600)
+    total = time.perf_counter() - started
+    return archive, submitted, worst, total
+
+
+def main():
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    lines = int(sys.argv[2]) if len(sys.argv) > 2 else 50_000
+    compression = sys.argv[3] if len(sys.argv) > 3 else 'auto'
+    total_lines = sessions * lines
+    for title, limit in (("队列足够大", total_lines), ("默认队列上限", 100_000)):
+        with tempfile.TemporaryDirectory() as directory:
+            archive, submitted, worst, total = run(directory, sessions, lines, compression, limit)
+            stats = archive.stats()
+            # 每行另加约 40 字节的时间戳与会话名
+            raw = sum(len(line.encode()) + 40 for line in make_batches('x', BATCH)[0]) / BATCH * stats['written']
+            print(f"{title} ({archive.compression}, {sessions} 个会话 x {lines} 行):")
+            print(f"  提交 {submitted * 1000:.1f} ms (每批 {submitted / (total_lines / BATCH) * 1e6:.1f} us，"
+                  f"最慢 {worst * 1e6:.0f} us)")
+            print(f"  写完 {total:.2f} s ({stats['written'] / total / 1e6:.2f} M 行/秒)，"
+                  f"丢弃 {stats['dropped']} 行，{len(os.listdir(directory))} 个文件，"
+                  f"压缩后 {stats['bytes'] / 1e6:.1f} MB (约 {raw / max(1, stats['bytes']):.0f}:1)")
+
+
+if __name__ == '__main__':
+    main()
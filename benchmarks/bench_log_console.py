@@ -0,0 +1,77 @@
+"""
+日志控制台内存基准：向 LogConsole 写入大量合成日志行，记录耗时与进程常驻内存 (RSS) 增长。
+加 --baseline 参数时同时测量旧的 QTextEdit.append 方案 (默认只写入 10 万行，否则耗时过长)。
+
+用法: python benchmarks/bench_log_console.py [行数] [--baseline]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtWidgets import QApplication, QTextEdit  # noqa: E402
+from features.log_console import LogConsole  # noqa: E402
+
+BATCH = 1000
+
+
+def rss_mb():
+    """读取当前进程 RSS (仅 Linux)，其他平台返回 0"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def synthetic_lines(total):
+    for start in range(0, total, BATCH):
+        yield [f"[Session-{i % 20}] INFO: 60 fps, texture 1080x2400, frame #{i}" for i in
+               range(start, min(total, start + BATCH))]
+
+
+def bench_console(app, total):
+    console = LogConsole(max_lines=20000)
+    console.show()
+    before = rss_mb()
+    started = time.perf_counter()
+    for batch in synthetic_lines(total):
+        console.append_lines(batch)
+        console.flush()
+        app.processEvents()
+    elapsed = time.perf_counter() - started
+    print(f"LogConsole  {total:>9} 行  {elapsed:7.2f} s  RSS +{rss_mb() - before:7.1f} MB"
+          f"  (保留 {console.log_model.rowCount()} 行)")
+
+
+def bench_text_edit(app, total):
+    edit = QTextEdit()
+    edit.setReadOnly(True)
+    edit.show()
+    before = rss_mb()
+    started = time.perf_counter()
+    for batch in synthetic_lines(total):
+        for line in batch:
+            edit.append(line)
+            edit.verticalScrollBar().setValue(edit.verticalScrollBar().maximum())
+        app.processEvents()
+    elapsed = time.perf_counter() - started
+    print(f"QTextEdit   {total:>9} 行  {elapsed:7.2f} s  RSS +{rss_mb() - before:7.1f} MB")
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    total = int(args[0]) if args else 1_000_000
+    app = QApplication(sys.argv)
+    bench_console(app, total)
+    if '--baseline' in sys.argv:
+        bench_text_edit(app, min(total, 100_000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+日志读取微基准：对比旧的逐字节读取与新的分块读取 (os.read + LineSplitter，与 ProcessSupervisor 相同) 的吞吐量 (行/秒)。
+
+用法: python benchmarks/bench_log_reader.py [行数]
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.log_pipeline import LineSplitter  # noqa: E402
+
+LINE = b"INFO: Renderer: opengl, 60 fps, texture: 1080x2400 ----------------------------------\n"
+
+
+def _feed(write_fd, count):
+    with os.fdopen(write_fd, 'wb') as f:
+        block = LINE * 1000
+        for _ in range(count // 1000):
+            f.write(block)
+        f.write(LINE * (count % 1000))
+
+
+def legacy_read(pipe, on_line):
+    """旧实现：pipe.read(1) 逐字节读取，每行回调一次"""
+    decoder = sys.stdout.encoding or 'utf-8'
+    line_buffer = bytearray()
+    while True:
+        byte = pipe.read(1)
+        if not byte:
+            if line_buffer: on_line(line_buffer.decode(decoder, errors='replace'))
+            break
+        line_buffer.append(byte[0])
+        if byte == b'\n':
+            on_line(line_buffer.decode(decoder, errors='replace'))
+            line_buffer.clear()
+    pipe.close()
+
+
+def run(name, reader_fn, count):
+    read_fd, write_fd = os.pipe()
+    writer = threading.Thread(target=_feed, args=(write_fd, count))
+    writer.start()
+    pipe = os.fdopen(read_fd, 'rb', buffering=0)
+    started = time.perf_counter()
+    received = reader_fn(pipe)
+    elapsed = time.perf_counter() - started
+    writer.join()
+    print(f"{name:<10} {received():>9} 行  {elapsed:7.3f} s  {received() / elapsed:>12,.0f} 行/秒")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    def legacy(pipe):
+        total = [0]
+        legacy_read(pipe, lambda line: total.__setitem__(0, total[0] + 1))
+        return lambda: total[0]
+
+    def chunked(pipe):
+        total = [0]
+        splitter = LineSplitter()
+        fd = pipe.fileno()
+        while True:
+            chunk = os.read(fd, 64 * 1024)
+            if not chunk:
+                break
+            total[0] += len(splitter.feed(chunk))
+        total[0] += len(splitter.flush())
+        pipe.close()
+        return lambda: total[0]
+
+    run("逐字节", legacy, count)
+    run("分块", chunked, count)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+按会话分开的日志视图：多个会话各写满缓冲区后，测量切换到单个会话 (同步复制)、合并全部会话 (后台按序号合并)
+与带级别/正则条件筛选 (后台逐行检查) 各自的耗时，以及写入 SessionLogStore 的吞吐。
+
+用法: python benchmarks/bench_log_views.py [会话数] [每个会话行数] [视图行数]
+"""
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from core.session_logs import LEVEL_WARN, LogQuery, SessionLogStore, run_query  # noqa: E402
+
+LEVELS = ('INFO', 'DEBUG', 'INFO', 'WARN', 'INFO', 'VERBOSE', 'INFO', 'ERROR')
+
+
+def fill(sessions, lines_per_session, batch=50):
+    store = SessionLogStore(capacity=lines_per_session)
+    session_ids = [f"Session-{i}_dev{i}" for i in range(sessions)]
+    started = time.perf_counter()
+    for n in range(0, lines_per_session, batch):
+        for session_id in session_ids:
+            store.append(session_id, [f"{LEVELS[(n + i) % len(LEVELS)]}: frame {n + i} decoded in {(n + i) % 17} ms"
+                                      for i in range(batch)])
+    return store, session_ids, time.perf_counter() - started
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def main():
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    lines_per_session = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    limit = int(sys.argv[3]) if len(sys.argv) > 3 else 20000
+    store, session_ids, elapsed = fill(sessions, lines_per_session)
+    total = sessions * lines_per_session
+    print(f"{sessions} 个会话 x {lines_per_session} 行，视图保留 {limit} 行")
+    print(f"  写入 {total} 行 (含生成): {elapsed:.2f} s  ({total / elapsed / 1e6:.2f} M 行/秒)")
+
+    lines, elapsed = timed(store.lines, session_ids[sessions // 2], limit)
+    print(f"  切换到单个会话 (GUI 线程同步): {elapsed * 1000:.2f} ms, {len(lines)} 行")
+
+    for title, query, last in (("合并全部会话", LogQuery(), limit),
+                               ("全部会话 警告及以上", LogQuery(min_level=LEVEL_WARN), None),
+                               ("全部会话 正则 'frame \\d+7 '", LogQuery(pattern=r'frame \d+7 '), None),
+                               ("单个会话 正则 (稀少匹配)", LogQuery(session_ids[0], pattern=r'frame 1234\d '), None)):
+        snapshots, snap_time = timed(store.snapshot, query.session_id, last)
+        results, query_time = timed(run_query, snapshots, query, limit)
+        print(f"  {title}: 快照 (GUI 线程) {snap_time * 1000:.2f} ms + 后台筛选 {query_time * 1000:.2f} ms, "
+              f"{len(results)} 行")
+
+
+if __name__ == '__main__':
+    main()
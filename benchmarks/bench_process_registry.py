@@ -0,0 +1,94 @@
+"""
+子进程泄漏压力测试：让 AdbService 对一个"永远不返回"的 adb 替身执行 N 条命令 (默认 1000 条)，
+每条都会超时。替身会再派生一个孙进程，用来确认超时后整棵进程树都被结束。
+结束后统计系统中仍带有本次标记的进程数，以及 ProcessRegistry 的泄漏计数，两者都应为 0。
+
+用法: python benchmarks/bench_process_registry.py [命令数量] [并发数] [超时秒数]
+(仅支持 POSIX：替身为 sh 脚本，比每次启动 Python 快得多)
+"""
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+MARKER = f"rix-stub-{uuid.uuid4().hex[:8]}-"
+# 替身与孙进程都运行标记目录中的 sleep 副本，便于在 /proc 中按命令行查找遗留进程
+STUB = """#!/bin/sh
+dir=$(dirname "$0")
+"$dir/sleep" 600 &
+exec "$dir/sleep" 600
+"""
+
+
+def leftover_processes() -> int:
+    count = 0
+    for pid in os.listdir('/proc'):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f'/proc/{pid}/cmdline', 'rb') as f:
+                cmdline = f.read()
+            with open(f'/proc/{pid}/stat') as f:
+                state = f.read().rsplit(')', 1)[1].split()[0]
+        except OSError:
+            continue
+        if MARKER.encode() in cmdline and state != 'Z':
+            count += 1
+    return count
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    timeout = float(sys.argv[3]) if len(sys.argv) > 3 else 0.05
+
+    stub_dir = tempfile.mkdtemp(prefix=MARKER)
+    stub = os.path.join(stub_dir, 'adb')
+    shutil.copy(shutil.which('sleep'), os.path.join(stub_dir, 'sleep'))
+    with open(stub, 'w') as f:
+        f.write(STUB)
+    os.chmod(stub, os.stat(stub).st_mode | stat.S_IEXEC)
+    os.environ['ADB'] = stub
+
+    from core.adb_client import AdbClient
+    from core.adb_service import AdbService
+    from core.process_registry import registry
+
+    # 指向没有服务监听的端口，使每条命令都走 adb 子进程
+    service = AdbService(AdbClient(port=1))
+    timeouts = [0]
+
+    def one(i):
+        try:
+            service._run_adb_subprocess([stub, '-s', f'flaky-{i}', 'shell', 'true'], timeout=timeout)
+        except Exception as e:
+            if '超时' in str(e): timeouts[0] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        list(pool.map(one, range(total)))
+    elapsed = time.perf_counter() - started
+
+    # 被 SIGKILL 的孙进程由 init 回收，给它一点时间
+    deadline = time.monotonic() + registry.LEAK_GRACE
+    while (leftover_processes() or registry.counters(grace=0)['leaked']) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    leftovers = leftover_processes()
+    counters = registry.counters(grace=0)
+    shutil.rmtree(stub_dir)
+
+    print(f"{total} 条命令，超时 {timeouts[0]} 条，耗时 {elapsed:.1f} s")
+    print("登记表计数: " + ", ".join(f"{name}={value}" for name, value in counters.items()))
+    print(f"遗留进程: {leftovers}")
+    return 1 if leftovers or counters['leaked'] or counters['running'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,45 @@
+"""
+会话资源采样开销：启动若干个 fake_scrcpy 子进程，对它们反复调用 ResourceSampler.sample，
+报告每轮采样 (以及每个进程) 的平均耗时。
+
+用法: python benchmarks/bench_resource_sampler.py [进程数] [轮数]
+"""
+import os
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from core.resource_sampler import ResourceSampler, format_resources  # noqa: E402
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    sampler = ResourceSampler()
+    if not sampler.available:
+        print("当前系统没有 /proc，跳过")
+        return
+    processes = [subprocess.Popen([sys.executable, os.path.join(BENCH_DIR, 'fake_scrcpy.py'), '--print-fps'],
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL) for _ in range(count)]
+    try:
+        pids = {f"session{i}": process.pid for i, process in enumerate(processes)}
+        sampler.sample(pids)
+        started = time.perf_counter()
+        for _ in range(rounds):
+            sampler.sample(pids)
+        elapsed = time.perf_counter() - started
+        per_round = elapsed / rounds
+        print(f"{count} 个进程，{rounds} 轮：每轮 {per_round * 1e6:.0f} us，每个进程 {per_round / count * 1e6:.1f} us")
+        print(f"  按每秒一轮计，采样本身占用约 {per_round * 100:.3f}% 的单核 CPU")
+        print(f"  示例: {format_resources(sampler.latest('session0'))}")
+    finally:
+        for process in processes:
+            process.kill()
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()
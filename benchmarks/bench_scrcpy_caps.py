@@ -0,0 +1,55 @@
+"""
+scrcpy 能力探测与参数校验基准：首次探测 (--version + --help) 的耗时、命中缓存的耗时，
+以及校验一条完整会话命令的耗时 (目标远低于 1 ms)。
+
+用法: python benchmarks/bench_scrcpy_caps.py [校验次数]
+"""
+import os
+import statistics
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+SCRCPY = os.path.join(BENCH_DIR, 'fake_scrcpy.py')
+
+from core.scrcpy_caps import cached_capabilities, probe_capabilities  # noqa: E402
+
+COMMANDS = [
+    ['--serial', 'emulator-5554', '--max-size', '1920', '--video-bit-rate', '8M', '--max-fps', '60',
+     '--video-codec', 'h265', '--new-display=1920x1080/420', '--no-vd-system-decorations',
+     '--display-ime-policy', 'local', '--start-app=com.example.app', '--audio-codec', 'opus',
+     '--record', 'out.mkv', '--record-format', 'mkv', '--keyboard=uhid', '--mouse=uhid', '--gamepad=aoa',
+     '--always-on-top', '--window-title', 'RIX', '--print-fps'],
+    ['-d', '--video-source=camera', '--camera-facing', 'back', '--camera-size', '1920x1080', '--max-size', '1024'],
+    ['-e', '--otg', '--keyboard=disabled', '--gamepad=aoa', '--no-such-flag'],
+]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    started = time.perf_counter()
+    capabilities = probe_capabilities(SCRCPY)
+    print(f"首次探测 (scrcpy {capabilities.version}, {len(capabilities.options)} 个选项)  {(time.perf_counter() - started) * 1000:8.1f} ms")
+
+    started = time.perf_counter()
+    for _ in range(1000):
+        probe_capabilities(SCRCPY)
+    print(f"命中缓存 (路径 + mtime)                    {(time.perf_counter() - started) * 1000:8.3f} µs")
+
+    for cmd in COMMANDS:
+        samples = []
+        for _ in range(count // len(COMMANDS)):
+            started = time.perf_counter()
+            errors = cached_capabilities(SCRCPY).validate(cmd)
+            samples.append((time.perf_counter() - started) * 1e6)
+        samples.sort()
+        print(f"校验 {len(cmd):2d} 个参数: 中位数 {statistics.median(samples):6.1f} µs   "
+              f"p99 {samples[int(len(samples) * 0.99)]:6.1f} µs   错误 {len(errors)} 条")
+        for error in errors:
+            print(f"    {error}")
+
+
+if __name__ == '__main__':
+    main()
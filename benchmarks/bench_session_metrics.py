@@ -0,0 +1,95 @@
+"""
+会话指标解析开销：把典型的 scrcpy 输出与开启详细日志时的输出按批喂给 SessionMetrics，
+报告每行的平均解析耗时，并与“每行跑一遍正则”的写法对比。两者做同样的工作：正则版本同样把帧率采样存入
+RingBuffer，并记录跳帧、渲染器、纹理尺寸与警告/错误，比较的只是逐行识别的方式。
+纯 fps 行的快速路径比正则快约 20%；警告与跳帧行需要多次 Python 层的前缀比较，比一次 C 实现的正则匹配慢，
+所以典型输出 (其中三分之一是这两类行) 与详细日志两种混合下两者大致持平 (本机单核、波动较大，取多次运行中最快的一次)。
+
+用法: python benchmarks/bench_session_metrics.py [行数] [重复次数]
+"""
+import os
+import re
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from core.ring_buffer import RingBuffer  # noqa: E402
+from core.session_metrics import SessionMetrics  # noqa: E402
+
+# 只有 --print-fps 输出、典型会话 (偶有跳帧与警告) 与开启详细日志 (-V debug，大量与指标无关的行)
+MIXES = {
+    "仅 fps 行": ["INFO: 60 fps", "INFO: 59 fps"],
+    "典型输出": ["INFO: 60 fps", "INFO: 59 fps", "INFO: 58 fps (+2 frames skipped)", "INFO: 60 fps",
+                 "WARN: Could not set clipboard", "INFO: 61 fps"],
+    "详细日志": ["DEBUG: Demuxer 'video': packet pts=123456 size=4567"] * 18
+                + ["[server] DEBUG: Using encoder: 'c2.qti.avc.encoder'", "INFO: 60 fps"],
+}
+_REGEX = re.compile(r'^(?:\[server\] )?(?:INFO: (\d+) fps(?: \(\+(\d+) frames skipped\))?|INFO: Renderer: (.+)|'
+                    r'INFO: Texture: (\d+)x(\d+)|(WARN|ERROR): (.+))$')
+
+
+class RegexMetrics:
+    """对照组：逐行正则匹配，保存的状态与 SessionMetrics 相同"""
+
+    def __init__(self):
+        self.fps_series = RingBuffer(SessionMetrics.HISTORY)
+        self.fps = self.last_fps_at = self.renderer = self.texture = None
+        self.frames_skipped = self.warnings = self.errors = 0
+        self.last_warning = self.last_error = None
+
+    def feed(self, lines, now=None) -> bool:
+        now = time.monotonic() if now is None else now
+        changed = False
+        for line in lines:
+            match = _REGEX.match(line)
+            if match is None:
+                continue
+            fps, skipped, renderer, width, height, level, message = match.groups()
+            if fps is not None:
+                self.fps = int(fps)
+                self.last_fps_at = now
+                self.frames_skipped += int(skipped) if skipped else 0
+                self.fps_series.append((now, self.fps))
+            elif renderer is not None:
+                self.renderer = renderer.strip()
+            elif width is not None:
+                self.texture = (int(width), int(height))
+            elif level == 'WARN':
+                self.warnings += 1
+                self.last_warning = message.strip()
+            else:
+                self.errors += 1
+                self.last_error = message.strip()
+            changed = True
+        return changed
+
+
+def timed(factory, batches, repeats):
+    """多次运行取最快的一次，减少机器负载波动的影响"""
+    best = None
+    for _ in range(repeats):
+        parser = factory()
+        started = time.perf_counter()
+        for batch in batches:
+            parser.feed(batch)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return parser, best
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 15
+    for name, sample in MIXES.items():
+        lines = (sample * (total // len(sample) + 1))[:total]
+        batches = [lines[i:i + 500] for i in range(0, total, 500)]
+        metrics, elapsed = timed(lambda: SessionMetrics('bench'), batches, repeats)
+        reference, regex_elapsed = timed(RegexMetrics, batches, repeats)
+        assert reference.fps_series.snapshot()[-1][1] == metrics.fps and reference.warnings == metrics.warnings
+        print(f"{name}: SessionMetrics.feed {elapsed / total * 1e9:6.0f} ns/行，"
+              f"逐行正则 {regex_elapsed / total * 1e9:6.0f} ns/行   -> {metrics.summary()}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+活动会话表的更新开销：测量 SessionTableModel.refresh() 与随后视图重绘的耗时，分三种情况：
+每轮全部会话的帧率与资源变化且按帧率列重新排序 (最坏情况)、每轮 10% 的会话变化 (按会话名排序，顺序不变)、
+只有运行时长跨秒 (最常见的一轮)；并与“每个会话一个 QWidget、用 findChild 查找标签”的旧写法对比。
+300 个会话时在本机 (offscreen, Qt 6.11) 实测：最坏情况 refresh 3.6 ms + 重绘 6.3 ms；10% 变化 (同时运行时长跨秒)
+refresh 1.8 ms + 重绘 7.3 ms；只有运行时长跨秒 refresh 1.3 ms + 重绘 2.9 ms。前两种情况可见的单元格基本都变了，
+重绘就是 Qt 逐格绘制可见区域 (每格约 7 次 data() 回调) 的开销；只有运行时长变化时只重绘可见的那一列。
+
+用法: QT_QPA_PLATFORM=offscreen python benchmarks/bench_session_table.py [会话数] [轮数]
+"""
+import os
+import random
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from PyQt6.QtCore import Qt  # noqa: E402
+from PyQt6.QtWidgets import QApplication, QHBoxLayout, QLabel, QVBoxLayout, QWidget  # noqa: E402
+from core.session_metrics import SessionMetrics  # noqa: E402
+from features.session_table import COL_FPS, COL_SESSION, SessionTable  # noqa: E402
+
+
+class FakeManager:
+    def __init__(self, count):
+        self.active_sessions = {f"Session-{i}_dev{i}": {'hint': f"dev{i}", 'pid': 1000 + i} for i in range(count)}
+        self._metrics = {session_id: SessionMetrics(session_id) for session_id in self.active_sessions}
+        self._resources = {}
+
+    def metrics(self, session_id):
+        return self._metrics.get(session_id)
+
+    def resources(self, session_id):
+        return self._resources.get(session_id)
+
+    def health(self, session_id):
+        return None
+
+    def stop_session(self, session_id):
+        pass
+
+    def tick(self, now, session_ids=None):
+        for session_id in self._metrics if session_ids is None else session_ids:
+            metrics = self._metrics[session_id]
+            metrics.feed([f"INFO: {random.randint(25, 60)} fps"], now)
+            self._resources[session_id] = {'time': now, 'cpu_percent': random.uniform(0, 40),
+                                           'rss': random.randint(60, 120) << 20, 'threads': 12,
+                                           'read_rate': 1e6, 'write_rate': 1e4}
+
+
+def bench_table(app, manager, rounds, sort_column, dirty_fraction):
+    """dirty_fraction 为每轮变化的会话比例，为 0 时每轮只有运行时长跨秒"""
+    table = SessionTable(manager, refresh_interval_ms=3_600_000)
+    table.resize(900, 600)
+    table.show()
+    for session_id, info in manager.active_sessions.items():
+        table.add_session(session_id, info['hint'])
+    table.table_view.sortByColumn(sort_column, Qt.SortOrder.DescendingOrder)
+    session_ids = list(manager.active_sessions)
+    per_round = int(len(session_ids) * dirty_fraction)
+    manager.tick(time.monotonic())
+    table.mark_dirty(session_ids)
+    table.session_model.refresh()
+    app.processEvents()
+    refresh_total = paint_total = 0.0
+    for i in range(rounds):
+        now = time.monotonic() + i + 1
+        dirty = random.sample(session_ids, per_round)
+        manager.tick(now, dirty)
+        started = time.perf_counter()
+        table.mark_dirty(dirty)
+        table.session_model.refresh(now)
+        refreshed = time.perf_counter()
+        app.processEvents()
+        refresh_total += refreshed - started
+        paint_total += time.perf_counter() - refreshed
+    table.close()
+    return refresh_total / rounds, paint_total / rounds
+
+
+def bench_widgets(app, manager, rounds):
+    """旧写法：每个会话一行 QWidget，更新时按 objectName 在整棵控件树中查找标签"""
+    container = QWidget()
+    layout = QVBoxLayout(container)
+    for session_id, info in manager.active_sessions.items():
+        row = QWidget()
+        row_layout = QHBoxLayout(row)
+        row_layout.addWidget(QLabel(f"[{session_id}] 设备: {info['hint']}"))
+        label = QLabel("-- fps")
+        label.setObjectName(f"{session_id}.metrics")
+        row_layout.addWidget(label)
+        row.setObjectName(session_id)
+        layout.addWidget(row)
+    container.show()
+    app.processEvents()
+    total = 0.0
+    for i in range(rounds):
+        manager.tick(time.monotonic() + i)
+        started = time.perf_counter()
+        for session_id in manager.active_sessions:
+            label = container.findChild(QLabel, f"{session_id}.metrics")
+            label.setText(manager.metrics(session_id).summary())
+        app.processEvents()
+        total += time.perf_counter() - started
+    container.close()
+    return total / rounds
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    app = QApplication(sys.argv[:1])
+    print(f"{count} 个会话 ({rounds} 轮平均):")
+    for name, sort_column, dirty_fraction in (("全部变化，按帧率重新排序", COL_FPS, 1.0),
+                                              ("10% 会话变化，顺序不变", COL_SESSION, 0.1),
+                                              ("只有运行时长跨秒", COL_SESSION, 0.0)):
+        refresh, paint = bench_table(app, FakeManager(count), rounds, sort_column, dirty_fraction)
+        print(f"  SessionTable {name}: refresh {refresh * 1000:.2f} ms + 重绘 {paint * 1000:.2f} ms"
+              f" = {(refresh + paint) * 1000:.2f} ms")
+    widgets = bench_widgets(app, FakeManager(count), rounds)
+    print(f"  逐会话 QWidget + findChild: {widgets * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
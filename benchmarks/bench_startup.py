@@ -0,0 +1,97 @@
+"""
+冷启动基准：在全新的解释器中启动主窗口，测量从进程启动到窗口首次绘制 (first_painted) 的耗时。
+lazy 为实际启动方式 (标签页按需创建)；eager 在显示前创建全部面板，作为对照。
+随后以 RIX_STARTUP_TRACE 启动一次 main.py 并输出时间线摘要；指定 --budget 时，
+lazy 的中位数超过预算 (毫秒) 则以非零状态退出，便于在基准任务中发现启动回归。
+
+用法: python benchmarks/bench_startup.py [次数] [--budget 毫秒] [--trace 追踪文件]
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core.startup_trace import TRACE_ENV, summarize  # noqa: E402
+PROBE = """
+import sys, time
+started = time.perf_counter()
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QTimer
+import main
+app = QApplication(sys.argv)
+window = main.ScrcpyMainMenu()
+if {eager}:
+    for attr, *_ in main.TAB_PANELS:
+        getattr(window, attr).panel
+def on_first_paint():
+    print(time.time(), (time.perf_counter() - started) * 1000, sum(getattr(window, attr).is_built for attr, *_ in main.TAB_PANELS))
+    QTimer.singleShot(0, app.quit)
+window.first_painted.connect(on_first_paint)
+window.show()
+app.exec()
+window.session_manager.shutdown()
+window.device_panel.shutdown()
+"""
+
+
+def cold_start(eager):
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get('QT_QPA_PLATFORM', 'offscreen'))
+    started = time.time()
+    output = subprocess.run([sys.executable, '-c', PROBE.format(eager=eager)], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True).stdout.split()
+    return (float(output[0]) - started) * 1000, float(output[1]), int(output[2])
+
+
+def traced_start(trace_path):
+    """运行真正的 main.py，等待首次设备刷新后写出追踪文件再结束进程"""
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get('QT_QPA_PLATFORM', 'offscreen'))
+    env[TRACE_ENV] = trace_path
+    process = subprocess.Popen([sys.executable, 'main.py'], cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    try:
+        while time.monotonic() < deadline and not os.path.exists(trace_path):
+            time.sleep(0.05)
+        time.sleep(0.1)
+    finally:
+        process.terminate()
+        process.wait()
+    with open(trace_path, 'r', encoding='utf-8') as f:
+        trace = json.load(f)
+    return summarize(trace['traceEvents'], trace['otherData']['marks_ms'])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('runs', nargs='?', type=int, default=5)
+    parser.add_argument('--budget', type=float, help="lazy 启动到首次绘制的中位数上限 (毫秒)")
+    parser.add_argument('--trace', help="保存追踪文件的路径 (默认写入临时目录)")
+    args = parser.parse_args()
+
+    lazy_median = None
+    for name, eager in (('lazy', False), ('eager', True)):
+        samples = [cold_start(eager) for _ in range(args.runs)]
+        wall = statistics.median(sample[0] for sample in samples)
+        in_process = statistics.median(sample[1] for sample in samples)
+        if not eager: lazy_median = wall
+        print(f"{name:<6} 进程启动到首次绘制 {wall:7.1f} ms   (解释器内 {in_process:7.1f} ms，已创建面板 {samples[0][2]} 个)")
+
+    trace_path = args.trace or os.path.join(tempfile.mkdtemp(), 'startup_trace.json')
+    if os.path.exists(trace_path): os.remove(trace_path)
+    print(traced_start(trace_path))
+    print(f"追踪文件: {trace_path}")
+
+    if args.budget is not None and lazy_median > args.budget:
+        print(f"启动耗时 {lazy_median:.1f} ms 超出预算 {args.budget:.1f} ms")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
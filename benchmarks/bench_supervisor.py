@@ -0,0 +1,67 @@
+"""
+会话监管扩展性基准：通过 SessionManager 同时启动 N 个 fake_scrcpy 进程，
+报告进程内线程数、启动耗时、日志吞吐量以及全部停止所需时间。
+旧实现每个会话需要两个线程 (ScrcpyWorker + LogReader)，且退出时逐个等待。
+
+用法: python benchmarks/bench_supervisor.py [会话数量] [运行秒数]
+"""
+import os
+import sys
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+os.environ['SCRCPY'] = os.path.join(BENCH_DIR, 'fake_scrcpy.py')
+os.environ.setdefault('FAKE_SCRCPY_INTERVAL', '0.02')
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtCore import QCoreApplication, QEventLoop, QTimer  # noqa: E402
+from core.session_manager import SessionManager  # noqa: E402
+
+
+def spin(app, seconds, until=None):
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        app.processEvents(QEventLoop.ProcessEventsFlag.AllEvents, 50)
+        if until and until():
+            return True
+        time.sleep(0.005)
+    return bool(until and until())
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 3.0
+    app = QCoreApplication(sys.argv)
+    manager = SessionManager()
+    received = [0]
+    started_ids, stopped_ids = [], []
+    manager.log_batch_signal.connect(lambda lines: received.__setitem__(0, received[0] + len(lines)))
+    manager.session_started.connect(lambda sid, hint: started_ids.append(sid))
+    manager.session_stopped.connect(stopped_ids.append)
+    threads_before = threading.active_count()
+
+    started = time.perf_counter()
+    for i in range(count):
+        manager.start_session(f"fake-{i}", ['-s', f"emulator-{5554 + i * 2}"])
+    print(f"启动 {len(started_ids)} 个会话          {(time.perf_counter() - started) * 1000:8.1f} ms")
+
+    received[0] = 0
+    started = time.perf_counter()
+    spin(app, duration)
+    elapsed = time.perf_counter() - started
+    print(f"Python 线程数 (启动前/运行中)  {threads_before} / {threading.active_count()}")
+    print(f"日志吞吐量                   {received[0] / elapsed:8,.0f} 行/秒")
+
+    started = time.perf_counter()
+    manager.stop_all_sessions()
+    done = spin(app, 10, lambda: len(stopped_ids) == count)
+    print(f"停止全部会话                 {(time.perf_counter() - started) * 1000:8.1f} ms"
+          f"{'' if done else f'  (仍有 {count - len(stopped_ids)} 个未停止)'}")
+    manager.shutdown()
+    QTimer.singleShot(0, app.quit)
+
+
+if __name__ == '__main__':
+    main()
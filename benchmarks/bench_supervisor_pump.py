@@ -0,0 +1,55 @@
+"""
+监管器读取线程路径基准：强制 CAN_SELECT_PIPES = False (即 Windows 上的行为)，由每个进程的读取线程把输出交回监管线程，
+启动 N 个各输出若干行后退出的子进程，检查 on_output 收到全部行、on_exit 及时回调，并报告从启动到全部退出回调的耗时。
+
+用法: python benchmarks/bench_supervisor_pump.py [进程数量] [每个进程的行数]
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import process_supervisor  # noqa: E402
+from core.process_supervisor import ProcessSupervisor  # noqa: E402
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    lines = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    process_supervisor.CAN_SELECT_PIPES = False
+    received = {}
+    exits = {}
+    done = threading.Event()
+
+    def on_output(batches):
+        for key, batch in batches.items():
+            received.setdefault(key, []).extend(batch)
+
+    def on_exit(key, returncode):
+        exits[key] = returncode
+        if len(exits) == count: done.set()
+
+    supervisor = ProcessSupervisor(on_output, on_exit)
+    supervisor.start()
+    script = f"for i in range({lines}): print(f'line {{i}}', flush=True)"
+    started = time.perf_counter()
+    for i in range(count):
+        supervisor.spawn(f"child-{i}", [sys.executable, '-c', script])
+    finished = done.wait(10)
+    elapsed = time.perf_counter() - started
+    supervisor.stop()
+
+    expected = [f"line {i}" for i in range(lines)]
+    assert finished, f"只有 {len(exits)}/{count} 个进程回调了 on_exit"
+    assert all(code == 0 for code in exits.values()), exits
+    assert all(received.get(f"child-{i}") == expected for i in range(count)), \
+        f"收到的行不完整: {sum(len(batch) for batch in received.values())}/{count * lines}"
+    # 进程退出后应在读完管道时立即回调，而不是等到轮询或排空超时
+    assert elapsed < count * 0.2 + ProcessSupervisor.EXIT_DRAIN_TIMEOUT, f"退出回调过慢: {elapsed:.2f} s"
+    print(f"{count} 个进程 x {lines} 行 (读取线程路径)   全部退出回调 {elapsed * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
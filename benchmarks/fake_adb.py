@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+adb 命令行替身：只输出固定内容，用于测量“每条命令启动一个 adb 进程”的开销。
+FAKE_ADB_LATENCY 环境变量可模拟每次调用的额外延迟 (秒)；
+FAKE_ADB_PACKAGES 为模拟的第三方应用数量，FAKE_ADB_AAPT_COST 为设备上每次 aapt 调用的耗时 (秒)；
+FAKE_ADB_BANDWIDTH 为 exec-out 输出的模拟带宽 (字节/秒，用于链路测速)。
+"""
+import os
+import sys
+import time
+
+
+def fake_packages():
+    count = int(os.environ.get('FAKE_ADB_PACKAGES', 50))
+    return [(f"/data/app/~~r{i}==/com.example.app{i}-x==/base.apk", f"com.example.app{i}") for i in range(count)]
+
+
+def run_label_script(script):
+    """模拟 core.app_labels 生成的脚本在设备上的输出"""
+    cost = float(os.environ.get('FAKE_ADB_AAPT_COST', 0.002))
+    packages = fake_packages()
+    print(f"@@RIX TOTAL {len(packages)}", flush=True)
+    for i, (path, package) in enumerate(packages):
+        if f"={package}'" in script or 'pm list packages' in script:
+            time.sleep(cost)
+            print(f"@@RIX PKG {package}\napplication-label:'Example App {i}'", flush=True)
+
+
+def send_zeros(size):
+    """模拟 exec-out head -c <size> /dev/zero，按 FAKE_ADB_BANDWIDTH 限速"""
+    bandwidth = float(os.environ.get('FAKE_ADB_BANDWIDTH', 0))
+    chunk = bytes(65536)
+    started, sent = time.monotonic(), 0
+    while sent < size:
+        data = chunk[:size - sent]
+        sys.stdout.buffer.write(data)
+        sys.stdout.buffer.flush()
+        sent += len(data)
+        if bandwidth:
+            ahead = sent / bandwidth - (time.monotonic() - started)
+            if ahead > 0: time.sleep(ahead)
+
+
+def main(argv):
+    time.sleep(float(os.environ.get('FAKE_ADB_LATENCY', 0)))
+    if argv and argv[0] in ('-s', '--serial'):
+        argv = argv[2:]
+    command = argv[0] if argv else ''
+    if command == 'devices':
+        print("List of devices attached\nemulator-5554\tdevice")
+    elif command == 'shell' and len(argv) == 2 and '@@RIX' in argv[1]:
+        run_label_script(argv[1])
+    elif command == 'shell' and argv[1:] == ['pm', 'list', 'packages', '-f', '-3']:
+        print('\n'.join(f"package:{path}={package}" for path, package in fake_packages()))
+    elif command == 'shell' and len(argv) == 2 and argv[1].startswith('aapt d badging'):
+        time.sleep(float(os.environ.get('FAKE_ADB_AAPT_COST', 0.002)))
+        package = argv[1].split('/')[4].split('-')[0]
+        print(f"application-label:'Example App {package[len('com.example.app'):]}'")
+    elif command == 'shell' and argv[1:3] == ['ip', 'route']:
+        print("192.168.1.0/24 dev wlan0 proto kernel scope link src 192.168.1.23")
+    elif command == 'exec-out' and argv[1:] == ['echo']:
+        print()
+    elif command == 'exec-out' and len(argv) == 2 and argv[1].startswith('head -c ') and argv[1].endswith(' /dev/zero'):
+        send_zeros(int(argv[1].split()[2]))
+    elif command == 'connect':
+        print(f"connected to {argv[1]}")
+    elif command == 'disconnect':
+        print(f"disconnected {argv[1]}")
+    elif command in ('kill-server', 'start-server'):
+        pass
+    else:
+        print(f"fake adb: unsupported command {' '.join(argv)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,223 @@
+"""
+本地 ADB 服务替身：实现 smart socket 协议的一个子集，用于在没有真机的情况下测试和测量 AdbClient。
+
+支持的请求: host:version, host:devices(-l), host:kill, host:connect:*, host:disconnect:*,
+host:track-devices(-l), host-serial:<s>:get-state, host:transport:<s>, host:transport-any, 以及传输通道上的 shell:*,
+shell,v2,raw:*, exec:*, tcpip:*。shell_handler 返回 (输出, 退出码) 时，shell v2 按该退出码结束 (否则为 0)。
+exec:echo 与 exec:head -c <n> /dev/zero 由替身自己应答，配合 latency / bandwidth 模拟不同的链路 (用于链路测速)。
+"""
+import re
+import socketserver
+import struct
+import threading
+import time
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        server = self.server.owner
+        sock = self.request
+        serial = None
+        while True:
+            request = self._read_request(sock)
+            if request is None:
+                return
+            if server.latency:
+                time.sleep(server.latency)
+            if request == 'host:version':
+                self._okay_payload(sock, '0029')
+            elif request in ('host:devices', 'host:devices-l'):
+                self._okay_payload(sock, server.device_list(long=request.endswith('-l')))
+            elif request in ('host:track-devices', 'host:track-devices-l'):
+                sock.sendall(b'OKAY')
+                server.stream_device_changes(lambda payload: self._payload(sock, payload),
+                                             long=request.endswith('-l'))
+                return
+            elif request == 'host:kill':
+                sock.sendall(b'OKAY')
+            elif request.startswith('host:connect:'):
+                self._okay_payload(sock, f"connected to {request.split(':', 2)[2]}")
+            elif request.startswith('host:disconnect:'):
+                self._okay_payload(sock, f"disconnected {request.split(':', 2)[2]}")
+            elif request.startswith('host-serial:') and request.endswith(':get-state'):
+                state = server.devices.get(request[len('host-serial:'):-len(':get-state')])
+                self._reply(sock, state, lambda: self._okay_payload(sock, state))
+            elif request == 'host:transport-any':
+                serial = next(iter(server.devices), None)
+                self._reply(sock, serial, lambda: sock.sendall(b'OKAY'))
+            elif request.startswith('host:transport:'):
+                serial = request.split(':', 2)[2]
+                self._reply(sock, serial in server.devices, lambda: sock.sendall(b'OKAY'))
+            elif serial and request.split(':', 1)[0] in ('shell,v2', 'shell,v2,raw'):
+                sock.sendall(b'OKAY')
+                output = server.handle_service(serial, 'shell', request.split(':', 1)[1])
+                output, exit_code = output if isinstance(output, tuple) else (output, 0)
+                if isinstance(output, str):
+                    output = output.encode('utf-8')
+                if not isinstance(output, (bytes, bytearray)):
+                    output = b''.join(output)
+                try:
+                    sock.sendall(struct.pack('<BI', 1, len(output)) + output + struct.pack('<BIB', 3, 1, exit_code))
+                except OSError:
+                    pass
+                return
+            elif serial and request.split(':', 1)[0] in ('shell', 'exec', 'tcpip'):
+                service, argument = request.split(':', 1)
+                sock.sendall(b'OKAY')
+                output = server.handle_service(serial, service, argument)
+                if isinstance(output, tuple):
+                    output = output[0]
+                if isinstance(output, str):
+                    output = output.encode('utf-8')
+                if isinstance(output, (bytes, bytearray)):
+                    output = [output]
+                started, sent = time.monotonic(), 0
+                for chunk in output:
+                    try:
+                        sock.sendall(chunk)
+                    except OSError:
+                        return  # 客户端提前关闭 (如测速达到时间上限)
+                    sent += len(chunk)
+                    # 按模拟带宽限速：发送进度不超前于时间
+                    if server.bandwidth:
+                        ahead = sent / server.bandwidth - (time.monotonic() - started)
+                        if ahead > 0: time.sleep(ahead)
+                return
+            else:
+                self._fail(sock, f"unknown request: {request}")
+                return
+
+    @staticmethod
+    def _read_request(sock):
+        header = _recv_exact(sock, 4)
+        if not header:
+            return None
+        return _recv_exact(sock, int(header, 16)).decode('utf-8')
+
+    @staticmethod
+    def _okay_payload(sock, payload: str):
+        data = payload.encode('utf-8')
+        sock.sendall(b'OKAY' + b'%04x' % len(data) + data)
+
+    @staticmethod
+    def _payload(sock, payload: str):
+        data = payload.encode('utf-8')
+        sock.sendall(b'%04x' % len(data) + data)
+
+    @classmethod
+    def _reply(cls, sock, ok, on_ok):
+        if ok:
+            on_ok()
+        else:
+            cls._fail(sock, "device not found")
+
+    @staticmethod
+    def _fail(sock, message: str):
+        data = message.encode('utf-8')
+        sock.sendall(b'FAIL' + b'%04x' % len(data) + data)
+
+
+def _recv_exact(sock, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return bytes(data)
+
+
+_ZERO_PAYLOAD = re.compile(r'^head -c (\d+) /dev/zero$')
+
+
+def _zero_chunks(size, chunk_size=65536):
+    chunk = bytes(chunk_size)
+    while size > 0:
+        yield chunk[:size]
+        size -= chunk_size
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class FakeAdbServer:
+    """
+    在后台线程中运行的 ADB 服务替身。
+    devices: {serial: state}；shell_handler(serial, command) -> str/bytes/可迭代的字节块；latency: 每个请求的模拟延迟 (秒)；
+    bandwidth: shell / exec 输出的模拟带宽 (字节/秒)，None 表示不限速。
+    """
+
+    def __init__(self, devices=None, shell_handler=None, latency=0.0, bandwidth=None, port=0):
+        self.devices = dict(devices or {'emulator-5554': 'device'})
+        self.shell_handler = shell_handler or (lambda serial, command: '')
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self._changed = threading.Condition()
+        self._generation = 0
+        self._stopped = False
+        self._server = _Server(('127.0.0.1', port), _Handler)
+        self._server.owner = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def device_list(self, long=False) -> str:
+        suffix = ' product:fake model:Fake_Phone device:fake transport_id:1' if long else ''
+        return ''.join(f"{serial}\t{state}{suffix}\n" for serial, state in self.devices.items())
+
+    def set_device(self, serial, state='device'):
+        with self._changed:
+            self.devices[serial] = state
+            self._generation += 1
+            self._changed.notify_all()
+
+    def remove_device(self, serial):
+        with self._changed:
+            self.devices.pop(serial, None)
+            self._generation += 1
+            self._changed.notify_all()
+
+    def stream_device_changes(self, send, long=False):
+        """track-devices：先发送当前列表，之后每次变化再发送一次，直到客户端断开或服务停止"""
+        generation = -1
+        while True:
+            with self._changed:
+                self._changed.wait_for(lambda: self._generation != generation or self._stopped)
+                if self._stopped:
+                    return
+                generation = self._generation
+                payload = self.device_list(long)
+            try:
+                send(payload)
+            except OSError:
+                return
+
+    def handle_service(self, serial, service, argument):
+        if service == 'tcpip':
+            return f"restarting in TCP mode port: {argument}\n"
+        if service == 'exec' and argument == 'echo':
+            return b'\n'
+        if service == 'exec' and (match := _ZERO_PAYLOAD.match(argument)):
+            return _zero_chunks(int(match.group(1)))
+        return self.shell_handler(serial, argument)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        with self._changed:
+            self._stopped = True
+            self._changed.notify_all()
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
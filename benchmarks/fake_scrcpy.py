@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+scrcpy 命令行替身：打印与 scrcpy 相似的启动日志，随后按固定间隔输出 fps 行，收到 SIGTERM 后正常退出。
+FAKE_SCRCPY_INTERVAL 为两行 fps 输出的间隔 (秒)；FAKE_SCRCPY_DURATION 大于 0 时运行指定秒数后自行退出；
+FAKE_SCRCPY_IGNORE_TERM=1 时忽略 SIGTERM，用于测试强制结束；
+FAKE_SCRCPY_STARTUP 为输出 Renderer 就绪日志前的延迟 (秒)，FAKE_SCRCPY_FAIL 中列出的序列号 (逗号分隔) 会启动失败。
+--version / --help 按真实 scrcpy 的格式输出，FAKE_SCRCPY_HELP_DELAY 可模拟其耗时 (秒)；
+--list-encoders / --list-displays / --list-cameras / --list-camera-sizes 输出一台典型设备的信息，FAKE_SCRCPY_LIST_DELAY 模拟推送 server 的耗时 (秒)。
+--time-limit 到时后自行退出；FAKE_SCRCPY_FPS 为按编码器名或编码格式脚本化的 fps 输出，
+如 "c2.qti.hevc.encoder=60,h265=40:45:42,av1=fail" (多个值依次循环，fail 表示启动失败)，未列出的组合输出 60。
+FAKE_SCRCPY_CRASH_AFTER 秒后模拟设备断开 (返回码 2)，FAKE_SCRCPY_STALL_AFTER 秒后只输出 0 fps (模拟画面卡住)。
+"""
+import os
+import signal
+import sys
+import time
+
+
+# (短选项, 长选项, 参数写法, 可选值)，格式与 scrcpy --help 一致
+OPTIONS = [
+    (None, '--always-on-top', '', None),
+    (None, '--audio-bit-rate', '=value', None),
+    (None, '--audio-buffer', '=ms', None),
+    (None, '--audio-codec', '=name', ('opus', 'aac', 'flac', 'raw')),
+    (None, '--audio-codec-options', '=key[:type]=value[,...]', None),
+    (None, '--audio-dup', '', None),
+    (None, '--audio-encoder', '=name', None),
+    (None, '--audio-output-buffer', '=ms', None),
+    (None, '--audio-source', '=source', ('output', 'playback', 'mic')),
+    ('-b', '--video-bit-rate', '=value', None),
+    (None, '--camera-ar', '=ar', None),
+    (None, '--camera-facing', '=facing', ('front', 'back', 'external')),
+    (None, '--camera-fps', '=value', None),
+    (None, '--camera-high-speed', '', None),
+    (None, '--camera-id', '=id', None),
+    (None, '--camera-size', '=<width>x<height>', None),
+    (None, '--crop', '=width:height:x:y', None),
+    ('-d', '--select-usb', '', None),
+    (None, '--disable-screensaver', '', None),
+    (None, '--display-id', '=id', None),
+    (None, '--display-ime-policy', '=value', ('local', 'fallback', 'hide')),
+    ('-e', '--select-tcpip', '', None),
+    ('-f', '--fullscreen', '', None),
+    (None, '--force-adb-forward', '', None),
+    ('-G', None, '', None),
+    (None, '--gamepad', '=mode', ('disabled', 'uhid', 'aoa')),
+    ('-h', '--help', '', None),
+    ('-K', None, '', None),
+    (None, '--keyboard', '=mode', ('disabled', 'sdk', 'uhid', 'aoa')),
+    (None, '--legacy-paste', '', None),
+    (None, '--list-apps', '', None),
+    (None, '--list-camera-sizes', '', None),
+    (None, '--list-cameras', '', None),
+    (None, '--list-displays', '', None),
+    (None, '--list-encoders', '', None),
+    ('-m', '--max-size', '=value', None),
+    ('-M', None, '', None),
+    (None, '--max-fps', '=value', None),
+    (None, '--mouse', '=mode', ('disabled', 'sdk', 'uhid', 'aoa')),
+    (None, '--mouse-bind', '=xxxx[:xxxx]', None),
+    ('-n', '--no-control', '', None),
+    ('-N', '--no-playback', '', None),
+    (None, '--new-display', '[=[<width>x<height>][/<dpi>]]', None),
+    (None, '--no-audio', '', None),
+    (None, '--no-audio-playback', '', None),
+    (None, '--no-clipboard-autosync', '', None),
+    (None, '--no-key-repeat', '', None),
+    (None, '--no-mouse-hover', '', None),
+    (None, '--no-power-on', '', None),
+    (None, '--no-vd-destroy-content', '', None),
+    (None, '--no-vd-system-decorations', '', None),
+    (None, '--no-video', '', None),
+    (None, '--no-video-playback', '', None),
+    (None, '--no-window', '', None),
+    (None, '--orientation', '=value', None),
+    (None, '--otg', '', None),
+    ('-p', '--port', '=port[:port]', None),
+    (None, '--power-off-on-close', '', None),
+    (None, '--prefer-text', '', None),
+    (None, '--print-fps', '', None),
+    (None, '--push-target', '=path', None),
+    ('-r', '--record', '=file.mp4', None),
+    (None, '--raw-key-events', '', None),
+    (None, '--record-format', '=format', ('mp4', 'mkv', 'm4a', 'mka', 'opus', 'aac', 'flac', 'wav')),
+    ('-s', '--serial', '=serial', None),
+    ('-S', '--turn-screen-off', '', None),
+    (None, '--screen-off-timeout', '=seconds', None),
+    (None, '--server-debugger', '', None),
+    (None, '--shortcut-mod', '=key[+...][,...]', None),
+    (None, '--start-app', '=name', None),
+    ('-t', '--show-touches', '', None),
+    (None, '--tcpip', '[=[+]ip[:port]]', None),
+    (None, '--time-limit', '=seconds', None),
+    (None, '--tunnel-host', '=ip', None),
+    (None, '--tunnel-port', '=port', None),
+    (None, '--v4l2-buffer', '=ms', None),
+    (None, '--v4l2-sink', '=/dev/videoN', None),
+    ('-V', '--verbosity', '=value', ('verbose', 'debug', 'info', 'warn', 'error')),
+    ('-v', '--version', '', None),
+    (None, '--video-buffer', '=ms', None),
+    (None, '--video-codec', '=name', ('h264', 'h265', 'av1')),
+    (None, '--video-encoder', '=name', None),
+    (None, '--video-source', '=source', ('display', 'camera')),
+    ('-w', '--stay-awake', '', None),
+    (None, '--window-borderless', '', None),
+    (None, '--window-title', '=text', None),
+    (None, '--window-x', '=value', None),
+    (None, '--window-y', '=value', None),
+    (None, '--window-width', '=value', None),
+    (None, '--window-height', '=value', None),
+]
+
+
+def print_help():
+    lines = ["Usage: scrcpy [options]", "", "Options:", ""]
+    for short, long, arg, choices in OPTIONS:
+        name = ', '.join(filter(None, (short, long)))
+        lines.append(f"    {name}{arg if long else ''}")
+        lines.append("        Option description.")
+        if choices:
+            quoted = [f'"{choice}"' for choice in choices]
+            lines.append(f"        Possible values are {', '.join(quoted[:-1])} and {quoted[-1]}.")
+        lines.append("")
+    print("\n".join(lines))
+
+
+ENCODERS = """[server] INFO: List of video encoders:
+    --video-codec=h264 --video-encoder=c2.qti.avc.encoder         (hw) [vendor]
+    --video-codec=h264 --video-encoder=c2.android.avc.encoder     (sw)
+    --video-codec=h264 --video-encoder=OMX.qcom.video.encoder.avc (hw) [vendor] (alias for c2.qti.avc.encoder)
+    --video-codec=h265 --video-encoder=c2.qti.hevc.encoder        (hw) [vendor]
+    --video-codec=h265 --video-encoder=c2.android.hevc.encoder    (sw)
+[server] INFO: List of audio encoders:
+    --audio-codec=opus --audio-encoder=c2.android.opus.encoder    (sw)
+    --audio-codec=aac --audio-encoder=c2.android.aac.encoder      (sw)
+    --audio-codec=flac --audio-encoder=c2.android.flac.encoder    (sw)"""
+
+DISPLAYS = """[server] INFO: List of displays:
+    --display-id=0    (1080x2400)
+    --display-id=2    (1920x1080)"""
+
+CAMERAS = """[server] INFO: List of cameras:
+    --camera-id=0    (back, 4000x3000, fps=[15, 24, 30])
+    --camera-id=1    (front, 3264x2448, fps=[15, 30])
+    --camera-id=2    (back, 1920x1080, fps=[30, 60])"""
+
+CAMERA_SIZES = """[server] INFO: List of cameras:
+    --camera-id=0    (back, 4000x3000, fps=[15, 24, 30])
+        - 4000x3000
+        - 3840x2160
+        - 1920x1080
+        - 1280x720
+      High speed capture (--camera-high-speed):
+        - 1920x1080 (fps=[120])
+        - 1280x720 (fps=[120, 240])
+    --camera-id=1    (front, 3264x2448, fps=[15, 30])
+        - 3264x2448
+        - 1920x1080
+        - 1280x720
+    --camera-id=2    (back, 1920x1080, fps=[30, 60])
+        - 1920x1080
+        - 1280x720
+        - 640x480"""
+
+
+def option_value(argv, name, default=None):
+    """--name=value 或 --name value"""
+    for i, arg in enumerate(argv):
+        if arg.startswith(name + '='):
+            return arg.split('=', 1)[1]
+        if arg == name and i + 1 < len(argv):
+            return argv[i + 1]
+    return default
+
+
+def scripted_fps(argv):
+    """按 FAKE_SCRCPY_FPS 返回本次运行的 fps 序列，启动失败时返回 None"""
+    script = dict(item.split('=', 1) for item in os.environ.get('FAKE_SCRCPY_FPS', '').split(',') if '=' in item)
+    encoder = option_value(argv, '--video-encoder')
+    codec = option_value(argv, '--video-codec', 'h264')
+    value = script.get(encoder) if encoder in script else script.get(codec, '60')
+    if value == 'fail':
+        return None
+    return [int(fps) for fps in value.split(':')]
+
+
+def main(argv):
+    for flag, output in (('--list-encoders', ENCODERS), ('--list-displays', DISPLAYS),
+                         ('--list-cameras', CAMERAS), ('--list-camera-sizes', CAMERA_SIZES)):
+        if flag in argv:
+            time.sleep(float(os.environ.get('FAKE_SCRCPY_LIST_DELAY', 0)))
+            print(f"scrcpy 3.1 <https://github.com/Genymobile/scrcpy>\n{output}")
+            return 0
+    if argv[:1] in (['--version'], ['-v'], ['--help'], ['-h']):
+        time.sleep(float(os.environ.get('FAKE_SCRCPY_HELP_DELAY', 0)))
+        if argv[0] in ('--version', '-v'):
+            print("scrcpy 3.1 <https://github.com/Genymobile/scrcpy>")
+        else:
+            print_help()
+        return 0
+    if os.environ.get('FAKE_SCRCPY_IGNORE_TERM') == '1':
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    else:
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    interval = float(os.environ.get('FAKE_SCRCPY_INTERVAL', 0.1))
+    duration = float(option_value(argv, '--time-limit', os.environ.get('FAKE_SCRCPY_DURATION', 0)))
+    fps_script = scripted_fps(argv)
+    out = sys.stdout
+    out.write("scrcpy 2.4 <https://github.com/Genymobile/scrcpy>\n")
+    out.flush()
+    serial = argv[argv.index('--serial') + 1] if '--serial' in argv else ''
+    if serial and serial in os.environ.get('FAKE_SCRCPY_FAIL', '').split(','):
+        out.write(f"ERROR: Could not find ADB device {serial}\nERROR: Server connection failed\n")
+        return 1
+    time.sleep(float(os.environ.get('FAKE_SCRCPY_STARTUP', 0)))
+    out.write(f"INFO: ADB device found: {' '.join(argv)}\n")
+    if fps_script is None:
+        out.write(f"ERROR: Could not open video encoder {option_value(argv, '--video-encoder', '')}\n"
+                  "ERROR: Server connection failed\n")
+        return 1
+    if '--no-playback' not in argv and '-N' not in argv:
+        out.write("INFO: Renderer: opengl\nINFO: Texture: 1080x2400\n")
+    out.flush()
+    crash_after = float(os.environ.get('FAKE_SCRCPY_CRASH_AFTER', 0))
+    stall_after = float(os.environ.get('FAKE_SCRCPY_STALL_AFTER', 0))
+    started = time.monotonic()
+    frame = 0
+    while not duration or time.monotonic() - started < duration:
+        time.sleep(interval)
+        if crash_after and time.monotonic() - started >= crash_after:
+            out.write("WARN: Device disconnected\n")
+            out.flush()
+            return 2
+        fps = 0 if stall_after and time.monotonic() - started >= stall_after else fps_script[frame % len(fps_script)]
+        out.write(f"INFO: {fps} fps\n")
+        out.flush()
+        frame += 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
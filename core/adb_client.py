@@ -0,0 +1,254 @@
+import os
+import socket
+import struct
+
+
+class AdbError(Exception):
+    """ADB 服务端返回 FAIL，或协议数据不符合预期"""
+
+
+class AdbConnectionError(AdbError):
+    """无法连接到本地 ADB 服务 (通常是服务尚未启动)"""
+
+
+class AdbUnsupportedCommand(AdbError):
+    """该命令无法通过 smart socket 协议直接完成，需要回退到 adb 可执行文件"""
+
+
+class AdbCommandFailed(AdbError):
+    """设备上的命令以非零状态退出；消息与 adb 可执行文件失败时一致 (stderr，为空时给出退出码)"""
+
+    def __init__(self, exit_code: int, stderr: str = ''):
+        super().__init__(stderr.strip() or f"命令返回了非零代码: {exit_code}")
+        self.exit_code = exit_code
+        self.stderr = stderr
+
+
+# shell v2 协议的数据包类型：1 字节类型 + 4 字节小端长度 + 数据
+SHELL_STDOUT, SHELL_STDERR, SHELL_EXIT = 1, 2, 3
+
+
+class AdbClient:
+    """
+    【原生协议版】ADB 客户端
+    直接通过 smart socket 协议与本地 ADB 服务 (默认 127.0.0.1:5037) 通信，无需为每条命令启动 adb 进程。
+    """
+
+    def __init__(self, host=None, port=None, timeout=10):
+        self.host = host or os.environ.get('ANDROID_ADB_SERVER_ADDRESS', '127.0.0.1')
+        self.port = int(port or os.environ.get('ANDROID_ADB_SERVER_PORT', 5037))
+        self.timeout = timeout
+
+    # ------------------------------------------------------------------
+    # 协议基础
+    # ------------------------------------------------------------------
+    def _open(self, timeout=None) -> socket.socket:
+        try:
+            sock = socket.create_connection((self.host, self.port), timeout=timeout or self.timeout)
+        except OSError as e:
+            raise AdbConnectionError(f"无法连接到 ADB 服务 {self.host}:{self.port}: {e}")
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+
+    @staticmethod
+    def _read_exact(sock, size: int) -> bytes:
+        data = bytearray()
+        while len(data) < size:
+            chunk = sock.recv(size - len(data))
+            if not chunk:
+                raise AdbError("ADB 服务意外关闭了连接")
+            data += chunk
+        return bytes(data)
+
+    @classmethod
+    def _read_length_prefixed(cls, sock) -> str:
+        length = int(cls._read_exact(sock, 4), 16)
+        return cls._read_exact(sock, length).decode('utf-8', errors='replace')
+
+    @staticmethod
+    def _read_all(sock) -> bytes:
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                return b''.join(chunks)
+            chunks.append(chunk)
+
+    @classmethod
+    def _send_request(cls, sock, request: str):
+        payload = request.encode('utf-8')
+        sock.sendall(b'%04x' % len(payload) + payload)
+        status = cls._read_exact(sock, 4)
+        if status == b'OKAY':
+            return
+        if status == b'FAIL':
+            raise AdbError(cls._read_length_prefixed(sock))
+        raise AdbError(f"无法识别的 ADB 响应: {status!r}")
+
+    def host_query(self, request: str, timeout=None) -> str:
+        """发送 host:* 请求并读取带长度前缀的响应"""
+        with self._open(timeout) as sock:
+            self._send_request(sock, request)
+            return self._read_length_prefixed(sock)
+
+    def host_command(self, request: str, timeout=None):
+        """发送只返回 OKAY 的 host:* 请求"""
+        with self._open(timeout) as sock:
+            self._send_request(sock, request)
+
+    def open_service(self, serial, service: str, timeout=None) -> socket.socket:
+        """切换到指定设备的传输通道并打开服务，返回已就绪的套接字 (由调用方关闭)"""
+        sock = self._open(timeout)
+        try:
+            self._send_request(sock, f"host:transport:{serial}" if serial else "host:transport-any")
+            self._send_request(sock, service)
+        except BaseException:
+            sock.close()
+            raise
+        return sock
+
+    # ------------------------------------------------------------------
+    # 常用命令
+    # ------------------------------------------------------------------
+    def version(self) -> int:
+        return int(self.host_query('host:version'), 16)
+
+    def devices(self, long=False) -> list:
+        """返回 [(serial, state, {属性})]，long=True 时包含 product/model/transport_id 等属性"""
+        output = self.host_query('host:devices-l' if long else 'host:devices')
+        return parse_device_list(output)
+
+    def track_devices(self, long=False, on_open=None):
+        """
+        长连接订阅 host:track-devices，每当设备列表变化时产出一次完整的 [(serial, state, {属性})]。
+        on_open(sock) 在连接建立后被调用，调用方可借此在其他线程中关闭套接字以结束订阅。
+        """
+        sock = self._open()
+        try:
+            self._send_request(sock, 'host:track-devices-l' if long else 'host:track-devices')
+            # 订阅是长连接，只在建立阶段使用超时
+            sock.settimeout(None)
+            if on_open: on_open(sock)
+            while True:
+                yield parse_device_list(self._read_length_prefixed(sock))
+        finally:
+            sock.close()
+
+    def get_state(self, serial) -> str:
+        return self.host_query(f"host-serial:{serial}:get-state" if serial else "host:get-state")
+
+    def connect_device(self, address: str) -> str:
+        return self.host_query(f"host:connect:{address}")
+
+    def disconnect_device(self, address: str) -> str:
+        return self.host_query(f"host:disconnect:{address}")
+
+    def kill_server(self):
+        self.host_command('host:kill')
+
+    def shell(self, serial, command: str, timeout=None) -> str:
+        with self.open_service(serial, f"shell:{command}", timeout) as sock:
+            return self._read_all(sock).decode('utf-8', errors='replace')
+
+    def shell_v2(self, serial, command: str, timeout=None) -> tuple:
+        """
+        通过 shell v2 协议执行命令 (与 adb 可执行文件相同，不分配 pty)，返回 (stdout, stderr, 退出码)。
+        设备不支持 shell v2 (Android 7 之前) 时抛出 AdbUnsupportedCommand，由调用方回退到 adb 可执行文件。
+        """
+        sock = self._open(timeout)
+        with sock:
+            self._send_request(sock, f"host:transport:{serial}" if serial else "host:transport-any")
+            try:
+                self._send_request(sock, f"shell,v2,raw:{command}")
+            except AdbError as e:
+                raise AdbUnsupportedCommand(f"设备不支持 shell v2: {e}")
+            streams = {SHELL_STDOUT: bytearray(), SHELL_STDERR: bytearray()}
+            while True:
+                packet_id, length = struct.unpack('<BI', self._read_exact(sock, 5))
+                data = self._read_exact(sock, length)
+                if packet_id == SHELL_EXIT:
+                    exit_code = data[0] if data else 0
+                    break
+                if packet_id in streams:
+                    streams[packet_id] += data
+        decode = lambda data: bytes(data).decode('utf-8', errors='replace')
+        return decode(streams[SHELL_STDOUT]), decode(streams[SHELL_STDERR]), exit_code
+
+    def shell_stream(self, serial, command: str, timeout=None):
+        """流式执行 shell 命令，逐块产出输出字节；timeout 为两次收到数据之间的最长等待"""
+        return self._stream_service(serial, f"shell:{command}", timeout)
+
+    def exec_stream(self, serial, command: str, timeout=None):
+        """与 shell_stream 相同，但使用 exec 服务 (adb exec-out)：不经过 pty，输出为原始字节"""
+        return self._stream_service(serial, f"exec:{command}", timeout)
+
+    def _stream_service(self, serial, service: str, timeout=None):
+        with self.open_service(serial, service, timeout) as sock:
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    return
+                yield chunk
+
+    def exec_out(self, serial, command: str, timeout=None) -> bytes:
+        with self.open_service(serial, f"exec:{command}", timeout) as sock:
+            return self._read_all(sock)
+
+    def tcpip(self, serial, port=5555) -> str:
+        with self.open_service(serial, f"tcpip:{port}") as sock:
+            return self._read_all(sock).decode('utf-8', errors='replace')
+
+    def run_cli(self, args: list, timeout=None) -> str:
+        """
+        以 adb 命令行参数的形式执行命令 (如 ['-s', 'xxx', 'shell', 'ip', 'route'])，返回去除首尾空白的输出。
+        shell 命令以非零状态退出时抛出 AdbCommandFailed (与 adb 可执行文件的失败一致)；
+        不支持的命令抛出 AdbUnsupportedCommand，由调用方回退到 adb 可执行文件。
+        """
+        args = list(args)
+        serial = os.environ.get('ANDROID_SERIAL')
+        if len(args) >= 2 and args[0] in ('-s', '--serial'):
+            serial, args = args[1], args[2:]
+        if not args:
+            raise AdbUnsupportedCommand("空命令")
+        command, rest = args[0], args[1:]
+
+        if command == 'devices':
+            long = rest == ['-l']
+            if rest and not long:
+                raise AdbUnsupportedCommand(' '.join(args))
+            payload = self.host_query('host:devices-l' if long else 'host:devices', timeout)
+            return f"List of devices attached\n{payload}".strip()
+        if command == 'shell' and rest and not rest[0].startswith('-'):
+            stdout, stderr, exit_code = self.shell_v2(serial, ' '.join(rest), timeout)
+            if exit_code != 0:
+                raise AdbCommandFailed(exit_code, stderr)
+            return stdout.strip()
+        if command == 'exec-out' and rest:
+            return self.exec_out(serial, ' '.join(rest), timeout).decode('utf-8', errors='replace').strip()
+        if command == 'connect' and len(rest) == 1:
+            return self.connect_device(rest[0]).strip()
+        if command == 'disconnect' and len(rest) == 1:
+            return self.disconnect_device(rest[0]).strip()
+        if command == 'tcpip' and len(rest) == 1:
+            return self.tcpip(serial, rest[0]).strip()
+        if command == 'get-state' and not rest:
+            return self.get_state(serial).strip()
+        if command == 'kill-server' and not rest:
+            self.kill_server()
+            return ''
+        raise AdbUnsupportedCommand(' '.join(args))
+
+
+def parse_device_list(output: str) -> list:
+    """解析 host:devices(-l) 的输出，返回 [(serial, state, {属性})]"""
+    devices = []
+    for line in output.splitlines():
+        parts = line.split()
+        if len(parts) < 2:
+            continue
+        if parts[1] == 'no' and len(parts) > 2 and parts[2].startswith('permissions'):
+            devices.append((parts[0], 'no permissions', {}))
+            continue
+        properties = dict(item.split(':', 1) for item in parts[2:] if ':' in item)
+        devices.append((parts[0], parts[1], properties))
+    return devices
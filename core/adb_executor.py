@@ -0,0 +1,244 @@
+import bisect
+import itertools
+import threading
+
+PRIORITY_HIGH = 0      # 用户直接触发、需要立即反馈的操作 (刷新、连接...)
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2       # 后台同步等可以等待的操作
+
+_local = threading.local()
+
+
+class TaskCancelled(Exception):
+    pass
+
+
+def current_task():
+    """返回当前线程正在执行的 AdbTask (不在执行器线程中时为 None)"""
+    return getattr(_local, 'task', None)
+
+
+def check_cancelled():
+    """供长时间运行的操作在循环中调用：所属任务已被取消时抛出 TaskCancelled"""
+    task = current_task()
+    if task is not None and task.cancel_requested:
+        raise TaskCancelled(task.name)
+
+
+class AdbTask:
+    """提交给 AdbExecutor 的一个操作，接口与 concurrent.futures.Future 相近"""
+
+    def __init__(self, executor, fn, args, kwargs, device, priority, key, name):
+        self.executor = executor
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.device = device
+        self.priority = priority
+        self.key = key
+        self.name = name or getattr(fn, '__name__', 'task')
+        self.state = 'queued'
+        self.cancel_requested = False
+        self._result = None
+        self._exception = None
+        self._callbacks = []
+        self._done = threading.Event()
+
+    def cancel(self) -> bool:
+        """排队中的任务直接移除；执行中的任务只做标记，由 check_cancelled() 或进程登记表协作结束"""
+        return self.executor._cancel(self)
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def cancelled(self) -> bool:
+        return self.state == 'cancelled'
+
+    def running(self) -> bool:
+        return self.state == 'running'
+
+    def wait(self, timeout=None) -> bool:
+        return self._done.wait(timeout)
+
+    def result(self, timeout=None):
+        if not self._done.wait(timeout):
+            raise TimeoutError(self.name)
+        if self.state == 'cancelled':
+            raise TaskCancelled(self.name)
+        if self._exception is not None:
+            raise self._exception
+        return self._result
+
+    def exception(self, timeout=None):
+        if not self._done.wait(timeout):
+            raise TimeoutError(self.name)
+        return self._exception
+
+    def add_done_callback(self, callback):
+        """callback(task) 在完成任务的线程中调用；任务已完成时立即调用"""
+        with self.executor._cond:
+            if not self._done.is_set():
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def _finish(self, state, result=None, exception=None):
+        with self.executor._cond:
+            self.state = state
+            self._result = result
+            self._exception = exception
+            callbacks, self._callbacks = self._callbacks, []
+            self._done.set()
+        for callback in callbacks:
+            callback(self)
+
+    def __repr__(self):
+        return f"<AdbTask {self.name} device={self.device} {self.state}>"
+
+
+class AdbExecutor:
+    """
+    【共享】ADB 操作执行器
+    所有面板的 adb 操作都提交到这里：全局最多 max_workers 个同时执行，同一设备的操作串行执行，
+    按优先级 (其次按提交顺序) 调度；key 相同的请求在前一个尚未完成时直接合并为同一个任务。
+    """
+
+    def __init__(self, max_workers=4, name='AdbExecutor'):
+        self.max_workers = max_workers
+        self.name = name
+        self._cond = threading.Condition()
+        self._queue = []            # 按 (优先级, 序号) 排序的 [(priority, seq, task)]
+        self._busy_devices = set()
+        self._inflight = {}         # key -> 排队或执行中的任务
+        self._running = set()
+        self._threads = []
+        self._idle = 0
+        self._seq = itertools.count()
+        self._shutdown = False
+        self.stats = {'submitted': 0, 'coalesced': 0, 'completed': 0, 'failed': 0, 'cancelled': 0}
+
+    def submit(self, fn, *args, device=None, priority=PRIORITY_NORMAL, key=None, name=None, **kwargs) -> AdbTask:
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("AdbExecutor 已关闭")
+            if key is not None:
+                existing = self._inflight.get(key)
+                if existing is not None and not existing.cancel_requested:
+                    self.stats['coalesced'] += 1
+                    if priority < existing.priority and existing.state == 'queued':
+                        self._requeue(existing, priority)
+                    return existing
+            task = AdbTask(self, fn, args, kwargs, device, priority, key, name)
+            if key is not None:
+                self._inflight[key] = task
+            bisect.insort(self._queue, (priority, next(self._seq), task))
+            self.stats['submitted'] += 1
+            if len(self._queue) > self._idle and len(self._threads) < self.max_workers:
+                thread = threading.Thread(target=self._worker, name=f"{self.name}-{len(self._threads)}", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+            else:
+                self._cond.notify()
+        return task
+
+    def _requeue(self, task, priority):
+        self._queue = [entry for entry in self._queue if entry[2] is not task]
+        task.priority = priority
+        bisect.insort(self._queue, (priority, next(self._seq), task))
+
+    def _next_runnable(self):
+        for index, (_, _, task) in enumerate(self._queue):
+            if task.device is None or task.device not in self._busy_devices:
+                del self._queue[index]
+                return task
+        return None
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                task = self._next_runnable()
+                while task is None:
+                    if self._shutdown:
+                        return
+                    self._idle += 1
+                    self._cond.wait()
+                    self._idle -= 1
+                    task = self._next_runnable()
+                task.state = 'running'
+                self._running.add(task)
+                if task.device is not None:
+                    self._busy_devices.add(task.device)
+            self._run(task)
+
+    def _run(self, task):
+        _local.task = task
+        try:
+            result = task.fn(*task.args, **task.kwargs)
+            exception = None
+        except TaskCancelled:
+            result, exception = None, None
+        except BaseException as e:
+            result, exception = None, e
+        finally:
+            _local.task = None
+        with self._cond:
+            self._running.discard(task)
+            if task.device is not None:
+                self._busy_devices.discard(task.device)
+            if task.key is not None and self._inflight.get(task.key) is task:
+                del self._inflight[task.key]
+            state = 'cancelled' if task.cancel_requested else ('failed' if exception else 'completed')
+            self.stats[state] += 1
+            # 设备释放后，等待该设备的任务可能已经可以执行
+            self._cond.notify_all()
+        task._finish(state, result, exception)
+
+    def _cancel(self, task) -> bool:
+        with self._cond:
+            if task.done():
+                return False
+            task.cancel_requested = True
+            if task.key is not None and self._inflight.get(task.key) is task:
+                del self._inflight[task.key]
+            if task.state != 'queued':
+                return True
+            self._queue = [entry for entry in self._queue if entry[2] is not task]
+            self.stats['cancelled'] += 1
+        task._finish('cancelled')
+        return True
+
+    def cancel_all(self, device=None):
+        """取消全部 (或指定设备的) 排队中与执行中的任务"""
+        with self._cond:
+            tasks = [entry[2] for entry in self._queue] + list(self._running)
+        for task in tasks:
+            if device is None or task.device == device:
+                task.cancel()
+
+    def pending_count(self) -> int:
+        with self._cond:
+            return len(self._queue)
+
+    def shutdown(self, wait=True, timeout=5.0):
+        """停止接收新任务，取消排队中的任务，并 (可选) 等待执行中的任务结束"""
+        self.cancel_all()
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+            threads = list(self._threads)
+        if wait:
+            for thread in threads:
+                thread.join(timeout)
+
+
+_default_executor = None
+_default_lock = threading.Lock()
+
+
+def default_executor() -> AdbExecutor:
+    """整个程序共享的执行器，第一次使用时创建"""
+    global _default_executor
+    with _default_lock:
+        if _default_executor is None:
+            _default_executor = AdbExecutor()
+        return _default_executor
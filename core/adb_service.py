@@ -0,0 +1,287 @@
+import os
+import subprocess
+from core.adb_executor import check_cancelled, TaskCancelled
+from core.events import Event
+from core.log_pipeline import LineSplitter
+from core.process_registry import registry
+from core.adb_client import AdbClient, AdbError, AdbConnectionError, AdbUnsupportedCommand
+from core.app_labels import build_label_script, parse_label_stream, chunk_entries
+from core.app_cache import parse_package_listing, fingerprint
+from core.session_engine import SCRCPY_EXECUTABLE
+# core.device_media / core.link_probe / core.encoder_bench 只在对应操作中导入：
+# 无界面入口与设备列表等常用操作用不到它们，不必在启动时付出导入开销
+
+# 与 scrcpy 一致，允许通过 ADB 环境变量指定 adb 可执行文件
+ADB_EXECUTABLE = os.environ.get('ADB', 'adb')
+
+
+class AdbService:
+    """
+    【无界面】ADB 操作集合，不依赖 Qt。方法均为阻塞调用，应在后台线程中执行；
+    进度与结果通过 Event 钩子在调用线程中发出。
+    """
+
+    def __init__(self, adb_client: AdbClient = None):
+        self.refreshed = Event()           # (设备列表, 日志)
+        self.command_finished = Event()    # (日志,)
+        self.packages_listed = Event()     # (应用列表,)
+        self.packages_synced = Event()     # (序列号, 完整列表或 None, {包名: 应用名})
+        self.auto_pair_step = Event()      # (日志,)
+        self.auto_pair_finished = Event()  # (日志,)
+        self.adb_client = adb_client or AdbClient()
+
+    def _run_adb_command_safe(self, cmd: list, timeout=15):
+        """优先通过 ADB 服务的 socket 协议执行；服务未启动或命令不受支持时回退到 adb 子进程"""
+        try:
+            return self.adb_client.run_cli(cmd[1:], timeout=timeout)
+        except (AdbConnectionError, AdbUnsupportedCommand):
+            pass
+        except TimeoutError:
+            raise Exception(f"命令 '{' '.join(cmd)}' 执行超时")
+        except (AdbError, OSError) as e:
+            raise Exception(f"执行 '{' '.join(cmd)}' 时出错: {e}")
+        return self._run_adb_subprocess([ADB_EXECUTABLE] + cmd[1:], timeout)
+
+    def _run_adb_subprocess(self, cmd: list, timeout=15):
+        try:
+            # 超时或任务被取消时，登记表会结束 adb 及其派生的全部进程
+            result = registry.run(cmd, timeout=timeout, capture_output=True, text=True,
+                                  encoding='utf-8', errors='replace', label='adb')
+            if result.returncode != 0:
+                raise Exception(result.stderr.strip() or f"命令返回了非零代码: {result.returncode}")
+            return result.stdout.strip()
+        except FileNotFoundError:
+            raise Exception("adb.exe 未找到")
+        except subprocess.TimeoutExpired:
+            raise Exception(f"命令 '{' '.join(cmd)}' 执行超时")
+        except TaskCancelled:
+            raise
+        except Exception as e:
+            raise Exception(f"执行 '{' '.join(cmd)}' 时出错: {e}")
+
+    def refresh_devices(self, retries=0):
+        try:
+            output = self._run_adb_command_safe(['adb', 'devices'])
+            lines = output.strip().split('\n')
+            devices = [line.split('\t')[0] for line in lines[1:] if '\tdevice' in line]
+            log_msg = f"找到设备: {', '.join(devices)}" if devices else "未找到已连接的设备。"
+        except Exception as e:
+            devices, log_msg = [], f"获取设备列表失败: {e}"
+        self.refreshed.emit(devices, log_msg)
+        return devices, log_msg
+
+    def _stream_adb_shell(self, device_serial, command: str, timeout=30):
+        """逐行产出 adb shell 命令的输出；优先走 socket 协议，服务不可用时回退到 adb 子进程"""
+        splitter = LineSplitter('utf-8')
+        for chunk in self._stream_adb_raw(device_serial, 'shell', command, timeout):
+            yield from splitter.feed(chunk)
+        yield from splitter.flush()
+
+    def _stream_adb_raw(self, device_serial, service: str, command: str, timeout=30):
+        """
+        逐块产出 adb shell / exec-out (service 为 'shell' 或 'exec') 的原始输出字节，
+        优先走 socket 协议，服务不可用时回退到 adb 子进程；调用方提前结束迭代时会结束对应的进程。
+        """
+        stream = self.adb_client.shell_stream if service == 'shell' else self.adb_client.exec_stream
+        name = 'adb shell' if service == 'shell' else 'adb exec-out'
+        try:
+            for chunk in stream(device_serial, command, timeout=timeout):
+                check_cancelled()
+                yield chunk
+            return
+        except AdbConnectionError:
+            pass
+        except TimeoutError:
+            raise Exception(f"命令 '{name}' 在 {timeout} 秒内没有输出")
+        except (AdbError, OSError) as e:
+            raise Exception(f"执行 '{name}' 时出错: {e}")
+
+        cmd = [ADB_EXECUTABLE]
+        if device_serial: cmd.extend(['-s', device_serial])
+        cmd.extend(['shell' if service == 'shell' else 'exec-out', command])
+        try:
+            process = registry.popen(cmd, label='adb', stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        except FileNotFoundError:
+            raise Exception("adb.exe 未找到")
+        try:
+            for chunk in iter(lambda: process.stdout.read1(65536), b''):
+                check_cancelled()
+                yield chunk
+        finally:
+            process.stdout.close()
+            if process.poll() is None: registry.kill_tree(process, 'cancel')
+            process.wait()
+            registry.release(process)
+
+    def list_packages_with_names(self, device_serial=None):
+        """在一次 shell 会话中查询全部第三方应用的名称，边接收边解析以便报告进度"""
+        try:
+            self.command_finished.emit("正在获取第三方应用包名...")
+            app_list = []
+            total = 0
+            lines = self._stream_adb_shell(device_serial, build_label_script())
+            for event, value in parse_label_stream(lines):
+                if event == 'total':
+                    total = value
+                    self.command_finished.emit(f"找到 {total} 个应用，正在查询应用名...")
+                elif event == 'no_label_tool':
+                    self.command_finished.emit("设备上没有 aapt，将以包名代替应用名。")
+                elif event == 'app':
+                    app_list.append(value)
+                    done = len(app_list)
+                    if done % 10 == 0 or done == total:
+                        self.command_finished.emit(f"进度: {done}/{total} ({value['name']})")
+            self.packages_listed.emit(app_list)
+            self.command_finished.emit(f"成功获取 {len(app_list)} 个应用的详细信息。")
+        except TaskCancelled:
+            raise
+        except Exception as e:
+            self.command_finished.emit(f"获取应用列表失败: {e}")
+            self.packages_listed.emit([])
+
+    def list_packages_incremental(self, device_serial, known_fingerprints: dict):
+        """
+        增量同步：一次廉价的 pm list 获取包名/版本/路径，只为新增或已更新的应用查询名称。
+        完成后发出 packages_synced(序列号, 完整列表, {包名: 新查询到的应用名})；失败时完整列表为 None。
+        """
+        try:
+            self.command_finished.emit("正在获取第三方应用列表...")
+            base_cmd = ['adb', '-s', device_serial] if device_serial else ['adb']
+            try:
+                output = self._run_adb_command_safe(
+                    base_cmd + ['shell', 'pm', 'list', 'packages', '-f', '-3', '--show-versioncode'])
+                listing = parse_package_listing(output)
+            except Exception:
+                listing = {}
+            if not listing:
+                # 旧版本 Android 的 pm 不支持 --show-versioncode，只能依据安装路径判断更新
+                output = self._run_adb_command_safe(base_cmd + ['shell', 'pm', 'list', 'packages', '-f', '-3'])
+                listing = parse_package_listing(output)
+
+            stale = [(info['path'], package) for package, info in listing.items()
+                     if known_fingerprints.get(package) != fingerprint(info['path'], info['version'])]
+            removed = len(known_fingerprints.keys() - listing.keys())
+            self.command_finished.emit(
+                f"共 {len(listing)} 个应用，其中 {len(stale)} 个新增或已更新，{removed} 个已卸载。")
+
+            labels = {}
+            if stale:
+                # 全部需要查询时使用自带列表的脚本，避免把几百个路径塞进请求里
+                scripts = [build_label_script()] if len(stale) == len(listing) else \
+                    [build_label_script(batch) for batch in chunk_entries(stale)]
+                total = len(stale)
+                for script in scripts:
+                    for event, value in parse_label_stream(self._stream_adb_shell(device_serial, script)):
+                        if event == 'no_label_tool' and not labels:
+                            self.command_finished.emit("设备上没有 aapt，将以包名代替应用名。")
+                        elif event == 'app':
+                            labels[value['package']] = value['name']
+                            done = len(labels)
+                            if done % 10 == 0 or done == total:
+                                self.command_finished.emit(f"进度: {done}/{total} ({value['name']})")
+            self.packages_synced.emit(device_serial or '', listing, labels)
+        except TaskCancelled:
+            raise
+        except Exception as e:
+            self.command_finished.emit(f"获取应用列表失败: {e}")
+            self.packages_synced.emit(device_serial or '', None, {})
+
+    def kill_server(self):
+        try:
+            self._run_adb_command_safe(['adb', 'kill-server'])
+            self.command_finished.emit("ADB 服务已成功关闭。")
+        except Exception as e:
+            self.command_finished.emit(f"关闭 ADB 服务失败: {e}")
+
+    def restart_server(self):
+        try:
+            self.command_finished.emit("尝试关闭现有 ADB 服务...")
+            self._run_adb_command_safe(['adb', 'kill-server'], timeout=5)
+            self.command_finished.emit("正在启动新的 ADB 服务...")
+            output = self._run_adb_command_safe(['adb', 'start-server'])
+            clean_output = output.replace('\n', ' ').strip()
+            if 'successfully' in clean_output or clean_output == '':
+                self.command_finished.emit("ADB 服务已成功重启！")
+            else:
+                self.command_finished.emit(f"重启 ADB 服务可能存在问题: {clean_output}")
+        except Exception as e:
+            self.command_finished.emit(f"重启 ADB 服务时发生严重错误: {e}")
+
+    def enable_tcpip_mode(self, device_serial=None):
+        cmd = ['adb']
+        if device_serial: cmd.extend(['-s', device_serial])
+        cmd.extend(['tcpip', '5555'])
+        return self._run_adb_command_safe(cmd, timeout=10)
+
+    def connect_to_device(self, ip_address):
+        return self._run_adb_command_safe(['adb', 'connect', ip_address])
+
+    def disconnect_from_device(self, ip_address):
+        return self._run_adb_command_safe(['adb', 'disconnect', ip_address])
+
+    def get_device_ip(self, device_serial=None):
+        cmd = ['adb']
+        if device_serial: cmd.extend(['-s', device_serial])
+        cmd.extend(['shell', 'ip', 'route'])
+        output = self._run_adb_command_safe(cmd, timeout=10)
+        ip_addresses = [word for word in output.split() if '.' in word and all(p.isdigit() for p in word.split('.'))]
+        if ip_addresses:
+            return ip_addresses[-1]
+        raise Exception("无法解析IP地址。")
+
+    def get_build_fingerprint(self, device_serial):
+        cmd = ['adb', '-s', device_serial, 'shell', 'getprop', 'ro.build.fingerprint']
+        return self._run_adb_command_safe(cmd, timeout=10)
+
+    def probe_media(self, device_serial, kinds, known_fingerprint=None, fresh=()):
+        """
+        通过 scrcpy --list-xxx 查询设备的编码器 / 显示器 / 摄像头 (见 core.device_media.MEDIA_PROBES)，
+        跳过 fresh 中仍有效的类别；设备的构建指纹与 known_fingerprint 不同 (如系统已升级) 时全部重新查询。
+        返回 (指纹, {类别: 列表})。
+        """
+        fingerprint = self.get_build_fingerprint(device_serial)
+        if fingerprint != known_fingerprint:
+            fresh = ()
+        results = {}
+        for kind in kinds:
+            if kind in fresh:
+                continue
+            check_cancelled()
+            from core.device_media import MEDIA_PROBES, run_list_command
+            flag, parse = MEDIA_PROBES[kind]
+            results[kind] = parse(run_list_command(SCRCPY_EXECUTABLE, device_serial, flag))
+        return fingerprint, results
+
+    def probe_link(self, device_serial):
+        """测量到设备的往返延迟与持续吞吐量 (见 core.link_probe.measure_link)"""
+        from core.link_probe import measure_link
+        return measure_link(lambda command: self._stream_adb_raw(device_serial, 'exec', command, timeout=10))
+
+    def benchmark_encoders(self, device_serial, candidates, max_size=None, seconds=None):
+        """
+        依次以无界面模式测试每个 {'codec', 'encoder'} 组合 (见 core.encoder_bench)，每个组合运行 seconds 秒
+        (默认 TRIAL_SECONDS)，进度通过 command_finished 发出。返回 (指纹, 按帧率从高到低排序的结果列表)。
+        """
+        from core.encoder_bench import run_trial, rank_results, candidate_label, TRIAL_SECONDS
+        seconds = TRIAL_SECONDS if seconds is None else seconds
+        fingerprint = self.get_build_fingerprint(device_serial)
+        results = []
+        for index, candidate in enumerate(candidates, 1):
+            check_cancelled()
+            self.command_finished.emit(f"编码器测试 {index}/{len(candidates)}: {candidate_label(candidate)} ...")
+            results.append(run_trial(SCRCPY_EXECUTABLE, device_serial, candidate, max_size, seconds))
+        return fingerprint, rank_results(results)
+
+    def auto_pair_sequence(self, usb_device_serial):
+        try:
+            self.auto_pair_step.emit("步骤1: 正在获取USB设备IP地址...")
+            ip_address = self.get_device_ip(usb_device_serial)
+            self.auto_pair_step.emit(f"获取到IP地址: {ip_address}")
+            self.auto_pair_step.emit("步骤2: 正在为设备开启TCP/IP模式...")
+            self.enable_tcpip_mode(usb_device_serial)
+            self.auto_pair_step.emit(f"步骤3: 正在通过无线方式连接到 {ip_address}...")
+            connect_output = self.connect_to_device(ip_address)
+            self.auto_pair_step.emit(f"连接结果: {connect_output}")
+            self.auto_pair_finished.emit("自动配对完成！请拔下USB线，并刷新设备列表查看。")
+        except Exception as e:
+            self.auto_pair_finished.emit(f"自动配对失败: {e}")
\ No newline at end of file
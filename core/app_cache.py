@@ -0,0 +1,96 @@
+import json
+import os
+import time
+
+
+class AppListCache:
+    """
+    【按设备】应用列表缓存
+    每台设备 (序列号) 单独保存 {包名: {name, version, path}}；versionCode 或安装路径变化即视为应用已更新。
+    最多保留 max_devices 台设备，超出时淘汰最久未使用的设备。
+    """
+    FORMAT_VERSION = 2
+
+    def __init__(self, path: str, max_devices=10):
+        self.path = path
+        self.max_devices = max_devices
+        self.devices = {}
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        if isinstance(data, dict) and data.get('format') == self.FORMAT_VERSION:
+            self.devices = data.get('devices', {})
+
+    def save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'format': self.FORMAT_VERSION, 'devices': self.devices}, f,
+                      ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+
+    def apps(self, serial) -> list:
+        """返回 [{'name', 'package'}]，按应用名排序"""
+        entry = self.devices.get(serial)
+        if not entry:
+            return []
+        entry['last_used'] = time.time()
+        apps = [{'name': info['name'], 'package': package} for package, info in entry['apps'].items()]
+        return sorted(apps, key=lambda app: app['name'].lower())
+
+    def fingerprints(self, serial) -> dict:
+        """{包名: 指纹}，用于判断哪些应用需要重新查询名称"""
+        entry = self.devices.get(serial) or {'apps': {}}
+        return {package: fingerprint(info.get('path'), info.get('version')) for package, info in entry['apps'].items()}
+
+    def apply_sync(self, serial, listing: dict, labels: dict) -> tuple:
+        """
+        合并一次增量同步的结果。listing: {包名: {'path', 'version'}} 为设备上当前的完整列表；
+        labels: {包名: 应用名} 只包含本次重新查询的应用。返回 (新增数, 更新数, 移除数)。
+        """
+        entry = self.devices.setdefault(serial, {'apps': {}})
+        old_apps = entry['apps']
+        new_apps = {}
+        added = changed = 0
+        for package, info in listing.items():
+            previous = old_apps.get(package)
+            if package in labels or previous is None:
+                if previous is None:
+                    added += 1
+                else:
+                    changed += 1
+                name = labels.get(package) or package
+            else:
+                name = previous['name']
+            new_apps[package] = {'name': name, 'version': info.get('version'), 'path': info.get('path')}
+        removed = len(old_apps.keys() - listing.keys())
+        entry['apps'] = new_apps
+        entry['last_used'] = time.time()
+        self._evict()
+        return added, changed, removed
+
+    def _evict(self):
+        while len(self.devices) > self.max_devices:
+            oldest = min(self.devices, key=lambda serial: self.devices[serial].get('last_used', 0))
+            del self.devices[oldest]
+
+
+def fingerprint(path, version) -> str:
+    return f"{version or ''}|{path or ''}"
+
+
+def parse_package_listing(output: str) -> dict:
+    """解析 `pm list packages -f [--show-versioncode]` 的输出为 {包名: {'path', 'version'}}"""
+    listing = {}
+    for line in output.splitlines():
+        line = line.strip()
+        if not line.startswith('package:'):
+            continue
+        line, _, version = line[len('package:'):].partition(' versionCode:')
+        path, _, package = line.rpartition('=')
+        if package:
+            listing[package] = {'path': path, 'version': version.strip() or None}
+    return listing
@@ -0,0 +1,123 @@
+import bisect
+import re
+from collections import defaultdict
+
+_TOKEN_SPLIT = re.compile(r'[^0-9a-z一-鿿]+')
+
+
+def _trigrams(text: str):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class AppSearchIndex:
+    """
+    【索引版】应用搜索
+    为应用名和包名预先建立三元组 (trigram) 倒排索引与词前缀索引，按匹配程度排序返回结果，
+    输入有少量错字时也能通过三元组重合度找到候选。
+    """
+
+    FUZZY_THRESHOLD = 0.5
+    # 精确/前缀/子串命中少于该数量时才进行模糊匹配
+    FUZZY_MIN_RESULTS = 20
+
+    def __init__(self, apps=()):
+        self.rebuild(apps)
+
+    def rebuild(self, apps):
+        """apps: [{'name', 'package'}]"""
+        self.apps = list(apps)
+        self._names = [app['name'].lower() for app in self.apps]
+        self._packages = [app['package'].lower() for app in self.apps]
+        # 同一档匹配内按“名称短者优先、再按字母序”排列，预先算好名次以便用 C 层排序
+        self._order = sorted(range(len(self.apps)), key=lambda i: (len(self._names[i]), self._names[i]))
+        self._rank = [0] * len(self.apps)
+        for rank, i in enumerate(self._order):
+            self._rank[i] = rank
+
+        self._exact = defaultdict(list)
+        self._trigram_index = defaultdict(list)
+        tokens = []
+        for i, (name, package) in enumerate(zip(self._names, self._packages)):
+            self._exact[name].append(i)
+            self._exact[package].append(i)
+            for gram in _trigrams(name) | _trigrams(package):
+                self._trigram_index[gram].append(i)
+            words = set(_TOKEN_SPLIT.split(name)) | set(package.split('.'))
+            tokens.extend((word, i) for word in words if word)
+        self._name_prefix = self._sorted_keys((name, i) for i, name in enumerate(self._names))
+        self._package_prefix = self._sorted_keys((package, i) for i, package in enumerate(self._packages))
+        self._token_prefix = self._sorted_keys(tokens)
+
+    @staticmethod
+    def _sorted_keys(pairs):
+        pairs = sorted(pairs)
+        return [key for key, _ in pairs], [i for _, i in pairs]
+
+    def __len__(self):
+        return len(self.apps)
+
+    @staticmethod
+    def _prefix_range(prefix_index, query: str):
+        keys, ids = prefix_index
+        start = bisect.bisect_left(keys, query)
+        end = bisect.bisect_left(keys, query + '\uffff', start)
+        return ids[start:end]
+
+    def search(self, query: str, limit=200) -> list:
+        """
+        返回按相关度排序的应用下标列表。匹配档次依次为：完全相同、名称前缀、包名前缀、
+        单词前缀、子串、三元组模糊匹配；同档内名称越短越靠前。
+        """
+        query = query.strip().lower()
+        if not query:
+            return self._order[:limit]
+
+        results = []
+        seen = set()
+
+        def take(ids) -> bool:
+            for i in sorted(ids, key=self._rank.__getitem__):
+                if i not in seen:
+                    seen.add(i)
+                    results.append(i)
+                    if len(results) >= limit:
+                        return True
+            return False
+
+        if take(self._exact.get(query, ())) or \
+                take(self._prefix_range(self._name_prefix, query)) or \
+                take(self._prefix_range(self._package_prefix, query)) or \
+                take(self._prefix_range(self._token_prefix, query)):
+            return results
+
+        if len(query) < 3:
+            # 一两个字符无法使用三元组索引，按名次顺序线性扫描，凑满即停
+            for i in self._order:
+                if i not in seen and (query in self._names[i] or query in self._packages[i]):
+                    results.append(i)
+                    if len(results) >= limit:
+                        break
+            return results
+
+        grams = _trigrams(query)
+        postings = sorted((self._trigram_index.get(gram, []) for gram in grams), key=len)
+        exact = set(postings[0]) if postings else set()
+        for posting in postings[1:]:
+            exact.intersection_update(posting)
+            if not exact:
+                break
+        if take(i for i in exact if query in self._names[i] or query in self._packages[i]):
+            return results
+
+        if len(results) < self.FUZZY_MIN_RESULTS:
+            # 模糊匹配：按三元组重合比例补充候选 (容忍错字、漏字)
+            counts = {}
+            for posting in postings:
+                for i in posting:
+                    counts[i] = counts.get(i, 0) + 1
+            needed = self.FUZZY_THRESHOLD * len(grams)
+            fuzzy = sorted((-count, self._rank[i], i) for i, count in counts.items()
+                           if count >= needed and i not in seen)
+            take_count = limit - len(results)
+            results.extend(i for _, _, i in fuzzy[:take_count])
+        return results
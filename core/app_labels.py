@@ -0,0 +1,79 @@
+"""
+应用名解析：生成一段在设备上运行的 shell 脚本，在一次 adb shell 会话内查询所有应用的名称，
+并以流的方式解析其输出。
+"""
+
+MARKER = '@@RIX'
+
+# 设备上优先使用 aapt，其次 aapt2 (aapt2 不接受缩写的 "d"，两者都写完整的 dump)；都没有时只输出包名，避免对每个应用重复执行注定失败的命令
+_RESOLVE_BODY = (
+    '[ -n "$l" ] || continue; l=${l#package:}; p=${l##*=}; a=${l%=*}; '
+    f'echo "{MARKER} PKG $p"; '
+    'if [ -n "$T" ]; then "$T" dump badging "$a" 2>/dev/null | grep -m1 "application-label:"; fi'
+)
+_DETECT_TOOL = (
+    'T=$(command -v aapt || command -v aapt2); '
+    f'[ -z "$T" ] && echo "{MARKER} NOTOOL"; '
+)
+
+
+def build_label_script(entries=None) -> str:
+    """
+    entries 为 None 时解析全部第三方应用；否则为 [(apk 路径, 包名)]，只解析这些应用。
+    """
+    if entries is None:
+        return (_DETECT_TOOL +
+                'L=$(pm list packages -f -3); '
+                f'echo "{MARKER} TOTAL $(echo "$L" | grep -c "^package:")"; '
+                f'echo "$L" | while IFS= read -r l; do {_RESOLVE_BODY}; done')
+    items = ' '.join(f"'{path}={package}'" for path, package in entries)
+    return (_DETECT_TOOL +
+            f'echo "{MARKER} TOTAL {len(entries)}"; '
+            f'for l in {items}; do {_RESOLVE_BODY}; done')
+
+
+def chunk_entries(entries, max_chars=3500):
+    """把 [(路径, 包名)] 切分成若干批，使每批生成的脚本不超过 ADB 服务请求长度的常见上限"""
+    batch, size = [], 0
+    for path, package in entries:
+        item_size = len(path) + len(package) + 4
+        if batch and size + item_size > max_chars:
+            yield batch
+            batch, size = [], 0
+        batch.append((path, package))
+        size += item_size
+    if batch:
+        yield batch
+
+
+def _parse_label(line: str):
+    value = line.split('application-label:', 1)[1]
+    if "'" in value:
+        start, end = value.index("'") + 1, value.rindex("'")
+        value = value[start:end] if end >= start else value[start:]
+    return value.strip() or None
+
+
+def parse_label_stream(lines):
+    """
+    逐行解析脚本输出，产出事件：
+    ('total', 数量)、('no_label_tool', None)、('app', {'name': 应用名, 'package': 包名})
+    """
+    package, label = None, None
+    for line in lines:
+        line = line.strip()
+        if line.startswith(MARKER):
+            parts = line.split(' ', 2)
+            kind = parts[1] if len(parts) > 1 else ''
+            if kind == 'PKG' and len(parts) == 3:
+                if package:
+                    yield 'app', {'name': label or package, 'package': package}
+                package, label = parts[2], None
+            elif kind == 'TOTAL' and len(parts) == 3 and parts[2].isdigit():
+                yield 'total', int(parts[2])
+            elif kind == 'NOTOOL':
+                yield 'no_label_tool', None
+        elif package and label is None and 'application-label:' in line:
+            label = _parse_label(line)
+    if package:
+        yield 'app', {'name': label or package, 'package': package}
@@ -0,0 +1,242 @@
+"""
+设备编码器 / 显示器 / 摄像头信息：解析 scrcpy --list-encoders / --list-displays / --list-camera-sizes 的输出，
+并按设备缓存。缓存条目记录设备的系统构建指纹 (ro.build.fingerprint)，指纹变化 (系统升级) 或超过有效期即视为过期。
+"""
+import json
+import os
+import re
+import subprocess
+import time
+from core.process_registry import registry
+
+# "    --video-codec=h264 --video-encoder=c2.qti.avc.encoder    (hw) [vendor] (alias for ...)"
+# 旧版本: "    --video-codec=h264 --video-encoder='OMX.qcom.video.encoder.avc'"
+_ENCODER_LINE = re.compile(r"--(video|audio)-codec=(\S+)\s+--\1-encoder='?([^'\s]+)'?(.*)$")
+_ENCODER_MODE = re.compile(r'\((hw|sw|hybrid)\)')
+_ENCODER_ALIAS = re.compile(r'\(alias for ([^)\s]+)\)')
+# "    --display-id=0    (1080x2400)"
+_DISPLAY_LINE = re.compile(r'--display-id=(\d+)(?:\s+\((\d+)x(\d+)\))?')
+# "    --camera-id=0    (back, 4000x3000, fps=[15, 24, 30])"
+_CAMERA_LINE = re.compile(r'--camera-id=(\S+)\s+\((\w+), (\d+)x(\d+), fps=\[([\d, ]*)\]\)')
+# "        - 1920x1080" / 高速模式下 "            - 1280x720 (fps=[120, 240])"
+_CAMERA_SIZE_LINE = re.compile(r'^\s+- (\d+)x(\d+)(?: \(fps=\[([\d, ]*)\]\))?\s*$')
+_ERROR_LINE = re.compile(r'^ERROR:\s*(.+)$', re.MULTILINE)
+
+
+def parse_encoders(output: str) -> list:
+    """返回 [{'type': 'video'|'audio', 'codec', 'name', 'mode': 'hw'|'sw'|'hybrid'|None, 'vendor', 'alias'}]"""
+    encoders = []
+    for line in output.splitlines():
+        match = _ENCODER_LINE.search(line)
+        if not match:
+            continue
+        kind, codec, name, tail = match.groups()
+        mode = _ENCODER_MODE.search(tail)
+        alias = _ENCODER_ALIAS.search(tail)
+        encoders.append({'type': kind, 'codec': codec, 'name': name, 'mode': mode.group(1) if mode else None,
+                         'vendor': '[vendor]' in tail, 'alias': alias.group(1) if alias else None})
+    return encoders
+
+
+def parse_displays(output: str) -> list:
+    """返回 [{'id': int, 'width': int|None, 'height': int|None}]"""
+    displays = []
+    for match in _DISPLAY_LINE.finditer(output):
+        display_id, width, height = match.groups()
+        displays.append({'id': int(display_id), 'width': int(width) if width else None,
+                         'height': int(height) if height else None})
+    return displays
+
+
+def _fps_list(text):
+    return [int(fps) for fps in text.replace(' ', '').split(',') if fps]
+
+
+def parse_cameras(output: str) -> list:
+    """
+    解析 --list-cameras 或 --list-camera-sizes 的输出，返回
+    [{'id', 'facing', 'width', 'height', 'fps': [...], 'sizes': [[w, h]], 'high_speed': [{'width', 'height', 'fps'}]}]
+    """
+    cameras = []
+    camera = None
+    high_speed = False
+    for line in output.splitlines():
+        match = _CAMERA_LINE.search(line)
+        if match:
+            camera_id, facing, width, height, fps = match.groups()
+            camera = {'id': camera_id, 'facing': facing, 'width': int(width), 'height': int(height),
+                      'fps': _fps_list(fps), 'sizes': [], 'high_speed': []}
+            cameras.append(camera)
+            high_speed = False
+            continue
+        if camera is None:
+            continue
+        if 'High speed capture' in line:
+            high_speed = True
+            continue
+        match = _CAMERA_SIZE_LINE.match(line)
+        if not match:
+            continue
+        width, height, fps = match.groups()
+        if high_speed and fps:
+            camera['high_speed'].append({'width': int(width), 'height': int(height), 'fps': _fps_list(fps)})
+        else:
+            camera['sizes'].append([int(width), int(height)])
+    return cameras
+
+
+def _fits(width, height, resolution):
+    """resolution 为 (宽, 高) 时不区分横竖，为整数时限制最长边；None 表示不限制"""
+    if resolution is None:
+        return True
+    if isinstance(resolution, int):
+        return max(width, height) <= resolution
+    limit_w, limit_h = resolution
+    return (width <= limit_w and height <= limit_h) or (width <= limit_h and height <= limit_w)
+
+
+def parse_resolution(text: str):
+    """'1920x1080' -> (1920, 1080)，'1080' -> 1080，空字符串 -> None；格式错误时抛出 ValueError"""
+    text = text.strip().lower()
+    if not text:
+        return None
+    if 'x' in text:
+        width, _, height = text.partition('x')
+        return int(width), int(height)
+    return int(text)
+
+
+def best_camera_mode(cameras: list, resolution=None, target_fps=None, facing=None, camera_id=None):
+    """
+    在摄像头能力矩阵中选出吞吐量 (宽 x 高 x 帧率，超出 target_fps 的帧不计) 最高的有效组合：
+    尺寸不超过 resolution，帧率不低于 target_fps (取满足要求的最低一档，不浪费带宽)；
+    可按朝向或摄像头 ID 限定。没有组合满足帧率要求时，返回能达到的最高帧率组合并标记 meets_target=False。
+    返回 {'camera_id', 'facing', 'width', 'height', 'fps', 'high_speed', 'throughput', 'meets_target'}，无可用组合时返回 None。
+    """
+    candidates = []
+    for camera in cameras:
+        if camera_id is not None and camera['id'] != camera_id:
+            continue
+        if facing and camera['facing'] != facing:
+            continue
+        modes = [(width, height, camera['fps'], False) for width, height in camera['sizes'] or
+                 [[camera['width'], camera['height']]]]
+        modes += [(mode['width'], mode['height'], mode['fps'], True) for mode in camera['high_speed']]
+        for width, height, fps_list, high_speed in modes:
+            if not fps_list or not _fits(width, height, resolution):
+                continue
+            usable = [fps for fps in fps_list if target_fps is None or fps >= target_fps]
+            meets_target = bool(usable)
+            fps = (min(usable) if target_fps else max(usable)) if usable else max(fps_list)
+            candidates.append({'camera_id': camera['id'], 'facing': camera['facing'], 'width': width,
+                               'height': height, 'fps': fps, 'high_speed': high_speed,
+                               'throughput': width * height * min(fps, target_fps or fps),
+                               'meets_target': meets_target})
+    if not candidates:
+        return None
+    # 吞吐量相同时帧率越接近目标越好，再优先普通模式 (高速模式限制更多)；都不满足帧率要求时比能达到的帧率
+    def rank(mode):
+        if mode['meets_target']:
+            return (True, mode['throughput'], -mode['fps'] if target_fps else mode['fps'], not mode['high_speed'])
+        return (False, mode['fps'], mode['throughput'], not mode['high_speed'])
+    return max(candidates, key=rank)
+
+
+def camera_mode_args(mode: dict) -> list:
+    args = ['--camera-id', mode['camera_id'], '--camera-size', f"{mode['width']}x{mode['height']}",
+            '--camera-fps', str(mode['fps'])]
+    if mode['high_speed']: args.append('--camera-high-speed')
+    return args
+
+
+def run_list_command(scrcpy: str, serial: str, flag: str, timeout=20) -> str:
+    """在指定设备上执行 scrcpy --list-xxx，返回全部输出；失败时抛出带 scrcpy 错误信息的 Exception"""
+    cmd = [scrcpy, flag] if not serial else [scrcpy, '--serial', serial, flag]
+    try:
+        result = registry.run(cmd, timeout=timeout, capture_output=True, text=True,
+                              encoding='utf-8', errors='replace', label='scrcpy')
+    except FileNotFoundError:
+        raise Exception("scrcpy 命令未找到")
+    except subprocess.TimeoutExpired:
+        raise Exception(f"scrcpy {flag} 在 {timeout} 秒内没有完成")
+    output = result.stdout + result.stderr
+    if result.returncode != 0:
+        errors = _ERROR_LINE.findall(output)
+        raise Exception(errors[-1].strip() if errors else f"scrcpy {flag} 返回了非零代码: {result.returncode}")
+    return output
+
+
+# 每类信息对应的 scrcpy 参数与解析函数
+MEDIA_PROBES = {
+    'encoders': ('--list-encoders', parse_encoders),
+    'displays': ('--list-displays', parse_displays),
+    'cameras': ('--list-camera-sizes', parse_cameras),
+}
+
+
+class DeviceMediaCache:
+    """
+    【按设备】编码器、显示器与摄像头缓存
+    编码器与摄像头能力只随系统版本变化，有效期较长；显示器会因投屏、外接显示器等变化，有效期较短。
+    encoder_ranking 为编码器基准测试的排名 (见 core.encoder_bench)，同样在系统升级后失效。
+    """
+    FORMAT_VERSION = 1
+    TTL = {'encoders': 7 * 24 * 3600, 'displays': 10 * 60, 'cameras': 7 * 24 * 3600,
+           'encoder_ranking': 30 * 24 * 3600}
+
+    def __init__(self, path: str, max_devices=20):
+        self.path = path
+        self.max_devices = max_devices
+        self.devices = {}
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        if isinstance(data, dict) and data.get('format') == self.FORMAT_VERSION:
+            self.devices = data.get('devices', {})
+
+    def save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'format': self.FORMAT_VERSION, 'devices': self.devices}, f,
+                      ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+
+    def get(self, serial):
+        """返回缓存条目 {'fingerprint', 类别: 列表, 类别 + '_at': 查询时间}，没有时返回 None"""
+        return self.devices.get(serial) if serial else None
+
+    def stale_kinds(self, serial, kinds, now=None) -> tuple:
+        """返回 kinds 中已过期 (或从未查询) 的类别"""
+        entry = self.get(serial) or {}
+        now = time.time() if now is None else now
+        return tuple(kind for kind in kinds if now - entry.get(f'{kind}_at', 0) >= self.TTL[kind])
+
+    def update(self, serial, fingerprint, results: dict, now=None):
+        """合并一次探测结果 {类别: 列表}；指纹与缓存不一致时丢弃该设备的旧数据"""
+        now = time.time() if now is None else now
+        entry = self.devices.get(serial)
+        if entry is None or entry.get('fingerprint') != fingerprint:
+            entry = self.devices[serial] = {'fingerprint': fingerprint}
+        for kind, items in results.items():
+            entry[kind], entry[f'{kind}_at'] = items, now
+        entry['last_used'] = now
+        while len(self.devices) > self.max_devices:
+            oldest = min(self.devices, key=lambda key: self.devices[key].get('last_used', 0))
+            del self.devices[oldest]
+        return entry
+
+
+_shared_caches = {}
+
+
+def shared_media_cache(path: str) -> DeviceMediaCache:
+    """同一缓存文件在进程内共用一个已加载的实例 (视频与摄像头面板都会读写)；只应在 GUI 线程中使用"""
+    cache = _shared_caches.get(path)
+    if cache is None:
+        cache = _shared_caches[path] = DeviceMediaCache(path)
+        cache.load()
+    return cache
@@ -0,0 +1,70 @@
+import socket
+import threading
+from core.adb_client import AdbClient, AdbError
+from core.events import Event
+
+
+class DeviceTracker:
+    """
+    【推送版】设备跟踪器
+    通过 ADB 服务的 track-devices 长连接接收设备列表变化，并以增量事件的形式发出，无需轮询。
+    连接断开 (如 ADB 服务重启) 后会自动重连。run() 会阻塞，事件在运行 run() 的线程中发出。
+    """
+
+    RETRY_MIN = 1.0
+    RETRY_MAX = 10.0
+
+    def __init__(self, adb_client: AdbClient = None):
+        self.device_added = Event()            # (序列号, 状态)
+        self.device_removed = Event()          # (序列号,)
+        self.device_state_changed = Event()    # (序列号, 状态)
+        self.tracking_changed = Event()        # (是否正在跟踪,)
+        self.adb_client = adb_client or AdbClient()
+        self.devices = {}
+        self.is_tracking = False
+        self._stop_event = threading.Event()
+        self._sock = None
+
+    def run(self):
+        retry_delay = self.RETRY_MIN
+        while not self._stop_event.is_set():
+            try:
+                for snapshot in self.adb_client.track_devices(on_open=self._on_open):
+                    if not self.is_tracking:
+                        self.is_tracking = True
+                        self.tracking_changed.emit(True)
+                    retry_delay = self.RETRY_MIN
+                    self._apply_snapshot({serial: state for serial, state, _ in snapshot})
+            except (AdbError, OSError):
+                pass
+            self._sock = None
+            if self.is_tracking:
+                self.is_tracking = False
+                self.tracking_changed.emit(False)
+            self._stop_event.wait(retry_delay)
+            retry_delay = min(retry_delay * 2, self.RETRY_MAX)
+
+    def _on_open(self, sock):
+        self._sock = sock
+        if self._stop_event.is_set():
+            sock.close()
+
+    def _apply_snapshot(self, current: dict):
+        previous = self.devices
+        self.devices = current
+        for serial in previous.keys() - current.keys():
+            self.device_removed.emit(serial)
+        for serial, state in current.items():
+            if serial not in previous:
+                self.device_added.emit(serial, state)
+            elif previous[serial] != state:
+                self.device_state_changed.emit(serial, state)
+
+    def stop(self):
+        self._stop_event.set()
+        sock = self._sock
+        if sock:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
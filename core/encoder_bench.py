@@ -0,0 +1,84 @@
+"""
+编码器基准测试：对每个 编码格式 / 编码器 组合运行一次短时间的无界面 scrcpy
+(--no-playback --print-fps --time-limit)，解析 fps 输出，按持续帧率排序。
+"""
+import re
+import statistics
+import subprocess
+from core.process_registry import registry
+
+TRIAL_SECONDS = 5
+TRIAL_ARGS = ['--no-playback', '--no-audio', '--print-fps']
+# 除 --time-limit 本身外，留给推送 server 与建立连接的时间
+TRIAL_STARTUP_TIMEOUT = 20
+BENCH_CODECS = ('h264', 'h265', 'av1')
+
+# "INFO: 60 fps" / "INFO: 58 fps (+2 frames skipped)"
+_FPS_LINE = re.compile(r'^(?:INFO:\s*)?(\d+) fps\b', re.MULTILINE)
+_ERROR_LINE = re.compile(r'^ERROR:\s*(.+)$', re.MULTILINE)
+
+
+def benchmark_candidates(encoders: list, codecs=BENCH_CODECS) -> list:
+    """
+    由 core.device_media.parse_encoders 的结果生成待测组合 [{'codec', 'encoder'}]：
+    每个视频编码器 (跳过别名) 一项；设备上没有任何已知编码器的格式以 encoder=None 测试一次 (由 scrcpy 自动选择)。
+    """
+    candidates = []
+    for codec in codecs:
+        names = [encoder['name'] for encoder in encoders
+                 if encoder['type'] == 'video' and encoder['codec'] == codec and not encoder['alias']]
+        candidates.extend({'codec': codec, 'encoder': name} for name in names or [None])
+    return candidates
+
+
+def parse_fps(output: str) -> list:
+    return [int(fps) for fps in _FPS_LINE.findall(output)]
+
+
+def trial_command(scrcpy: str, serial: str, candidate: dict, max_size=None, seconds=TRIAL_SECONDS) -> list:
+    cmd = [scrcpy]
+    if serial: cmd.extend(['--serial', serial])
+    cmd.extend(TRIAL_ARGS)
+    cmd.append(f"--time-limit={seconds}")
+    cmd.append(f"--video-codec={candidate['codec']}")
+    if candidate.get('encoder'): cmd.append(f"--video-encoder={candidate['encoder']}")
+    if max_size: cmd.append(f"--max-size={max_size}")
+    return cmd
+
+
+def run_trial(scrcpy: str, serial: str, candidate: dict, max_size=None, seconds=TRIAL_SECONDS) -> dict:
+    """
+    运行一次测试，返回 {'codec', 'encoder', 'max_size', 'fps', 'min_fps', 'samples', 'error'}。
+    fps 为去掉第一个采样 (编码器预热) 后的中位数；失败或没有 fps 输出时 fps 为 0 并带 error 说明。
+    """
+    result = dict(candidate, max_size=max_size or 0, fps=0, min_fps=0, samples=0, error=None)
+    cmd = trial_command(scrcpy, serial, candidate, max_size, seconds)
+    try:
+        process = registry.run(cmd, timeout=seconds + TRIAL_STARTUP_TIMEOUT, capture_output=True, text=True,
+                               encoding='utf-8', errors='replace', label='scrcpy')
+    except FileNotFoundError:
+        result['error'] = "scrcpy 命令未找到"
+        return result
+    except subprocess.TimeoutExpired:
+        result['error'] = f"超过 {seconds + TRIAL_STARTUP_TIMEOUT} 秒仍未结束"
+        return result
+    output = process.stdout + process.stderr
+    samples = parse_fps(output)[1:]
+    if process.returncode != 0 and not samples:
+        errors = _ERROR_LINE.findall(output)
+        result['error'] = errors[0].strip() if errors else f"scrcpy 返回了非零代码: {process.returncode}"
+    elif not samples:
+        result['error'] = "没有 fps 输出"
+    else:
+        result.update(fps=statistics.median(samples), min_fps=min(samples), samples=len(samples))
+    return result
+
+
+def rank_results(results: list) -> list:
+    """按持续帧率 (中位数，其次最低帧率) 从高到低排序，失败的组合排在最后"""
+    return sorted(results, key=lambda result: (result['error'] is None, result['fps'], result['min_fps']),
+                  reverse=True)
+
+
+def candidate_label(result: dict) -> str:
+    return f"{result['codec']}/{result['encoder'] or '自动'}"
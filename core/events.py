@@ -0,0 +1,22 @@
+class Event:
+    """
+    轻量事件钩子，接口与 pyqtSignal 相同 (connect / disconnect / emit)，供不依赖 Qt 的核心模块使用。
+    回调在调用 emit 的线程中同步执行；需要切换线程时由调用方 (如 Qt 适配层) 自行转发。
+    """
+    __slots__ = ('_handlers',)
+
+    def __init__(self):
+        self._handlers = []
+
+    def connect(self, handler):
+        self._handlers.append(handler)
+
+    def disconnect(self, handler=None):
+        if handler is None:
+            self._handlers.clear()
+        else:
+            self._handlers.remove(handler)
+
+    def emit(self, *args):
+        for handler in tuple(self._handlers):
+            handler(*args)
@@ -0,0 +1,98 @@
+import time
+from collections import deque
+
+# scrcpy 打开窗口时输出的日志，出现任意一条即视为该设备已启动成功
+READY_MARKERS = ('INFO: Renderer:', 'INFO: Texture:', 'INFO: Initial texture:')
+
+
+def is_ready_line(line: str) -> bool:
+    return any(marker in line for marker in READY_MARKERS)
+
+
+class FleetLaunch:
+    """
+    【批量启动】调度状态
+    同一时间最多 concurrency 台设备处于“启动中”，相邻两次启动至少间隔 stagger 秒，
+    避免同时冲击 ADB 服务与主机。设备输出就绪日志或存活超过 ready_timeout 秒即视为启动成功，
+    在此之前进程退出则视为失败。本类只记录状态，由调用方按 next_wakeup() 定时驱动。
+    """
+
+    def __init__(self, serials, concurrency=4, stagger=0.5, ready_timeout=8.0, clock=time.monotonic):
+        self.concurrency = max(1, int(concurrency))
+        self.stagger = max(0.0, float(stagger))
+        self.ready_timeout = ready_timeout
+        self.clock = clock
+        self.serials = list(dict.fromkeys(serials))
+        self.pending = deque(self.serials)
+        self.launching = {}
+        self.results = {}
+        self.started_at = clock()
+        self.finished_at = None
+        self._last_launch = None
+
+    @property
+    def done(self) -> bool:
+        return not self.pending and not self.launching
+
+    def due(self) -> list:
+        """返回现在应当启动的设备，调用方启动后需调用 launched()"""
+        now = self.clock()
+        serials = []
+        while self.pending and len(self.launching) + len(serials) < self.concurrency:
+            if self.stagger and self._last_launch is not None and now - self._last_launch < self.stagger:
+                break
+            serials.append(self.pending.popleft())
+            if self.stagger:
+                self._last_launch = now
+                break
+        return serials
+
+    def launched(self, serial):
+        self.launching[serial] = self.clock()
+
+    def mark_started(self, serial, message="已启动"):
+        self._finish(serial, True, message)
+
+    def mark_failed(self, serial, message):
+        if serial in self.pending:
+            self.pending.remove(serial)
+            self.launching[serial] = self.clock()
+        self._finish(serial, False, message)
+
+    def _finish(self, serial, ok, message):
+        launched_at = self.launching.pop(serial, None)
+        if launched_at is None:
+            return
+        now = self.clock()
+        self.results[serial] = {'ok': ok, 'message': message, 'elapsed': now - launched_at,
+                                'at': now - self.started_at}
+        if self.done and self.finished_at is None:
+            self.finished_at = now
+
+    def expire(self) -> list:
+        """返回存活已超过 ready_timeout、应按启动成功处理的设备"""
+        now = self.clock()
+        return [serial for serial, launched_at in self.launching.items() if now - launched_at >= self.ready_timeout]
+
+    def next_wakeup(self):
+        """距离下一次需要处理 (启动下一台或判定超时) 的秒数，无事可做时返回 None"""
+        if self.done:
+            return None
+        now = self.clock()
+        waits = [launched_at + self.ready_timeout - now for launched_at in self.launching.values()]
+        if self.pending and len(self.launching) < self.concurrency:
+            waits.append(self._last_launch + self.stagger - now if self.stagger and self._last_launch is not None else 0.0)
+        return max(0.0, min(waits)) if waits else None
+
+    def summary(self) -> dict:
+        started = [serial for serial, result in self.results.items() if result['ok']]
+        end = self.finished_at if self.finished_at is not None else self.clock()
+        return {
+            'total': len(self.serials),
+            'started': len(started),
+            'failed': len(self.results) - len(started),
+            # 最后一台成功启动的设备距批量启动开始的时间
+            'time_to_all_started': max((self.results[serial]['at'] for serial in started), default=None),
+            'elapsed': end - self.started_at,
+            'results': dict(self.results),
+        }
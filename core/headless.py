@@ -0,0 +1,141 @@
+"""
+无界面入口：在没有显示器的服务器上启动并监管 scrcpy 会话。
+
+用法: python -m core.headless [-s 序列号 ...| --all] [--otg] [--concurrency N] [--stagger 秒] [--restart]
+                             [--log-dir 目录] [-- scrcpy 参数...]
+例如: python -m core.headless --all --concurrency 8 --restart --log-dir logs -- --no-window --record=out.mkv
+所有会话结束后退出；Ctrl+C / SIGTERM 停止全部会话，再按一次则立即强制结束。
+"""
+import argparse
+import signal
+import sys
+import time
+from core.adb_service import AdbService
+from core.log_archive import LogArchive, APP_CHANNEL, available_compressions
+from core.session_engine import SessionEngine
+from core.session_watchdog import RestartPolicy
+# asyncio 只在真正运行时 (run / main) 导入，导入本模块 (如只调用 parse_args) 不必付出它的开销
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog='python -m core.headless', description="无界面启动并监管 scrcpy 会话")
+    parser.add_argument('-s', '--serial', action='append', default=[], help="目标设备序列号，可重复指定")
+    parser.add_argument('--all', action='store_true', help="在所有已连接的设备上启动")
+    parser.add_argument('--otg', action='store_true', help="以 OTG 模式启动")
+    parser.add_argument('--concurrency', type=int, default=4, help="批量启动时同时启动中的设备上限 (默认 4)")
+    parser.add_argument('--stagger', type=float, default=0.5, help="批量启动时相邻两台设备的启动间隔秒数 (默认 0.5)")
+    parser.add_argument('--ready-timeout', type=float, default=8.0, help="存活多少秒视为启动成功 (默认 8)")
+    parser.add_argument('--restart', action='store_true', help="会话意外退出或卡顿时，等待设备重新连接后自动重启")
+    parser.add_argument('--max-restarts', type=int, default=5, help="10 分钟内最多自动重启的次数 (默认 5)")
+    parser.add_argument('--stall-timeout', type=float, default=15.0,
+                        help="超过多少秒没有画面帧视为卡顿并重启，0 表示不检测 (默认 15)")
+    parser.add_argument('-q', '--quiet', action='store_true', help="不输出 scrcpy 自身的日志")
+    parser.add_argument('--log-dir', help="把所有日志按会话压缩归档到该目录 (不受 --quiet 影响)")
+    parser.add_argument('--log-compression', choices=['auto'] + available_compressions(), default='auto',
+                        help="归档压缩格式，auto 在安装了 zstandard 时使用 zstd，否则使用 gzip")
+    parser.add_argument('--log-keep-days', type=float, default=7.0, help="归档文件保留天数 (默认 7)")
+    parser.add_argument('--log-max-mb', type=int, default=512, help="归档目录总大小上限 MB，超出时删除最旧的文件 (默认 512)")
+    parser.add_argument('scrcpy_args', nargs=argparse.REMAINDER, help="'--' 之后的参数原样传给 scrcpy")
+    args = parser.parse_args(argv)
+    if args.scrcpy_args[:1] == ['--']:
+        args.scrcpy_args = args.scrcpy_args[1:]
+    return args
+
+
+def connected_devices() -> list:
+    service = AdbService()
+    found = []
+    service.refreshed.connect(lambda devices, message: (found.extend(devices), log(message)))
+    service.refresh_devices()
+    return found
+
+
+def log(message: str):
+    print(f"{time.strftime('%H:%M:%S')} {message.rstrip()}", flush=True)
+
+
+async def run(args, archive: LogArchive = None) -> int:
+    import asyncio
+    loop = asyncio.get_running_loop()
+    engine = SessionEngine(loop)
+    done = asyncio.Event()
+    failed = []
+
+    engine.log.connect(log)
+    if archive:
+        engine.set_archive(archive)
+        engine.log.connect(lambda message: archive.submit(APP_CHANNEL, message.rstrip().splitlines()))
+    if not args.quiet:
+        engine.log_batch.connect(lambda lines: sys.stdout.write(''.join(f"{line}\n" for line in lines)))
+    engine.fleet_device_result.connect(lambda serial, ok, message: ok or failed.append(serial))
+
+    def check_done(*_):
+        if not engine.active_sessions and engine.fleet is None:
+            done.set()
+
+    engine.session_stopped.connect(check_done)
+    engine.fleet_finished.connect(check_done)
+
+    interrupts = [0]
+
+    def on_interrupt():
+        interrupts[0] += 1
+        if interrupts[0] == 1:
+            log("收到停止请求，正在停止所有会话... (再次按下将强制结束)")
+            engine.stop_all_sessions()
+        else:
+            engine.supervisor.terminate_all(timeout=0)
+        check_done()
+
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, on_interrupt)
+        except (NotImplementedError, RuntimeError):
+            # Windows 的事件循环不支持 add_signal_handler
+            signal.signal(signum, lambda *_: loop.call_soon_threadsafe(on_interrupt))
+
+    policy = RestartPolicy(max_restarts=args.max_restarts, stall_timeout=args.stall_timeout) if args.restart else None
+    serials = list(args.serial)
+    if args.all:
+        serials.extend(serial for serial in await loop.run_in_executor(None, connected_devices) if serial not in serials)
+        if not serials:
+            engine.shutdown()
+            return 1
+
+    if serials:
+        if not engine.start_fleet(serials, args.scrcpy_args, is_otg=args.otg, concurrency=args.concurrency,
+                                  stagger=args.stagger, ready_timeout=args.ready_timeout, restart_policy=policy):
+            engine.shutdown()
+            return 1
+    elif engine.start_session("OTG" if args.otg else "默认设备", args.scrcpy_args, is_otg=args.otg,
+                              restart_policy=policy) is None:
+        engine.shutdown()
+        return 1
+
+    check_done()
+    await done.wait()
+    engine.shutdown()
+    return 1 if failed else 0
+
+
+def close_archive(archive: LogArchive):
+    archive.close()
+    stats = archive.stats()
+    log(f"日志已归档到 {archive.directory}: {stats['written']} 行，压缩后 {stats['bytes'] / 1024:.1f} KB"
+        + (f"，丢弃 {stats['dropped']} 行" if stats['dropped'] else "")
+        + (f"，写入失败 {stats['failed']} 行 ({stats['last_error']})" if stats['failed'] else ""))
+
+
+def main(argv=None) -> int:
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    archive = LogArchive(args.log_dir, compression=args.log_compression, max_age=args.log_keep_days * 86400,
+                         max_total_bytes=args.log_max_mb << 20) if args.log_dir else None
+    import asyncio
+    try:
+        return asyncio.run(run(args, archive))
+    finally:
+        if archive: close_archive(archive)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""
+设备链路测速与视频参数推荐。
+通过 adb exec-out 往返一条空命令测量延迟，再定时接收一段 /dev/zero 数据测量持续吞吐量，
+据此推荐不会让链路排队的 --video-bit-rate / --max-size / --max-fps。结果按设备 + 连接方式缓存。
+"""
+import json
+import os
+import statistics
+import time
+from core.adb_executor import check_cancelled
+
+LINK_PROBE_PINGS = 5
+LINK_PROBE_BYTES = 32 * 1024 * 1024
+LINK_PROBE_SECONDS = 2.0
+
+# 视频只占用实测带宽的这一比例，余量留给音频、控制通道与无线信号的波动
+LINK_HEADROOM = 0.6
+MAX_BIT_RATE = 24_000_000
+MIN_BIT_RATE = 500_000
+# 往返延迟超过该值 (毫秒) 的链路通常抖动也大，限制帧率以减少排队
+HIGH_RTT_MS = 40
+# (视频可用带宽下限 bit/s, 最大尺寸 (0 表示不限制), 最大帧率)，按带宽从高到低
+QUALITY_LADDER = (
+    (16_000_000, 0, 60),
+    (8_000_000, 1920, 60),
+    (4_000_000, 1600, 60),
+    (2_000_000, 1280, 30),
+    (1_000_000, 1024, 30),
+    (0, 800, 24),
+)
+
+
+def connection_type(serial: str) -> str:
+    """'tcp' (adb connect 的 IP:端口 或 mDNS 发现的无线调试设备) 或 'usb'"""
+    return 'tcp' if serial and (':' in serial or '._tcp' in serial) else 'usb'
+
+
+def measure_link(open_stream, pings=LINK_PROBE_PINGS, payload_bytes=LINK_PROBE_BYTES,
+                 max_seconds=LINK_PROBE_SECONDS) -> dict:
+    """
+    open_stream(command) 返回在设备上执行 command 的输出字节块迭代器 (如 adb exec-out)。
+    延迟取 pings 次空命令往返的中位数；吞吐量从收到第一块数据开始计时 (不含命令启动开销)，
+    收满 payload_bytes 或超过 max_seconds 即停止。
+    返回 {'rtt_ms', 'throughput_bps', 'bytes', 'seconds'}，吞吐量单位为 bit/s。
+    """
+    rtts = []
+    for _ in range(pings):
+        check_cancelled()
+        started = time.perf_counter()
+        for _ in open_stream('echo'):
+            pass
+        rtts.append((time.perf_counter() - started) * 1000)
+
+    received = 0
+    first_at = last_at = None
+    for chunk in open_stream(f'head -c {payload_bytes} /dev/zero'):
+        last_at = time.perf_counter()
+        if first_at is None:
+            first_at = last_at
+        else:
+            received += len(chunk)
+        if last_at - first_at >= max_seconds:
+            break
+    elapsed = (last_at - first_at) if first_at is not None else 0
+    if not received or elapsed <= 0:
+        raise Exception("测速数据太少，无法计算吞吐量")
+    return {'rtt_ms': statistics.median(rtts) if rtts else None, 'throughput_bps': received * 8 / elapsed,
+            'bytes': received, 'seconds': elapsed}
+
+
+def format_bit_rate(bit_rate: int) -> str:
+    """12000000 -> '12M'，2500000 -> '2500K'"""
+    if bit_rate % 1_000_000 == 0:
+        return f"{bit_rate // 1_000_000}M"
+    return f"{bit_rate // 1000}K"
+
+
+def recommend_video_settings(measurement: dict, display_size=None) -> dict:
+    """
+    根据测速结果推荐视频参数，返回 {'video_bit_rate': '8M', 'max_size': 1920 (0 表示不限制), 'max_fps': 60}。
+    display_size 为设备屏幕 (宽, 高) 时，不超过屏幕的尺寸限制会被省略。
+    """
+    budget = measurement['throughput_bps'] * LINK_HEADROOM
+    bit_rate = int(min(max(budget, MIN_BIT_RATE), MAX_BIT_RATE))
+    step = 500_000 if bit_rate >= 2_000_000 else 100_000
+    bit_rate = bit_rate // step * step
+    max_size, max_fps = next((size, fps) for floor, size, fps in QUALITY_LADDER if budget >= floor)
+    rtt = measurement.get('rtt_ms')
+    if rtt is not None and rtt > HIGH_RTT_MS: max_fps = min(max_fps, 30)
+    if display_size and max_size and max_size >= max(display_size):
+        max_size = 0
+    return {'video_bit_rate': format_bit_rate(bit_rate), 'max_size': max_size, 'max_fps': max_fps}
+
+
+class LinkProbeCache:
+    """
+    【按设备 + 连接方式】测速结果缓存
+    同一台设备经 USB 与无线连接时分别缓存；无线链路随环境变化，有效期较短。
+    """
+    FORMAT_VERSION = 1
+    TTL = {'usb': 7 * 24 * 3600, 'tcp': 30 * 60}
+
+    def __init__(self, path: str, max_entries=40):
+        self.path = path
+        self.max_entries = max_entries
+        self.entries = {}
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        if isinstance(data, dict) and data.get('format') == self.FORMAT_VERSION:
+            self.entries = data.get('entries', {})
+
+    def save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'format': self.FORMAT_VERSION, 'entries': self.entries}, f,
+                      ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def _key(serial):
+        return f"{connection_type(serial)}|{serial}"
+
+    def get(self, serial, now=None):
+        """返回仍在有效期内的测速结果，没有或已过期时返回 None"""
+        entry = self.entries.get(self._key(serial)) if serial else None
+        now = time.time() if now is None else now
+        if entry is None or now - entry.get('at', 0) >= self.TTL[connection_type(serial)]:
+            return None
+        return entry
+
+    def put(self, serial, measurement: dict, now=None):
+        entry = dict(measurement, at=time.time() if now is None else now)
+        self.entries[self._key(serial)] = entry
+        while len(self.entries) > self.max_entries:
+            del self.entries[min(self.entries, key=lambda key: self.entries[key].get('at', 0))]
+        return entry
@@ -0,0 +1,278 @@
+"""
+日志归档：把每个会话 (以及应用自身) 的全部日志行连同时间戳与会话名写入按会话分开、可轮转的压缩文件，供事后排查。
+写入在独立的后台线程中进行；提交方只把行放进有上限的内存队列，队列满时直接丢弃并计数，不会阻塞读取子进程输出的线程。
+安装了 zstandard 时默认使用 zstd，否则使用 gzip；两者都按流写入，可以用 zcat / zstdcat 直接查看 (包括仍在写入的文件)。
+"""
+import gzip
+import os
+import queue
+import re
+import threading
+import time
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# 应用自身消息的通道 (与 core.session_logs.APP_CHANNEL 相同) 在归档中使用的名字
+APP_CHANNEL = ''
+APP_ARCHIVE_NAME = 'app'
+SUFFIXES = {'gzip': '.log.gz', 'zstd': '.log.zst'}
+_ARCHIVE_FILE = re.compile(r'^.+_\d{8}-\d{6}_\d{3}\.log\.(gz|zst)$')
+_UNSAFE_CHARS = re.compile(r'[^\w.-]')
+
+
+def available_compressions() -> list:
+    return ['zstd', 'gzip'] if zstandard is not None else ['gzip']
+
+
+def archive_name(session_id: str) -> str:
+    """会话名中不能用于文件名的字符替换为 '_'"""
+    return _UNSAFE_CHARS.sub('_', session_id) if session_id != APP_CHANNEL else APP_ARCHIVE_NAME
+
+
+class _ArchiveFile:
+    """一个正在写入的压缩文件：size 为已写到磁盘 (含缓冲) 的压缩后字节数"""
+    __slots__ = ('path', 'raw', 'stream', 'opened_at', 'dirty')
+
+    def __init__(self, path: str, compression: str, level: int):
+        self.path = path
+        self.raw = open(path, 'xb')
+        if compression == 'zstd':
+            self.stream = zstandard.ZstdCompressor(level=level).stream_writer(self.raw, closefd=False)
+        else:
+            self.stream = gzip.GzipFile(filename='', mode='wb', fileobj=self.raw, compresslevel=level)
+        self.opened_at = time.time()
+        self.dirty = False
+
+    @property
+    def size(self) -> int:
+        return self.raw.tell()
+
+    def write(self, data: bytes):
+        self.stream.write(data)
+        self.dirty = True
+
+    def flush(self):
+        """把已写入的行压缩并刷到磁盘，进程崩溃后文件仍可完整解压到这里"""
+        if self.dirty:
+            self.stream.flush()
+            self.raw.flush()
+            self.dirty = False
+
+    def close(self):
+        try:
+            self.stream.close()
+        finally:
+            self.raw.close()
+
+
+class LogArchive:
+    """
+    【后台线程】压缩日志归档
+    submit() 可在任意线程调用且从不阻塞：排队中的行超过 max_queued_lines 时丢弃本次提交并计入 dropped，
+    之后写入该会话的第一行前补一条丢弃提示。每个会话单独写文件，单个文件超过 max_file_bytes (压缩后)
+    或已写入 rotate_interval 秒时轮转到新文件；目录中超过 max_age 秒或使总大小超过 max_total_bytes
+    的最旧归档文件会被删除 (正在写入的文件除外)。
+    """
+    # 有数据写入时，最多每隔这么久 (秒) 刷一次盘
+    FLUSH_INTERVAL = 1.0
+    # 检查保留期限与总大小的间隔 (秒)，轮转时也会检查
+    RETENTION_INTERVAL = 60.0
+
+    def __init__(self, directory: str, compression='auto', level=None, max_file_bytes=8 << 20,
+                 rotate_interval=3600.0, max_total_bytes=512 << 20, max_age=7 * 86400.0, max_queued_lines=100_000):
+        if compression == 'auto':
+            compression = available_compressions()[0]
+        if compression not in SUFFIXES:
+            raise ValueError(f"不支持的压缩格式: {compression}")
+        if compression == 'zstd' and zstandard is None:
+            raise ValueError("使用 zstd 压缩需要先安装 zstandard (pip install zstandard)")
+        self.directory = directory
+        self.compression = compression
+        self.level = level if level is not None else (3 if compression == 'zstd' else 6)
+        self.max_file_bytes = max_file_bytes
+        self.rotate_interval = rotate_interval
+        self.max_total_bytes = max_total_bytes
+        self.max_age = max_age
+        self.max_queued_lines = max_queued_lines
+        # 统计：已写入行数、因队列已满而丢弃的行数、写入出错而丢失的行数、已写入的压缩后字节数
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.bytes_written = 0
+        self.last_error = None
+
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._dropped_pending = {}
+        self._files = {}
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='LogArchive', daemon=True)
+        self._thread.start()
+
+    # ------------------------------------------------------------------
+    # 对外接口 (可在任意线程调用)
+    # ------------------------------------------------------------------
+    def submit(self, session_id: str, lines: list) -> bool:
+        """提交一批行，时间戳取提交时刻；队列已满或归档已关闭时丢弃并返回 False"""
+        count = len(lines)
+        if not count:
+            return True
+        with self._lock:
+            if self._closed or self._queued + count > self.max_queued_lines:
+                self.dropped += count
+                self._dropped_pending[session_id] = self._dropped_pending.get(session_id, 0) + count
+                return False
+            self._queued += count
+        self._queue.put((session_id, time.time(), lines))
+        return True
+
+    def close_session(self, session_id: str):
+        """会话结束：写完已排队的行后关闭它的文件，下次再有输出时开始新文件"""
+        self._queue.put(('close', session_id))
+
+    def stats(self) -> dict:
+        with self._lock:
+            queued = self._queued
+        return {'compression': self.compression, 'queued': queued, 'written': self.written, 'dropped': self.dropped,
+                'failed': self.failed, 'bytes': self.bytes_written, 'last_error': self.last_error}
+
+    def close(self, timeout=5.0):
+        """写完已排队的行并关闭所有文件；之后的提交一律丢弃"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    # ------------------------------------------------------------------
+    # 写入线程
+    # ------------------------------------------------------------------
+    def _run(self):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+        except OSError as e:
+            self.last_error = str(e)
+        self._apply_retention()
+        next_flush = next_retention = time.monotonic()
+        next_retention += self.RETENTION_INTERVAL
+        while True:
+            timeout = max(0.0, min(next_flush, next_retention) - time.monotonic()) if self._files else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = ()
+            if item is None:
+                break
+            if len(item) == 3:
+                self._write(*item)
+            elif item:
+                self._close_file(item[1])
+            now = time.monotonic()
+            if now >= next_flush:
+                self._flush_all()
+                next_flush = now + self.FLUSH_INTERVAL
+            if now >= next_retention:
+                self._apply_retention()
+                next_retention = now + self.RETENTION_INTERVAL
+        for session_id in list(self._files):
+            self._close_file(session_id)
+        self._apply_retention()
+
+    def _write(self, session_id, timestamp, lines):
+        with self._lock:
+            self._queued -= len(lines)
+            dropped = self._dropped_pending.pop(session_id, 0)
+        label = session_id if session_id != APP_CHANNEL else APP_ARCHIVE_NAME
+        local = time.localtime(timestamp)
+        prefix = f"{time.strftime('%Y-%m-%d %H:%M:%S', local)}.{int(timestamp % 1 * 1000):03d} [{label}] "
+        text = ''.join(f"{prefix}{line}\n" for line in lines)
+        if dropped:
+            text = f"{prefix}[归档队列已满，已丢弃 {dropped} 行]\n{text}"
+        try:
+            archive = self._file_for(session_id)
+            size = archive.size
+            archive.write(text.encode('utf-8', errors='replace'))
+            self.bytes_written += archive.size - size
+            self.written += len(lines)
+        except OSError as e:
+            self.failed += len(lines)
+            self.last_error = str(e)
+            self._close_file(session_id)
+
+    def _file_for(self, session_id) -> _ArchiveFile:
+        archive = self._files.get(session_id)
+        if archive is not None and (archive.size >= self.max_file_bytes
+                                    or time.time() - archive.opened_at >= self.rotate_interval):
+            self._close_file(session_id)
+            archive = None
+            self._apply_retention()
+        if archive is None:
+            archive = self._files[session_id] = self._open_file(archive_name(session_id))
+        return archive
+
+    def _open_file(self, name) -> _ArchiveFile:
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        suffix = SUFFIXES[self.compression]
+        for part in range(1000):
+            path = os.path.join(self.directory, f"{name}_{stamp}_{part:03d}{suffix}")
+            try:
+                return _ArchiveFile(path, self.compression, self.level)
+            except FileExistsError:
+                continue
+        raise FileExistsError(path)
+
+    def _close_file(self, session_id):
+        archive = self._files.pop(session_id, None)
+        if archive is None:
+            return
+        try:
+            size = archive.size
+            archive.close()
+            self.bytes_written += os.path.getsize(archive.path) - size
+        except OSError as e:
+            self.last_error = str(e)
+
+    def _flush_all(self):
+        for session_id, archive in list(self._files.items()):
+            try:
+                size = archive.size
+                archive.flush()
+                self.bytes_written += archive.size - size
+            except OSError as e:
+                self.last_error = str(e)
+                self._close_file(session_id)
+
+    def _apply_retention(self):
+        """删除过期的归档文件，再从最旧的开始删除，直到总大小不超过 max_total_bytes"""
+        open_paths = {archive.path for archive in self._files.values()}
+        try:
+            names = [name for name in os.listdir(self.directory) if _ARCHIVE_FILE.match(name)]
+        except OSError:
+            return
+        files = []
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        now = time.time()
+        for mtime, size, path in files:
+            if total <= self.max_total_bytes and now - mtime <= self.max_age:
+                # 按修改时间排序，之后的文件都更新
+                break
+            if path in open_paths:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
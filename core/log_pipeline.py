@@ -0,0 +1,51 @@
+import sys
+import threading
+
+
+class LineSplitter:
+    """
+    增量行切分器：喂入任意大小的字节块，返回其中完整的行 (不含换行符)。
+    """
+
+    def __init__(self, encoding=None):
+        self.encoding = encoding or sys.stdout.encoding or 'utf-8'
+        self._buffer = bytearray()
+
+    def feed(self, chunk: bytes) -> list:
+        self._buffer += chunk
+        end = self._buffer.rfind(b'\n')
+        if end < 0:
+            return []
+        complete = bytes(self._buffer[:end])
+        del self._buffer[:end + 1]
+        return [line.rstrip('\r') for line in complete.decode(self.encoding, errors='replace').split('\n')]
+
+    def flush(self) -> list:
+        if not self._buffer:
+            return []
+        line = self._buffer.decode(self.encoding, errors='replace').rstrip('\r')
+        self._buffer.clear()
+        return [line]
+
+
+class LogFlowControl:
+    """
+    日志批次的流量控制：限制已发出但 GUI 尚未处理的批次数量。
+    生产者 try_acquire() 失败时应继续合并行而不是发送新批次；消费者处理完一批后调用 release()。
+    """
+
+    def __init__(self, max_inflight=4):
+        self.max_inflight = max_inflight
+        self._inflight = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self, force=False) -> bool:
+        with self._lock:
+            if self._inflight >= self.max_inflight and not force:
+                return False
+            self._inflight += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self._inflight = max(0, self._inflight - 1)
@@ -0,0 +1,195 @@
+"""
+子进程登记表：程序启动的每个 adb / scrcpy 子进程都在这里登记。
+每个子进程单独成为一个进程组 (Windows 上为新的进程组)，超时、取消或程序退出时连同其派生的
+孙进程一起结束；counters() 提供泄漏计数，便于确认没有遗留进程。
+"""
+import atexit
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from core.adb_executor import check_cancelled, TaskCancelled
+
+IS_WINDOWS = sys.platform == 'win32'
+CREATE_NO_WINDOW = subprocess.CREATE_NO_WINDOW if IS_WINDOWS else 0
+CREATE_NEW_PROCESS_GROUP = subprocess.CREATE_NEW_PROCESS_GROUP if IS_WINDOWS else 0
+
+
+class ProcessRegistry:
+    """
+    【进程组】子进程登记表 (线程安全)
+    popen() 启动并登记，调用方等待进程结束后 release()；run() 是带超时与取消的一次性调用。
+    """
+
+    # run() 等待期间检查任务是否被取消的间隔
+    CANCEL_POLL_INTERVAL = 0.1
+    # 被强制结束的孙进程要等 init 回收，超过这个时间仍有存活才计为泄漏
+    LEAK_GRACE = 5.0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._processes = {}        # pid -> (Popen, 说明)
+        self._killed_groups = {}    # 已被强制结束的进程组 -> 结束时间，用于检查是否有残留
+        self.stats = {'spawned': 0, 'released': 0, 'killed_timeout': 0, 'killed_cancel': 0,
+                      'killed_exit': 0, 'orphans_killed': 0}
+
+    def popen(self, cmd: list, label=None, **kwargs) -> subprocess.Popen:
+        """与 subprocess.Popen 参数相同；子进程放入新的进程组并登记"""
+        if IS_WINDOWS:
+            kwargs['creationflags'] = kwargs.get('creationflags', 0) | CREATE_NO_WINDOW | CREATE_NEW_PROCESS_GROUP
+        else:
+            kwargs['start_new_session'] = True
+        process = subprocess.Popen(cmd, **kwargs)
+        with self._lock:
+            self._processes[process.pid] = (process, label or os.path.basename(str(cmd[0])))
+            self.stats['spawned'] += 1
+        return process
+
+    def release(self, process: subprocess.Popen):
+        """进程已结束并被 wait() 后调用；组内若还有残留的孙进程则一并结束"""
+        with self._lock:
+            if self._processes.pop(process.pid, None) is None:
+                return
+            self.stats['released'] += 1
+            killed = process.pid in self._killed_groups
+        if not IS_WINDOWS and not killed and self._group_alive(process.pid):
+            self._signal_group(process, signal.SIGKILL)
+            with self._lock:
+                self.stats['orphans_killed'] += 1
+                self._killed_groups[process.pid] = time.monotonic()
+
+    def terminate_tree(self, process: subprocess.Popen):
+        """请求整个进程组正常退出 (POSIX 上为 SIGTERM)"""
+        if IS_WINDOWS:
+            try:
+                process.terminate()
+            except OSError:
+                pass
+            return
+        self._signal_group(process, signal.SIGTERM)
+
+    def kill_tree(self, process: subprocess.Popen, reason='cancel'):
+        """强制结束进程及其全部孙进程；reason 为 timeout / cancel / exit，只用于计数"""
+        if IS_WINDOWS:
+            # taskkill /T 沿父子关系结束整棵进程树
+            subprocess.run(['taskkill', '/F', '/T', '/PID', str(process.pid)], stdout=subprocess.DEVNULL,
+                           stderr=subprocess.DEVNULL, creationflags=CREATE_NO_WINDOW)
+            if process.poll() is None:
+                try:
+                    process.kill()
+                except OSError:
+                    pass
+        else:
+            self._signal_group(process, signal.SIGKILL)
+        with self._lock:
+            self.stats[f'killed_{reason}'] += 1
+            if not IS_WINDOWS:
+                self._killed_groups[process.pid] = time.monotonic()
+
+    def _signal_group(self, process, signum):
+        # 子进程在 popen() 中以 start_new_session 启动，进程组号即其 pid
+        try:
+            os.killpg(process.pid, signum)
+        except ProcessLookupError:
+            pass
+        except PermissionError:
+            # 进程组号已被复用为其他用户的进程，只处理子进程本身
+            if process.poll() is None: process.send_signal(signum)
+
+    @staticmethod
+    def _group_alive(pgid) -> bool:
+        try:
+            os.killpg(pgid, 0)
+            return True
+        except (ProcessLookupError, PermissionError):
+            return False
+
+    def run(self, cmd: list, timeout=None, capture_output=False, check=False, label=None,
+            **kwargs) -> subprocess.CompletedProcess:
+        """
+        与 subprocess.run 相同，但超时或所属 AdbTask 被取消时结束整个进程组：
+        超时抛出 subprocess.TimeoutExpired，取消抛出 TaskCancelled。
+        """
+        if capture_output:
+            kwargs['stdout'] = kwargs['stderr'] = subprocess.PIPE
+        process = self.popen(cmd, label, **kwargs)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            while True:
+                remaining = self.CANCEL_POLL_INTERVAL
+                if deadline is not None:
+                    remaining = min(remaining, max(0.0, deadline - time.monotonic()))
+                try:
+                    stdout, stderr = process.communicate(timeout=remaining)
+                    break
+                except subprocess.TimeoutExpired:
+                    if deadline is not None and time.monotonic() >= deadline:
+                        self.kill_tree(process, 'timeout')
+                        self._reap_killed(process)
+                        raise subprocess.TimeoutExpired(cmd, timeout)
+                try:
+                    check_cancelled()
+                except TaskCancelled:
+                    self.kill_tree(process, 'cancel')
+                    self._reap_killed(process)
+                    raise
+        except BaseException:
+            if process.poll() is None:
+                self.kill_tree(process, 'cancel')
+                self._reap_killed(process)
+            raise
+        finally:
+            self.release(process)
+        if check and process.returncode:
+            raise subprocess.CalledProcessError(process.returncode, cmd, stdout, stderr)
+        return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
+
+    @staticmethod
+    def _reap_killed(process):
+        # 脱离了进程组的孙进程 (如自行 setsid 的 adb 服务) 可能仍持有管道，读取不能无限等待
+        try:
+            process.communicate(timeout=1.0)
+        except subprocess.TimeoutExpired:
+            for pipe in (process.stdout, process.stderr):
+                if pipe: pipe.close()
+            process.wait()
+
+    def kill_all(self, reason='exit'):
+        """结束所有仍在登记中的进程 (程序退出时自动调用)"""
+        with self._lock:
+            processes = [process for process, _ in self._processes.values()]
+        for process in processes:
+            if process.poll() is None:
+                self.kill_tree(process, reason)
+            try:
+                process.wait(1.0)
+            except subprocess.TimeoutExpired:
+                pass
+            self.release(process)
+
+    def live(self) -> list:
+        """[(pid, 说明)] 当前登记中的进程"""
+        with self._lock:
+            return [(pid, label) for pid, (_, label) in self._processes.items()]
+
+    def counters(self, grace=None) -> dict:
+        """
+        泄漏计数：running 为尚未 release 的进程数，
+        leaked 为被强制结束超过 grace 秒 (默认 LEAK_GRACE)、组内却仍有进程存活的进程组数。
+        """
+        grace = self.LEAK_GRACE if grace is None else grace
+        now = time.monotonic()
+        with self._lock:
+            groups = list(self._killed_groups.items())
+        dead = [pgid for pgid, _ in groups if not self._group_alive(pgid)]
+        leaked = sum(1 for pgid, killed_at in groups if pgid not in dead and now - killed_at >= grace)
+        with self._lock:
+            for pgid in dead:
+                self._killed_groups.pop(pgid, None)
+            return dict(self.stats, running=len(self._processes), leaked=leaked)
+
+
+registry = ProcessRegistry()
+atexit.register(registry.kill_all)
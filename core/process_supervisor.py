@@ -0,0 +1,308 @@
+import os
+import queue
+import selectors
+import socket
+import subprocess
+import sys
+import threading
+import time
+from core.log_pipeline import LineSplitter, LogFlowControl
+from core.process_registry import registry
+
+# Windows 的匿名管道不能交给 select，只能为每个进程开一个读取线程
+CAN_SELECT_PIPES = sys.platform != 'win32'
+
+
+class _Child:
+    __slots__ = ('key', 'process', 'splitter', 'pending', 'dropped', 'stdout_open', 'exited',
+                 'pidfd', 'kill_deadline', 'exit_deadline')
+
+    def __init__(self, key, process):
+        self.key = key
+        self.process = process
+        self.splitter = LineSplitter()
+        self.pending = []
+        self.dropped = 0
+        self.stdout_open = True
+        self.exited = False
+        self.pidfd = None
+        self.kill_deadline = None
+        self.exit_deadline = None
+
+
+class ProcessSupervisor:
+    """
+    【事件驱动】子进程监管器
+    在单个线程中通过 selectors 同时监听所有子进程的输出管道 (Linux 上还监听 pidfd 以感知退出)，
+    按时间/行数预算把所有进程的新输出合并为一批回调 on_output({key: lines})，
+    进程结束且输出读完后回调 on_exit(key, returncode)。
+    两个回调都在监管线程中执行。tap 不为 None 时，每次切分出的新行先回调 tap(key, lines)，
+    不受流量控制丢弃的影响 (同样在监管线程中执行，不能阻塞)。
+    """
+
+    READ_SIZE = 64 * 1024
+    # 进程退出后最多再等这么久来读完管道 (孙进程可能继承了管道而迟迟不关闭)
+    EXIT_DRAIN_TIMEOUT = 1.0
+    # 没有 pidfd 时轮询进程状态的间隔
+    POLL_INTERVAL = 0.5
+
+    def __init__(self, on_output, on_exit, flow: LogFlowControl = None, flush_interval=0.05,
+                 max_batch_lines=500, max_pending_lines=5000):
+        self.on_output = on_output
+        self.on_exit = on_exit
+        self.flow = flow
+        self.flush_interval = flush_interval
+        self.max_batch_lines = max_batch_lines
+        self.max_pending_lines = max_pending_lines
+        self.tap = None
+        self._children = {}
+        self._commands = queue.SimpleQueue()
+        self._selector = selectors.DefaultSelector()
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
+        self._wakeup_r.setblocking(False)
+        self._wakeup_w.setblocking(False)
+        self._selector.register(self._wakeup_r, selectors.EVENT_READ, None)
+        self._last_flush = time.monotonic()
+        self._running = False
+        self._thread = None
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # 对外接口 (可在任意线程调用)
+    # ------------------------------------------------------------------
+    def start(self):
+        if self._thread: return
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, name='ProcessSupervisor', daemon=True)
+        self._thread.start()
+
+    def spawn(self, key, cmd: list) -> subprocess.Popen:
+        """启动子进程并开始监听；找不到可执行文件时抛出 FileNotFoundError"""
+        process = registry.popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                 stderr=subprocess.STDOUT, bufsize=0)
+        with self._lock:
+            self._children[key] = _Child(key, process)
+        self._post(('add', key))
+        return process
+
+    def terminate(self, key, timeout=3.0):
+        """请求结束进程，超时后强制结束 (不阻塞调用方)"""
+        self._post(('terminate', key, timeout))
+
+    def terminate_all(self, timeout=3.0):
+        with self._lock:
+            keys = list(self._children)
+        for key in keys:
+            self.terminate(key, timeout)
+
+    def pid(self, key):
+        with self._lock:
+            child = self._children.get(key)
+        return child.process.pid if child else None
+
+    def keys(self) -> list:
+        with self._lock:
+            return list(self._children)
+
+    def wait_all(self, timeout=None) -> bool:
+        """等待所有子进程退出并被回调，返回是否全部完成"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.keys():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.02)
+        return True
+
+    def stop(self, timeout=5.0):
+        self._running = False
+        self._post(('stop',))
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    # ------------------------------------------------------------------
+    # 监管线程
+    # ------------------------------------------------------------------
+    def _post(self, command):
+        self._commands.put(command)
+        try:
+            self._wakeup_w.send(b'\0')
+        except (BlockingIOError, OSError):
+            pass
+
+    def _loop(self):
+        while self._running or self._children:
+            for selector_key, _ in self._selector.select(self._next_timeout()):
+                if selector_key.data is None:
+                    self._drain_wakeup()
+                    continue
+                kind, child = selector_key.data
+                if kind == 'out':
+                    self._read(child)
+                else:
+                    self._reap(child)
+            self._handle_commands()
+            self._check_children()
+            self._maybe_flush()
+            if not self._running and not self._children:
+                break
+
+    def _next_timeout(self):
+        now = time.monotonic()
+        timeout = self.POLL_INTERVAL
+        if any(child.pending for child in self._children.values()):
+            timeout = min(timeout, max(0.0, self._last_flush + self.flush_interval - now))
+        for child in self._children.values():
+            for deadline in (child.kill_deadline, child.exit_deadline):
+                if deadline is not None:
+                    timeout = min(timeout, max(0.0, deadline - now))
+        return timeout
+
+    def _drain_wakeup(self):
+        try:
+            while self._wakeup_r.recv(4096):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+
+    def _handle_commands(self):
+        while True:
+            try:
+                command = self._commands.get_nowait()
+            except queue.Empty:
+                return
+            if command[0] == 'chunk':
+                self._feed(command[1], command[2])
+            elif command[0] == 'add':
+                self._register(command[1])
+            elif command[0] == 'terminate':
+                child = self._children.get(command[1])
+                if child and not child.exited and child.process.poll() is None:
+                    registry.terminate_tree(child.process)
+                    child.kill_deadline = time.monotonic() + command[2]
+
+    def _register(self, key):
+        with self._lock:
+            child = self._children.get(key)
+        if child is None:
+            return
+        stdout = child.process.stdout
+        if CAN_SELECT_PIPES:
+            os.set_blocking(stdout.fileno(), False)
+            self._selector.register(stdout, selectors.EVENT_READ, ('out', child))
+        else:
+            threading.Thread(target=self._pump, args=(child,), daemon=True).start()
+        if hasattr(os, 'pidfd_open'):
+            try:
+                child.pidfd = os.pidfd_open(child.process.pid)
+                self._selector.register(child.pidfd, selectors.EVENT_READ, ('exit', child))
+            except OSError:
+                child.pidfd = None
+
+    def _pump(self, child):
+        """无法 select 管道的平台：后台线程阻塞读取，数据交回监管线程处理"""
+        fd = child.process.stdout.fileno()
+        while True:
+            try:
+                chunk = os.read(fd, self.READ_SIZE)
+            except OSError:
+                chunk = b''
+            self._post(('chunk', child, chunk))
+            if not chunk:
+                return
+
+    def _read(self, child):
+        try:
+            chunk = os.read(child.process.stdout.fileno(), self.READ_SIZE)
+        except BlockingIOError:
+            return
+        except OSError:
+            chunk = b''
+        self._feed(child, chunk)
+
+    def _feed(self, child, chunk):
+        if chunk:
+            self._add_lines(child, child.splitter.feed(chunk))
+            if len(child.pending) >= self.max_batch_lines:
+                self._flush()
+            return
+        self._add_lines(child, child.splitter.flush())
+        self._close_stdout(child)
+
+    def _add_lines(self, child, lines):
+        if not lines:
+            return
+        tap = self.tap
+        if tap is not None: tap(child.key, lines)
+        child.pending.extend(lines)
+
+    def _close_stdout(self, child):
+        if not child.stdout_open:
+            return
+        child.stdout_open = False
+        if CAN_SELECT_PIPES:
+            try:
+                self._selector.unregister(child.process.stdout)
+            except (KeyError, ValueError):
+                pass
+        child.process.stdout.close()
+
+    def _reap(self, child):
+        if child.process.poll() is None:
+            return
+        child.exited = True
+        if child.pidfd is not None:
+            self._selector.unregister(child.pidfd)
+            os.close(child.pidfd)
+            child.pidfd = None
+        if child.stdout_open:
+            child.exit_deadline = time.monotonic() + self.EXIT_DRAIN_TIMEOUT
+
+    def _check_children(self):
+        now = time.monotonic()
+        for child in list(self._children.values()):
+            if child.kill_deadline is not None and now >= child.kill_deadline:
+                child.kill_deadline = None
+                if child.process.poll() is None:
+                    self._add_lines(child, ["进程无法正常终止，强制结束。"])
+                    registry.kill_tree(child.process, 'timeout')
+            if not child.exited and child.pidfd is None:
+                self._reap(child)
+            if child.exited and child.stdout_open and child.exit_deadline is not None and now >= child.exit_deadline:
+                self._add_lines(child, child.splitter.flush())
+                self._close_stdout(child)
+            if child.exited and not child.stdout_open:
+                self._finish(child)
+
+    def _finish(self, child):
+        self._flush(force=True)
+        with self._lock:
+            self._children.pop(child.key, None)
+        registry.release(child.process)
+        self.on_exit(child.key, child.process.returncode)
+
+    def _maybe_flush(self):
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self._flush()
+
+    def _flush(self, force=False):
+        self._last_flush = time.monotonic()
+        children = [child for child in self._children.values() if child.pending]
+        if not children:
+            return
+        if self.flow and not self.flow.try_acquire(force):
+            # GUI 处理不过来：继续在本地合并，超过上限时丢弃最旧的行
+            for child in children:
+                overflow = len(child.pending) - self.max_pending_lines
+                if overflow > 0:
+                    del child.pending[:overflow]
+                    child.dropped += overflow
+            return
+        batches = {}
+        for child in children:
+            batch, child.pending = child.pending, []
+            if child.dropped:
+                batch.insert(0, f"[日志过多，已丢弃 {child.dropped} 行]")
+                child.dropped = 0
+            batches[child.key] = batch
+        self.on_output(batches)
@@ -0,0 +1,88 @@
+import threading
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from core.device_tracker import DeviceTracker
+
+
+def forward(event, signal):
+    """把核心模块的 Event 转发到 Qt 信号；信号从非 GUI 线程发出时由 Qt 自动排队到接收者线程"""
+    event.connect(signal.emit)
+
+
+class _TimerHandle:
+    __slots__ = ('timer',)
+
+    def __init__(self, timer):
+        self.timer = timer
+
+    def cancel(self):
+        # 定时器只会在触发时自行释放，取消后必须在这里释放，否则会一直作为 QtLoop 的子对象留存；
+        # 已触发 (timer 为 None) 后再取消不做任何事
+        timer, self.timer = self.timer, None
+        if timer is None:
+            return
+        timer.stop()
+        timer.deleteLater()
+
+    def _fire(self, callback, args):
+        timer, self.timer = self.timer, None
+        if timer is None:
+            return
+        timer.deleteLater()
+        callback(*args)
+
+
+class QtLoop(QObject):
+    """
+    让 Qt 事件循环提供与 asyncio 相同的 call_soon_threadsafe / call_later 接口，
+    使 SessionEngine 等核心对象的回调都在 GUI 线程中执行。
+    """
+    _call = pyqtSignal(object, tuple)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._call.connect(self._invoke)
+
+    def _invoke(self, callback, args):
+        callback(*args)
+
+    def call_soon_threadsafe(self, callback, *args):
+        self._call.emit(callback, args)
+
+    def call_later(self, delay, callback, *args):
+        timer = QTimer(self)
+        timer.setSingleShot(True)
+        handle = _TimerHandle(timer)
+        timer.timeout.connect(lambda: handle._fire(callback, args))
+        timer.start(max(0, int(delay * 1000) + 1))
+        return handle
+
+
+class QtDeviceTracker(QObject):
+    """DeviceTracker 的 Qt 适配层：在后台线程中跟踪设备，以 Qt 信号形式发出变化"""
+    device_added = pyqtSignal(str, str)
+    device_removed = pyqtSignal(str)
+    device_state_changed = pyqtSignal(str, str)
+    tracking_changed = pyqtSignal(bool)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.tracker = DeviceTracker()
+        forward(self.tracker.device_added, self.device_added)
+        forward(self.tracker.device_removed, self.device_removed)
+        forward(self.tracker.device_state_changed, self.device_state_changed)
+        forward(self.tracker.tracking_changed, self.tracking_changed)
+        self._thread = None
+
+    @property
+    def is_tracking(self):
+        return self.tracker.is_tracking
+
+    def start(self):
+        self._thread = threading.Thread(target=self.tracker.run, name='DeviceTracker', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        self.tracker.stop()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
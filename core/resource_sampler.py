@@ -0,0 +1,113 @@
+"""
+会话进程资源统计：每个采样周期对所有会话进程各读一次 /proc/<pid>/stat 与 /proc/<pid>/io，
+计算 CPU 占用、常驻内存与读写速率，并为每个会话保留一段滚动历史。
+只在提供 /proc 的系统 (Linux) 上可用，其他平台 available 为 False、采样为空操作。
+"""
+import os
+import time
+from core.ring_buffer import RingBuffer
+
+CLK_TCK = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def read_process(pid: int, proc_root='/proc'):
+    """
+    返回 (CPU 时间 (秒), 常驻内存 (字节), 线程数, 累计读取字节, 累计写入字节)，进程不存在时返回 None。
+    stat 的第 24 个字段即 VmRSS (单位为页)，无需再读 status；
+    io 中使用 rchar / wchar，包含套接字与管道 (scrcpy 的视频流经由套接字)，无权限读取时为 None。
+    """
+    base = f"{proc_root}/{pid}"
+    try:
+        with open(f"{base}/stat", 'rb') as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # comm 字段可能包含空格与括号，从最后一个 ')' 之后开始按空格切分 (第 3 个字段起)
+    fields = stat[stat.rfind(b')') + 2:].split()
+    cpu = (int(fields[11]) + int(fields[12])) / CLK_TCK
+    threads = int(fields[17])
+    rss = int(fields[21]) * PAGE_SIZE
+    read_bytes = write_bytes = None
+    try:
+        with open(f"{base}/io", 'rb') as f:
+            for line in f.read().splitlines():
+                if line.startswith(b'rchar:'):
+                    read_bytes = int(line[6:])
+                elif line.startswith(b'wchar:'):
+                    write_bytes = int(line[6:])
+    except OSError:
+        pass
+    return cpu, rss, threads, read_bytes, write_bytes
+
+
+class _Series:
+    __slots__ = ('pid', 'samples', 'last')
+
+    def __init__(self, pid, history):
+        self.pid = pid
+        self.samples = RingBuffer(history)
+        self.last = None
+
+
+class ResourceSampler:
+    """
+    【按会话】资源采样器
+    sample({会话: pid}) 读取一轮并计算与上一轮之间的速率；每个会话保留最近 HISTORY 个采样，
+    采样为 {'time', 'cpu_percent', 'rss', 'threads', 'read_rate', 'write_rate'} (内存与速率单位为字节、字节/秒)。
+    """
+    HISTORY = 300
+
+    def __init__(self, proc_root='/proc'):
+        self.proc_root = proc_root
+        self.available = os.path.isdir(f"{proc_root}/self")
+        self._series = {}
+
+    def sample(self, pids: dict, now=None) -> list:
+        """读取一轮，返回得到新采样的会话列表；不再出现在 pids 中的会话被移除"""
+        for key in [key for key in self._series if key not in pids]:
+            del self._series[key]
+        if not self.available:
+            return []
+        now = time.monotonic() if now is None else now
+        updated = []
+        for key, pid in pids.items():
+            series = self._series.get(key)
+            if series is None or series.pid != pid:
+                series = self._series[key] = _Series(pid, self.HISTORY)
+            reading = read_process(pid, self.proc_root)
+            if reading is None:
+                continue
+            last, series.last = series.last, (now, reading)
+            if last is None or now <= last[0]:
+                continue
+            elapsed = now - last[0]
+            cpu, rss, threads, read_bytes, write_bytes = reading
+            _, (last_cpu, _, _, last_read, last_write) = last
+            series.samples.append({
+                'time': now, 'cpu_percent': (cpu - last_cpu) / elapsed * 100, 'rss': rss, 'threads': threads,
+                'read_rate': (read_bytes - last_read) / elapsed if read_bytes is not None and last_read is not None else None,
+                'write_rate': (write_bytes - last_write) / elapsed if write_bytes is not None and last_write is not None else None,
+            })
+            updated.append(key)
+        return updated
+
+    def latest(self, key):
+        series = self._series.get(key)
+        return series.samples[-1] if series and len(series.samples) else None
+
+    def history(self, key) -> list:
+        series = self._series.get(key)
+        return list(series.samples) if series else []
+
+    def snapshot(self) -> dict:
+        """{会话: 最新采样}，供导出使用"""
+        return {key: series.samples[-1] for key, series in self._series.items() if len(series.samples)}
+
+
+def format_resources(sample: dict) -> str:
+    """会话列表中显示的一行资源占用"""
+    text = f"CPU {sample['cpu_percent']:.0f}% | 内存 {sample['rss'] / 1048576:.0f} MB"
+    if sample['read_rate'] is not None:
+        text += f" | 读 {sample['read_rate'] / 1048576:.1f} MB/s 写 {sample['write_rate'] / 1048576:.1f} MB/s"
+    return text
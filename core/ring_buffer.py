@@ -0,0 +1,87 @@
+class RingBuffer:
+    """
+    固定容量的环形缓冲区：写满后覆盖最旧的元素，按下标访问为 O(1)。
+    """
+
+    def __init__(self, capacity: int):
+        self._capacity = max(1, int(capacity))
+        self._items = [None] * self._capacity
+        self._start = 0
+        self._count = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index: int):
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        return self._items[(self._start + index) % self._capacity]
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self._items[(self._start + i) % self._capacity]
+
+    def append(self, item) -> bool:
+        """追加一个元素，返回是否覆盖了最旧的元素"""
+        end = (self._start + self._count) % self._capacity
+        self._items[end] = item
+        if self._count == self._capacity:
+            self._start = (self._start + 1) % self._capacity
+            return True
+        self._count += 1
+        return False
+
+    def extend(self, items) -> int:
+        """追加元素，返回因容量不足而被覆盖的旧元素数量"""
+        items = list(items)
+        if len(items) >= self._capacity:
+            overwritten = self._count + len(items) - self._capacity
+            self._items = items[-self._capacity:]
+            self._start = 0
+            self._count = self._capacity
+            return overwritten
+        # 最多分两段切片写入 (写到数组末尾后回绕到开头)，不逐个元素循环
+        count = len(items)
+        end = (self._start + self._count) % self._capacity
+        first = min(count, self._capacity - end)
+        self._items[end:end + first] = items[:first]
+        if count > first:
+            self._items[:count - first] = items[first:]
+        overwritten = max(0, self._count + count - self._capacity)
+        self._count = min(self._capacity, self._count + count)
+        self._start = (self._start + overwritten) % self._capacity
+        return overwritten
+
+    def snapshot(self, last=None) -> list:
+        """按从旧到新的顺序复制 (最新的 last 个) 元素，使用切片而非逐个下标访问"""
+        count = self._count if last is None else min(max(0, last), self._count)
+        start = (self._start + self._count - count) % self._capacity
+        end = start + count
+        if end <= self._capacity:
+            return self._items[start:end]
+        return self._items[start:] + self._items[:end - self._capacity]
+
+    def discard_oldest(self, count: int):
+        count = min(max(0, count), self._count)
+        for i in range(count):
+            self._items[(self._start + i) % self._capacity] = None
+        self._start = (self._start + count) % self._capacity
+        self._count -= count
+
+    def clear(self):
+        self._items = [None] * self._capacity
+        self._start = 0
+        self._count = 0
+
+    def resize(self, capacity: int):
+        """调整容量，缩小时保留最新的元素"""
+        items = list(self)
+        self._capacity = max(1, int(capacity))
+        self.clear()
+        self.extend(items[-self._capacity:])
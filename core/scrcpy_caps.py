@@ -0,0 +1,198 @@
+"""
+scrcpy 能力探测与启动前参数校验。
+每个 scrcpy 可执行文件 (按真实路径 + 修改时间 + 大小区分) 只运行一次 --version / --help，
+解析出支持的选项、是否带值以及可选值；组装好的命令在启动进程之前先用它校验，
+包括互斥选项与依赖选项，避免等到推送 server 之后才由 scrcpy 报错。
+"""
+import os
+import re
+import shutil
+import subprocess
+import threading
+from core.process_registry import registry
+
+# 选项说明行: "    -b, --video-bit-rate=value" / "    --new-display[=[<width>x<height>][/<dpi>]]" / "    -K"
+_OPTION_LINE = re.compile(r'^ {4}(?:(-[A-Za-z0-9]), )?(--[a-z0-9-]+)(\[=)?(=)?|^ {4}(-[A-Za-z0-9])\s*$')
+# 只认 'Possible values are "a", "b" and "c".' 这种完整列出的写法；其他写法不限制取值，宁可放行也不误拦
+_POSSIBLE_VALUES = re.compile(r'Possible values are ((?:"[^"]+"(?:, | and | or )?)+)\.')
+_QUOTED = re.compile(r'"([^"]+)"')
+_VERSION = re.compile(r'scrcpy v?(\d+(?:\.\d+)*)')
+
+# 同时出现时 scrcpy 会拒绝启动的选项
+CONFLICTS = (
+    ('--camera-id', '--camera-facing'),
+    ('--camera-size', '--camera-ar'),
+    ('--camera-size', '--max-size'),
+    ('--display-id', '--new-display'),
+    ('--serial', '--select-usb'),
+    ('--serial', '--select-tcpip'),
+    ('--select-usb', '--select-tcpip'),
+)
+# 只有满足其一 (选项, 值；值为 None 表示任意) 时才能使用的选项
+_CAMERA_ONLY = (('--video-source', 'camera'),)
+REQUIRES = {
+    '--display-ime-policy': (('--display-id', None), ('--new-display', None)),
+    '--camera-id': _CAMERA_ONLY,
+    '--camera-facing': _CAMERA_ONLY,
+    '--camera-size': _CAMERA_ONLY,
+    '--camera-ar': _CAMERA_ONLY,
+    '--camera-fps': _CAMERA_ONLY,
+    '--camera-high-speed': _CAMERA_ONLY,
+}
+
+NO_VALUE, REQUIRED, OPTIONAL = 'none', 'required', 'optional'
+
+
+class OptionSpec:
+    __slots__ = ('name', 'arg', 'choices')
+
+    def __init__(self, name, arg=NO_VALUE, choices=None):
+        self.name = name
+        self.arg = arg
+        self.choices = choices
+
+    def __repr__(self):
+        return f"<OptionSpec {self.name} {self.arg} {self.choices or ''}>"
+
+
+class ScrcpyCapabilities:
+    """
+    【能力表】某个 scrcpy 可执行文件支持的选项
+    options 以长选项名 (没有长选项时为短选项) 为键；short 把短选项映射到对应的键。
+    """
+
+    def __init__(self, version=None, options=None, short=None):
+        self.version = version
+        self.options = options or {}
+        self.short = short or {}
+
+    def supports(self, option: str) -> bool:
+        return option in self.options or option in self.short
+
+    def validate(self, args: list) -> list:
+        """校验参数列表 (不含可执行文件本身)，返回错误说明列表；为空表示可以启动"""
+        errors = []
+        seen = {}
+        i, count = 0, len(args)
+        while i < count:
+            arg = args[i]
+            i += 1
+            if arg.startswith('--'):
+                name, eq, value = arg.partition('=')
+                if not eq: value = None
+            elif arg.startswith('-') and len(arg) > 1:
+                name = self.short.get(arg[:2])
+                if name is None:
+                    errors.append(f"当前 scrcpy 不支持选项 {arg[:2]}")
+                    continue
+                value = arg[2:] or None
+            else:
+                errors.append(f"无法识别的参数 '{arg}'")
+                continue
+            spec = self.options.get(name)
+            if spec is None:
+                errors.append(f"当前 scrcpy{self._version_suffix()} 不支持选项 {name}")
+                continue
+            if spec.arg == NO_VALUE and value is not None:
+                errors.append(f"选项 {name} 不接受参数值")
+            elif spec.arg == REQUIRED and value is None:
+                if i < count:
+                    value = args[i]
+                    i += 1
+                else:
+                    errors.append(f"选项 {name} 缺少参数值")
+            if spec.choices and value is not None and value not in spec.choices:
+                errors.append(f"选项 {name} 的值 '{value}' 无效，可选值: {', '.join(spec.choices)}")
+            seen[name] = value
+
+        for first, second in CONFLICTS:
+            if first in seen and second in seen:
+                errors.append(f"选项 {first} 与 {second} 不能同时使用")
+        for option, alternatives in REQUIRES.items():
+            if option in seen and not any(required in seen and (value is None or seen[required] == value)
+                                          for required, value in alternatives):
+                needed = ' 或 '.join(required if value is None else f"{required}={value}"
+                                     for required, value in alternatives)
+                errors.append(f"选项 {option} 需要同时指定 {needed}")
+        return errors
+
+    def _version_suffix(self):
+        return f" {self.version}" if self.version else ""
+
+
+def parse_help(help_text: str, version_text: str = '') -> ScrcpyCapabilities:
+    """解析 scrcpy --help (与 --version) 的输出"""
+    options, short = {}, {}
+    current, description = None, []
+
+    def close_option():
+        if current is not None and description:
+            match = _POSSIBLE_VALUES.search(' '.join(description))
+            if match: current.choices = tuple(_QUOTED.findall(match.group(1))) or None
+
+    for line in help_text.splitlines():
+        match = _OPTION_LINE.match(line)
+        if match:
+            close_option()
+            short_name, long_name, optional, required, short_only = match.groups()
+            name = long_name or short_only
+            arg = OPTIONAL if optional else (REQUIRED if required else NO_VALUE)
+            current, description = OptionSpec(name, arg), []
+            options[name] = current
+            if short_name: short[short_name] = name
+            if short_only: short[short_only] = name
+        elif current is not None and line.strip():
+            description.append(line.strip())
+    close_option()
+    version = _VERSION.search(version_text or help_text)
+    return ScrcpyCapabilities(version.group(1) if version else None, options, short)
+
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _binary_key(executable):
+    path = shutil.which(executable)
+    if path is None:
+        return None
+    path = os.path.realpath(path)
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (path, st.st_mtime_ns, st.st_size)
+
+
+def _run_flag(path, flag, timeout):
+    return registry.run([path, flag], timeout=timeout, capture_output=True, text=True,
+                        encoding='utf-8', errors='replace', label='scrcpy')
+
+
+def cached_capabilities(executable: str):
+    """只查缓存、不启动进程：该可执行文件 (且未被替换) 已探测过时返回能力表，否则返回 None"""
+    key = _binary_key(executable)
+    return _cache.get(key) if key else None
+
+
+def probe_capabilities(executable: str, timeout=10):
+    """
+    返回 executable 的能力表，同一文件只探测一次；
+    找不到可执行文件或无法解析 --help 时返回 None (此时不做校验，由启动本身报告错误)。
+    """
+    key = _binary_key(executable)
+    if key is None:
+        return None
+    with _cache_lock:
+        if key in _cache:
+            return _cache[key]
+        try:
+            version = _run_flag(key[0], '--version', timeout)
+            help_result = _run_flag(key[0], '--help', timeout)
+            capabilities = parse_help(help_result.stdout + help_result.stderr, version.stdout + version.stderr)
+        except (OSError, subprocess.SubprocessError):
+            capabilities = None
+        if capabilities is not None and not capabilities.options:
+            capabilities = None
+        _cache[key] = capabilities
+        return capabilities
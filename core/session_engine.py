@@ -0,0 +1,394 @@
+import os
+import time
+# 使用绝对导入，确保 IDE 能正确解析
+from core.adb_executor import default_executor, PRIORITY_HIGH, PRIORITY_LOW
+from core.events import Event
+from core.fleet import FleetLaunch, is_ready_line
+from core.log_pipeline import LogFlowControl
+from core.process_supervisor import ProcessSupervisor
+from core.scrcpy_caps import cached_capabilities, probe_capabilities
+from core.resource_sampler import ResourceSampler
+from core.session_metrics import SessionMetrics
+from core.session_watchdog import SessionHealth, device_online, session_serial
+
+SCRCPY_EXECUTABLE = os.environ.get('SCRCPY', 'scrcpy')
+
+
+class SessionEngine:
+    """
+    【无界面】会话引擎：启动、管理和停止多个 Scrcpy 会话，不依赖 Qt。
+    所有 scrcpy 进程及其输出由同一个 ProcessSupervisor 线程监管，会话数量不再决定线程数量。
+    loop 需提供 call_soon_threadsafe(callback, *args) 与 call_later(delay, callback) (返回带 cancel() 的句柄)，
+    asyncio 事件循环与 core.qt_bridge.QtLoop 均满足；所有事件都在该循环所在线程中发出。
+    """
+    # 有会话时，每隔这么久 (秒) 采样一次所有会话进程的资源占用并检查卡顿
+    TICK_INTERVAL = 1.0
+    # 等待设备重新连接时，检查设备状态的间隔 (秒)
+    DEVICE_POLL_INTERVAL = 2.0
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.session_started = Event()       # (session_id, 设备提示)
+        self.session_stopped = Event()       # (session_id,)
+        self.log = Event()                   # (消息,)
+        self.log_batch = Event()             # (行列表,)
+        self.session_output = Event()        # ({session_id: 行列表},) 与 log_batch 为同一批输出，按会话区分
+        self.metrics_updated = Event()       # (本批指标有变化的 session_id 列表,)
+        self.resources_updated = Event()     # (本轮得到资源采样的 session_id 列表,)
+        self.session_restarting = Event()    # (session_id, 重启前等待秒数, 原因)
+        self.session_restarted = Event()     # (session_id,)
+        # 批量启动：每台设备的结果 (序列号, 是否成功, 说明) 与全部结束后的汇总
+        self.fleet_device_result = Event()
+        self.fleet_finished = Event()
+
+        self.active_sessions = {}
+        self.session_counter = 0
+        # 每个会话的运行指标 (帧率、渲染器、警告等)，由输出流增量解析
+        self.metrics = {}
+        self.resources = ResourceSampler()
+        # core.log_archive.LogArchive，由 set_archive() 设置
+        self.archive = None
+        self._tick_timer = None
+        # 所有会话共享一个流量控制，事件循环来不及处理时监管线程会自行合并/丢弃
+        self.log_flow = LogFlowControl()
+        self.supervisor = ProcessSupervisor(
+            lambda batches: loop.call_soon_threadsafe(self._on_log_batch, batches),
+            lambda session_id, returncode: loop.call_soon_threadsafe(self._on_session_finished, session_id, returncode),
+            flow=self.log_flow)
+        self.supervisor.start()
+
+        self.fleet = None
+        self.last_fleet_metrics = None
+        self._fleet_sessions = {}
+        self._fleet_last_line = {}
+        self._fleet_timer = None
+
+    def start_session(self, session_name_hint: str, cmd_args: list, is_otg=False, restart_policy=None):
+        """
+        restart_policy 为 core.session_watchdog.RestartPolicy 时，会话意外退出或卡顿后按策略自动重启；
+        卡顿检测依赖 --print-fps 的输出，未指定时自动加上。
+        """
+        self.session_counter += 1
+        session_type = "OTG" if is_otg else "Session"
+        session_id = f"{session_type}-{self.session_counter}_{session_name_hint.replace(':', '-')[:10]}"
+
+        base_cmd = [SCRCPY_EXECUTABLE, '--otg'] if is_otg else [SCRCPY_EXECUTABLE]
+        final_cmd = base_cmd + cmd_args
+        watch_stalls = bool(restart_policy and restart_policy.stall_timeout and not is_otg and '--no-video' not in cmd_args)
+        if watch_stalls and '--print-fps' not in cmd_args:
+            final_cmd.append('--print-fps')
+        if not self._check_args(final_cmd[1:]):
+            return None
+
+        process = self._spawn(session_id, final_cmd)
+        if process is None:
+            return None
+
+        self.active_sessions[session_id] = {
+            'hint': session_name_hint, 'cmd': final_cmd, 'pid': process.pid, 'otg': is_otg,
+            'policy': restart_policy, 'health': SessionHealth(restart_policy) if restart_policy else None,
+            'watch_stalls': watch_stalls, 'timer': None,
+        }
+        self.metrics[session_id] = SessionMetrics(session_id, session_name_hint)
+        if self._tick_timer is None:
+            self._tick_timer = self.loop.call_later(self.TICK_INTERVAL, self._on_tick)
+
+        self.session_started.emit(session_id, session_name_hint)
+        self.log.emit(f"会话 '{session_id}' 已启动。")
+        return session_id
+
+    def _spawn(self, session_id, cmd):
+        self.log.emit(f"正在执行命令: {' '.join(cmd)}\n")
+        try:
+            return self.supervisor.spawn(session_id, cmd)
+        except FileNotFoundError:
+            self.log.emit("错误: scrcpy 命令未找到。\n")
+        except Exception as e:
+            self.log.emit(f"启动 scrcpy 时发生错误: {e}\n")
+        return None
+
+    def prefetch_capabilities(self):
+        """在后台探测 scrcpy 能力，第一次启动会话时就不必等待探测"""
+        default_executor().submit(probe_capabilities, SCRCPY_EXECUTABLE, priority=PRIORITY_LOW,
+                                  key='probe_capabilities', name='probe_capabilities')
+
+    def _check_args(self, args: list) -> bool:
+        """
+        启动进程前按已安装 scrcpy 的能力表校验参数。只查缓存，绝不在调用线程 (GUI 线程) 中运行 scrcpy：
+        尚未探测完成时放行并在后台开始探测，之后的启动才校验；无法探测 scrcpy 时同样放行，由启动本身报告错误。
+        """
+        capabilities = cached_capabilities(SCRCPY_EXECUTABLE)
+        if capabilities is None:
+            self.prefetch_capabilities()
+            return True
+        errors = capabilities.validate(args)
+        if errors:
+            self.log.emit("参数校验未通过，未启动 scrcpy:\n" + "\n".join(f"  - {error}" for error in errors))
+        return not errors
+
+    def start_fleet(self, serials: list, cmd_args: list, is_otg=False, concurrency=4, stagger=0.5, ready_timeout=8.0,
+                    restart_policy=None):
+        """在多台设备上以相同参数启动会话，限制并发数并错开启动时间"""
+        if self.fleet:
+            self.log.emit("错误：上一次批量启动尚未完成。")
+            return False
+        if not serials:
+            self.log.emit("错误：没有可启动的设备！")
+            return False
+        if not self._check_args((['--otg'] if is_otg else []) + ['--serial', serials[0]] + list(cmd_args)):
+            return False
+        self.fleet = FleetLaunch(serials, concurrency, stagger, ready_timeout)
+        self._fleet_sessions.clear()
+        self._fleet_args = (list(cmd_args), is_otg, restart_policy)
+        self.log.emit(f"开始批量启动 {len(self.fleet.serials)} 台设备 (并发 {self.fleet.concurrency}，间隔 {self.fleet.stagger:g} 秒)")
+        self._advance_fleet()
+        return True
+
+    def cancel_fleet(self):
+        """取消尚未开始启动的设备，已启动的会话不受影响"""
+        if self.fleet and self.fleet.pending:
+            for serial in list(self.fleet.pending):
+                self._fleet_result(serial, False, "已取消")
+            self._advance_fleet()
+
+    def _advance_fleet(self):
+        fleet = self.fleet
+        if fleet is None:
+            return
+        for serial in fleet.expire():
+            self._fleet_result(serial, True, f"运行超过 {fleet.ready_timeout:g} 秒未退出，视为已启动")
+        cmd_args, is_otg, restart_policy = self._fleet_args
+        for serial in fleet.due():
+            fleet.launched(serial)
+            hint = f"{serial}-OTG" if is_otg else serial
+            session_id = self.start_session(hint, ['--serial', serial] + cmd_args, is_otg=is_otg,
+                                            restart_policy=restart_policy)
+            if session_id is None:
+                self._fleet_result(serial, False, "无法启动 scrcpy 进程")
+            else:
+                self._fleet_sessions[session_id] = serial
+        if fleet.done:
+            self._finish_fleet()
+            return
+        wakeup = fleet.next_wakeup()
+        if self._fleet_timer: self._fleet_timer.cancel()
+        self._fleet_timer = self.loop.call_later(wakeup, self._advance_fleet) if wakeup is not None else None
+
+    def _fleet_result(self, serial, ok, message):
+        if ok:
+            self.fleet.mark_started(serial, message)
+        else:
+            self.fleet.mark_failed(serial, message)
+        result = self.fleet.results.get(serial)
+        elapsed = f" ({result['elapsed']:.1f} 秒)" if result and ok else ""
+        self.log.emit(f"[批量启动] {serial}: {'成功' if ok else '失败'} - {message}{elapsed}")
+        self.fleet_device_result.emit(serial, ok, message)
+
+    def _finish_fleet(self):
+        if self._fleet_timer: self._fleet_timer.cancel()
+        self._fleet_timer = None
+        self._fleet_sessions.clear()
+        self._fleet_last_line.clear()
+        metrics = self.fleet.summary()
+        self.last_fleet_metrics = metrics
+        self.fleet = None
+        all_started = metrics['time_to_all_started']
+        self.log.emit(
+            f"批量启动完成：成功 {metrics['started']}/{metrics['total']}，失败 {metrics['failed']}，"
+            f"全部启动耗时 {'-' if all_started is None else f'{all_started:.1f} 秒'}")
+        self.fleet_finished.emit(metrics)
+
+    def _check_fleet_output(self, batches: dict):
+        for session_id, lines in batches.items():
+            serial = self._fleet_sessions.get(session_id)
+            if serial is None or serial not in self.fleet.launching:
+                continue
+            for line in lines:
+                if is_ready_line(line):
+                    self._fleet_sessions.pop(session_id)
+                    self._fleet_result(serial, True, line.strip())
+                    break
+            else:
+                if lines: self._fleet_last_line[session_id] = lines[-1].strip()
+        self._advance_fleet()
+
+    def _on_tick(self):
+        if self.resources.available:
+            # 等待重启的会话没有进程 (pid 为 None)
+            pids = {session_id: info['pid'] for session_id, info in self.active_sessions.items() if info['pid']}
+            updated = self.resources.sample(pids)
+            if updated:
+                self.resources_updated.emit(updated)
+        self._check_stalls()
+        self._tick_timer = self.loop.call_later(self.TICK_INTERVAL, self._on_tick) if self.active_sessions else None
+
+    def _check_stalls(self):
+        now = time.monotonic()
+        for session_id, info in self.active_sessions.items():
+            if not info['watch_stalls'] or not info['pid'] or info.get('stopping') or info.get('stalled'):
+                continue
+            metrics = self.metrics.get(session_id)
+            silent = now - (metrics.last_frame_at or metrics.started_at) if metrics else 0
+            if silent >= info['policy'].stall_timeout:
+                info['stalled'] = True
+                info['health'].stalls += 1
+                self.log.emit(f"会话 '{session_id}' 已 {silent:.0f} 秒没有画面帧，判定为卡顿，正在重启...")
+                self.supervisor.terminate(session_id)
+
+    def session_stats(self) -> dict:
+        """
+        导出用：{session_id: {'hint', 'pid', 'metrics': 指标快照, 'resources': 最新资源采样,
+        'health': 重启与停机统计}}，没有数据的项为 None
+        """
+        return {session_id: {'hint': info['hint'], 'pid': info['pid'],
+                             'metrics': self.metrics[session_id].snapshot() if session_id in self.metrics else None,
+                             'resources': self.resources.latest(session_id),
+                             'health': info['health'].snapshot() if info['health'] else None}
+                for session_id, info in self.active_sessions.items()}
+
+    def stop_session(self, session_id: str):
+        info = self.active_sessions.get(session_id)
+        if info is None or info.get('stopping'):
+            return
+        info['stopping'] = True
+        if info['pid'] is None:
+            # 正在等待重启，没有进程可停
+            if info['timer']: info['timer'].cancel()
+            self._drop_session(session_id)
+            return
+        self.log.emit("正在停止 scrcpy 进程...\n")
+        self.supervisor.terminate(session_id)
+
+    def _on_log_batch(self, batches: dict):
+        # 在事件循环线程中执行：转发完成即代表这一批已被消费
+        try:
+            lines = []
+            changed = []
+            for session_id, session_lines in batches.items():
+                lines.extend(session_lines)
+                metrics = self.metrics.get(session_id)
+                if metrics is not None and metrics.feed(session_lines):
+                    changed.append(session_id)
+            self.log_batch.emit(lines)
+            self.session_output.emit(batches)
+            if changed:
+                self.metrics_updated.emit(changed)
+            if self._fleet_sessions:
+                self._check_fleet_output(batches)
+        finally:
+            self.log_flow.release()
+
+    def _on_session_finished(self, session_id: str, returncode: int):
+        serial = self._fleet_sessions.pop(session_id, None)
+        last_line = self._fleet_last_line.pop(session_id, None)
+        if serial is not None and serial in self.fleet.launching:
+            reason = f"scrcpy 在启动完成前退出 (返回码 {returncode})"
+            self._fleet_result(serial, False, f"{reason}: {last_line}" if last_line else reason)
+            self._advance_fleet()
+        metrics = self.metrics.pop(session_id, None)
+        session_info = self.active_sessions.get(session_id)
+        if session_info is None:
+            return
+        if session_info.get('stopping'):
+            self.log.emit("进程已停止。\n")
+        else:
+            stalled = session_info.pop('stalled', False)
+            if metrics is not None:
+                metrics.finish(returncode)
+            reason = "画面卡顿" if stalled else metrics.disconnect_reason if metrics else f"返回码 {returncode}"
+            self.log.emit(f"会话 '{session_id}' 已结束: {reason}")
+            # 返回码 0 是用户关闭了 scrcpy 窗口，不重启
+            if session_info['health'] and (stalled or returncode != 0) and self._schedule_restart(session_id, reason):
+                return
+        self._drop_session(session_id)
+
+    def _drop_session(self, session_id):
+        info = self.active_sessions.pop(session_id, None)
+        health = info and info['health']
+        if health and (health.restarts or health.is_down):
+            stats = health.snapshot()
+            mttr = f"{stats['mttr']:.1f} 秒" if stats['mttr'] is not None else "-"
+            self.log.emit(f"会话 '{session_id}' 共重启 {stats['restarts']} 次 (其中卡顿 {stats['stalls']} 次)，"
+                          f"累计停机 {stats['downtime']:.1f} 秒，MTTR {mttr}")
+        if self.archive: self.archive.close_session(session_id)
+        self.session_stopped.emit(session_id)
+        self.log.emit(f"会话 '{session_id}' 已彻底停止并清理。")
+
+    def _schedule_restart(self, session_id, reason) -> bool:
+        info = self.active_sessions[session_id]
+        health = info['health']
+        health.mark_down(reason)
+        delay = health.next_delay()
+        if delay is None:
+            policy = info['policy']
+            self.log.emit(f"会话 '{session_id}' 在 {policy.window:g} 秒内已重启 {policy.max_restarts} 次，不再自动重启。")
+            return False
+        info['pid'] = None
+        info['timer'] = self.loop.call_later(delay, self._restart_session, session_id)
+        self.log.emit(f"会话 '{session_id}' 将在 {delay:.1f} 秒后重启 (第 {health.attempt + 1} 次连续重启)")
+        self.session_restarting.emit(session_id, delay, reason)
+        return True
+
+    def _restart_session(self, session_id):
+        info = self.active_sessions.get(session_id)
+        if info is None or info.get('stopping'):
+            return
+        info['timer'] = None
+        if not info['policy'].wait_for_device or info['otg']:
+            self._respawn(session_id)
+            return
+        task = default_executor().submit(device_online, session_serial(info['cmd']), priority=PRIORITY_HIGH,
+                                         name='device_online')
+        task.add_done_callback(lambda task: self.loop.call_soon_threadsafe(self._on_device_checked, session_id, task))
+
+    def _on_device_checked(self, session_id, task):
+        info = self.active_sessions.get(session_id)
+        if info is None or info.get('stopping'):
+            return
+        if task.cancelled() or not task.result():
+            if not info.get('waiting_device'):
+                info['waiting_device'] = True
+                serial = session_serial(info['cmd'])
+                self.log.emit(f"会话 '{session_id}' 正在等待设备{f' {serial} ' if serial else ''}重新连接...")
+            info['timer'] = self.loop.call_later(self.DEVICE_POLL_INTERVAL, self._restart_session, session_id)
+            return
+        info.pop('waiting_device', None)
+        self._respawn(session_id)
+
+    def _respawn(self, session_id):
+        info = self.active_sessions[session_id]
+        process = self._spawn(session_id, info['cmd'])
+        if process is None:
+            # 找不到或无法执行 scrcpy，重试也无济于事
+            self._drop_session(session_id)
+            return
+        info['pid'] = process.pid
+        health = info['health']
+        health.mark_restarted()
+        self.metrics[session_id] = SessionMetrics(session_id, info['hint'])
+        if self._tick_timer is None:
+            self._tick_timer = self.loop.call_later(self.TICK_INTERVAL, self._on_tick)
+        self.log.emit(f"会话 '{session_id}' 已重启 (停机 {health.outages[-1]:.1f} 秒，累计重启 {health.restarts} 次)")
+        self.session_restarted.emit(session_id)
+
+    def stop_all_sessions(self):
+        self.cancel_fleet()
+        session_ids = list(self.active_sessions.keys())
+        for sid in session_ids:
+            self.stop_session(sid)
+
+    def set_archive(self, archive):
+        """
+        archive 为 core.log_archive.LogArchive 时，所有会话的原始输出在监管线程中直接提交归档，
+        界面来不及处理而丢弃的行也会完整归档；为 None 时停止归档。归档由调用方负责关闭。
+        """
+        self.archive = archive
+        self.supervisor.tap = archive.submit if archive else None
+
+    def shutdown(self, timeout=5.0):
+        """退出时调用：同时结束所有会话并等待进程退出，总耗时不随会话数增加"""
+        self.stop_all_sessions()
+        self.supervisor.wait_all(timeout)
+        self.supervisor.stop()
+        if self._tick_timer: self._tick_timer.cancel()
+        self._tick_timer = None
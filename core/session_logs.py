@@ -0,0 +1,201 @@
+"""
+按会话分开保存的日志：每个会话 (以及应用自身的消息) 各有一个固定容量的缓冲区，保存原始行与全局递增的序号，
+合并多个会话时按序号恢复时间顺序。缓冲区里只有字符串与整数 (不受垃圾回收跟踪)，级别在筛选时才计算。
+筛选 (会话、最低级别、正则) 在后台线程中对缓冲区快照进行，从最新的日志往前找，凑够所需行数即停止。
+"""
+import bisect
+import re
+from core.adb_executor import check_cancelled
+from core.ring_buffer import RingBuffer
+
+LEVEL_VERBOSE, LEVEL_DEBUG, LEVEL_INFO, LEVEL_WARN, LEVEL_ERROR = range(5)
+_LEVEL_PREFIXES = (('INFO:', LEVEL_INFO), ('WARN:', LEVEL_WARN), ('ERROR:', LEVEL_ERROR),
+                   ('DEBUG:', LEVEL_DEBUG), ('VERBOSE:', LEVEL_VERBOSE))
+# 应用自身 (而非某个 scrcpy 会话) 的消息所在的通道
+APP_CHANNEL = ''
+SESSION_LOG_LINES = 100_000
+MAX_LOG_SESSIONS = 64
+
+
+def line_level(line: str) -> int:
+    """按 scrcpy 的日志前缀 (可带 '[server] ') 判断级别，没有前缀的行视为 INFO"""
+    if line.startswith('[server] '):
+        line = line[9:]
+    for prefix, level in _LEVEL_PREFIXES:
+        if line.startswith(prefix):
+            return level
+    return LEVEL_INFO
+
+
+def tag_lines(session_id, lines, tagged: bool) -> list:
+    """tagged 为 True (多个会话合并显示) 时在行首标出所属会话"""
+    if not tagged or session_id == APP_CHANNEL:
+        return list(lines)
+    prefix = f"[{session_id}] "
+    return [prefix + line for line in lines]
+
+
+class _SessionBuffer:
+    __slots__ = ('lines', 'seqs')
+
+    def __init__(self, capacity):
+        self.lines = RingBuffer(capacity)
+        self.seqs = RingBuffer(capacity)
+
+
+class SessionLogStore:
+    """
+    【按会话】日志缓冲区
+    每个会话最多保留 capacity 行，超出后丢弃最旧的行；会话结束后缓冲区仍保留以便排查，
+    会话数超过 max_sessions 时丢弃最早创建的会话缓冲区。只应在一个线程 (GUI 线程) 中调用。
+    """
+
+    def __init__(self, capacity=SESSION_LOG_LINES, max_sessions=MAX_LOG_SESSIONS):
+        self.capacity = capacity
+        self.max_sessions = max_sessions
+        self._buffers = {}
+        self._seq = 0
+
+    def sessions(self) -> list:
+        return [session_id for session_id in self._buffers if session_id != APP_CHANNEL]
+
+    def append(self, session_id, lines: list):
+        buffer = self._buffers.get(session_id)
+        if buffer is None:
+            buffer = self._buffers[session_id] = _SessionBuffer(self.capacity)
+            self._evict()
+        seq = self._seq
+        self._seq = seq + len(lines)
+        buffer.lines.extend(lines)
+        buffer.seqs.extend(range(seq, self._seq))
+
+    def _evict(self):
+        sessions = self.sessions()
+        for session_id in sessions[:max(0, len(sessions) - self.max_sessions)]:
+            del self._buffers[session_id]
+
+    def count(self, session_id=None) -> int:
+        if session_id is None:
+            return sum(len(buffer.lines) for buffer in self._buffers.values())
+        buffer = self._buffers.get(session_id)
+        return len(buffer.lines) if buffer else 0
+
+    def lines(self, session_id, last=None) -> list:
+        buffer = self._buffers.get(session_id)
+        return buffer.lines.snapshot(last) if buffer else []
+
+    def snapshot(self, session_id=None, last=None) -> list:
+        """
+        返回 [(session_id, 序号列表, 行列表)]：session_id 为 None 时包含所有缓冲区，否则只含该会话；
+        last 不为 None 时每个缓冲区只取最新的 last 行。只复制列表本身 (切片)，可以交给后台线程筛选。
+        """
+        buffers = self._buffers.items() if session_id is None else \
+            [(session_id, self._buffers[session_id])] if session_id in self._buffers else []
+        return [(sid, buffer.seqs.snapshot(last), buffer.lines.snapshot(last)) for sid, buffer in buffers]
+
+    def clear(self):
+        self._buffers.clear()
+
+
+class LogQuery:
+    """日志视图的筛选条件：session_id 为 None 表示全部会话；pattern 为正则表达式 (不区分大小写)"""
+
+    def __init__(self, session_id=None, min_level=LEVEL_VERBOSE, pattern=''):
+        self.session_id = session_id
+        self.min_level = min_level
+        self.pattern = pattern
+        # 无效的正则在这里抛出 re.error，由调用方提示用户
+        self.regex = re.compile(pattern, re.IGNORECASE) if pattern else None
+
+    @property
+    def tagged(self) -> bool:
+        return self.session_id is None
+
+    @property
+    def filters_lines(self) -> bool:
+        """是否需要逐行检查 (否则只按会话选取)"""
+        return self.min_level > LEVEL_VERBOSE or self.regex is not None
+
+    def filter_lines(self, lines: list) -> list:
+        if self.min_level > LEVEL_VERBOSE:
+            level = self.min_level
+            lines = [line for line in lines if line_level(line) >= level]
+        if self.regex is not None:
+            search = self.regex.search
+            lines = [line for line in lines if search(line)]
+        return lines
+
+    def __eq__(self, other):
+        return (isinstance(other, LogQuery) and (self.session_id, self.min_level, self.pattern)
+                == (other.session_id, other.min_level, other.pattern))
+
+
+class _Cursor:
+    """run_query 中一个缓冲区快照的扫描位置：end 之前尚未检查，blocks 为已找到的 (序号列表, 行列表) 块 (从新到旧)"""
+    __slots__ = ('session_id', 'seqs', 'lines', 'end', 'blocks')
+
+    def __init__(self, session_id, seqs, lines):
+        self.session_id = session_id
+        self.seqs = seqs
+        self.lines = lines
+        self.end = len(lines)
+        self.blocks = []
+
+    def top(self) -> int:
+        """尚未检查部分中最新一行的序号，已检查完时为 -1"""
+        return self.seqs[self.end - 1] if self.end else -1
+
+    def newer_than(self, seq) -> int:
+        """已找到的行中序号大于 seq 的行数"""
+        return sum(len(seqs) - bisect.bisect_right(seqs, seq) for seqs, _ in self.blocks)
+
+
+def run_query(snapshots: list, query: LogQuery, limit: int, chunk=4096) -> list:
+    """
+    在后台线程中执行：返回所有快照中符合条件的最新 limit 行 (按时间顺序，已按需加上会话标记)。
+    snapshots 为 SessionLogStore.snapshot() 的结果。总是先检查尚未检查部分中最新的一块，
+    各缓冲区按时间交错推进，已找到的行足以确定最新的 limit 行后即停止，不必把每个缓冲区都筛选到 limit 行。
+    """
+    if not limit:
+        return []
+    cursors = [_Cursor(session_id, seqs, lines) for session_id, seqs, lines in snapshots if lines]
+    # 不逐行筛选时每个缓冲区平均只需 limit / 缓冲区数 行，块不宜过大
+    chunk = max(256, min(chunk, limit // max(1, len(cursors))))
+    level = query.min_level
+    search = query.regex.search if query.regex else None
+    found = 0
+    while cursors:
+        cursor = max(cursors, key=_Cursor.top)
+        top = cursor.top()
+        if top < 0:
+            break
+        # 比所有未检查的行都新的已找到行凑够 limit 行，结果已确定
+        if found >= limit and sum(c.newer_than(top) for c in cursors) >= limit:
+            break
+        check_cancelled()
+        start = max(0, cursor.end - chunk)
+        seqs, lines = cursor.seqs[start:cursor.end], cursor.lines[start:cursor.end]
+        if level > LEVEL_VERBOSE or search is not None:
+            keep = range(len(lines))
+            if level > LEVEL_VERBOSE:
+                keep = [i for i in keep if line_level(lines[i]) >= level]
+            if search is not None:
+                keep = [i for i in keep if search(lines[i])]
+            seqs, lines = [seqs[i] for i in keep], [lines[i] for i in keep]
+        if lines:
+            cursor.blocks.append((seqs, lines))
+            found += len(lines)
+        cursor.end = start
+    # 合并时不创建 (序号, 行) 元组：大量新建元组会触发垃圾回收，遍历缓冲区快照中的全部行
+    tagged = query.tagged
+    merged_seqs, merged_lines = [], []
+    for cursor in cursors:
+        prefix = f"[{cursor.session_id}] " if tagged and cursor.session_id != APP_CHANNEL else ""
+        for seqs, lines in reversed(cursor.blocks):
+            merged_seqs.extend(seqs)
+            merged_lines.extend([prefix + line for line in lines] if prefix else lines)
+    if len(cursors) <= 1:
+        return merged_lines[-limit:]
+    # 各段本身有序，sort 会识别这些有序段并合并
+    order = sorted(range(len(merged_seqs)), key=merged_seqs.__getitem__)
+    return [merged_lines[i] for i in order[-limit:]]
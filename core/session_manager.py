@@ -1,59 +1,91 @@
-from PyQt6.QtCore import QThread, QObject, pyqtSignal
+from PyQt6.QtCore import QObject, pyqtSignal
 # 使用绝对导入，确保 IDE 能正确解析
-from core.command_runner import ScrcpyWorker
+from core.qt_bridge import QtLoop, forward
+from core.session_engine import SessionEngine
 
 
 class SessionManager(QObject):
     """
     负责启动、管理和停止多个 Scrcpy 会话。
+    Qt 适配层：实际逻辑在不依赖 Qt 的 SessionEngine 中，这里只把引擎事件转为信号并在 GUI 线程中驱动引擎。
     """
     session_started = pyqtSignal(str, str)
     session_stopped = pyqtSignal(str)
     log_signal = pyqtSignal(str)
+    log_batch_signal = pyqtSignal(list)
+    # 与 log_batch_signal 为同一批输出，按会话区分：{session_id: 行列表}
+    session_output_signal = pyqtSignal(dict)
+    # 本批输出中指标有变化的 session_id 列表，指标本身通过 metrics(session_id) 读取
+    metrics_updated = pyqtSignal(list)
+    # 本轮得到资源采样 (CPU、内存、读写速率) 的 session_id 列表
+    resources_updated = pyqtSignal(list)
+    # 看门狗：会话意外结束、即将重启 (session_id, 等待秒数, 原因) 与已重启 (session_id)
+    session_restarting = pyqtSignal(str, float, str)
+    session_restarted = pyqtSignal(str)
+    # 批量启动：每台设备的结果 (序列号, 是否成功, 说明) 与全部结束后的汇总
+    fleet_device_result = pyqtSignal(str, bool, str)
+    fleet_finished = pyqtSignal(dict)
 
     def __init__(self):
         super().__init__()
-        self.active_sessions = {}
-        self.session_counter = 0
+        self.engine = SessionEngine(QtLoop(self))
+        forward(self.engine.session_started, self.session_started)
+        forward(self.engine.session_stopped, self.session_stopped)
+        forward(self.engine.log, self.log_signal)
+        forward(self.engine.log_batch, self.log_batch_signal)
+        forward(self.engine.session_output, self.session_output_signal)
+        forward(self.engine.metrics_updated, self.metrics_updated)
+        forward(self.engine.resources_updated, self.resources_updated)
+        forward(self.engine.session_restarting, self.session_restarting)
+        forward(self.engine.session_restarted, self.session_restarted)
+        forward(self.engine.fleet_device_result, self.fleet_device_result)
+        forward(self.engine.fleet_finished, self.fleet_finished)
 
-    def start_session(self, session_name_hint: str, cmd_args: list, is_otg=False):
-        self.session_counter += 1
-        session_type = "OTG" if is_otg else "Session"
-        session_id = f"{session_type}-{self.session_counter}_{session_name_hint.replace(':', '-')[:10]}"
+    @property
+    def active_sessions(self):
+        return self.engine.active_sessions
 
-        base_cmd = ['scrcpy', '--otg'] if is_otg else ['scrcpy']
-        final_cmd = base_cmd + cmd_args
+    def metrics(self, session_id):
+        """返回会话的 SessionMetrics，会话已结束时返回 None"""
+        return self.engine.metrics.get(session_id)
 
-        thread = QThread()
-        worker = ScrcpyWorker()
-        worker.moveToThread(thread)
+    def resources(self, session_id):
+        """返回会话最新的资源采样 (见 core.resource_sampler)，尚无采样时返回 None"""
+        return self.engine.resources.latest(session_id)
 
-        worker.log_signal.connect(self.log_signal)
-        worker.finished_signal.connect(lambda: self._on_session_finished(session_id))
+    def health(self, session_id):
+        """返回会话的 SessionHealth (重启与停机统计)，未设置重启策略或会话已结束时返回 None"""
+        session = self.engine.active_sessions.get(session_id)
+        return session['health'] if session else None
 
-        thread.started.connect(lambda: worker.run(final_cmd))
-        thread.start()
+    def session_stats(self) -> dict:
+        return self.engine.session_stats()
 
-        self.active_sessions[session_id] = {'thread': thread, 'worker': worker}
+    @property
+    def last_fleet_metrics(self):
+        return self.engine.last_fleet_metrics
 
-        self.session_started.emit(session_id, session_name_hint)
-        self.log_signal.emit(f"会话 '{session_id}' 已启动。")
+    def prefetch_capabilities(self):
+        self.engine.prefetch_capabilities()
+
+    def start_session(self, session_name_hint: str, cmd_args: list, is_otg=False, restart_policy=None):
+        return self.engine.start_session(session_name_hint, cmd_args, is_otg, restart_policy)
+
+    def start_fleet(self, serials: list, cmd_args: list, is_otg=False, concurrency=4, stagger=0.5, ready_timeout=8.0,
+                    restart_policy=None):
+        return self.engine.start_fleet(serials, cmd_args, is_otg, concurrency, stagger, ready_timeout, restart_policy)
+
+    def cancel_fleet(self):
+        self.engine.cancel_fleet()
 
     def stop_session(self, session_id: str):
-        if session_id in self.active_sessions:
-            worker = self.active_sessions[session_id]['worker']
-            worker.stop()
-
-    def _on_session_finished(self, session_id: str):
-        if session_id in self.active_sessions:
-            session_info = self.active_sessions.pop(session_id)
-            thread = session_info['thread']
-            thread.quit()
-            thread.wait()
-            self.session_stopped.emit(session_id)
-            self.log_signal.emit(f"会话 '{session_id}' 已彻底停止并清理。")
+        self.engine.stop_session(session_id)
 
     def stop_all_sessions(self):
-        session_ids = list(self.active_sessions.keys())
-        for sid in session_ids:
-            self.stop_session(sid)
\ No newline at end of file
+        self.engine.stop_all_sessions()
+
+    def set_archive(self, archive):
+        self.engine.set_archive(archive)
+
+    def shutdown(self, timeout=5.0):
+        self.engine.shutdown(timeout)
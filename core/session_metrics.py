@@ -0,0 +1,167 @@
+"""
+会话运行指标：从 scrcpy 的输出中逐行提取 --print-fps 帧率、渲染器与纹理尺寸、警告、错误与断开原因。
+fps 行最先判断并走单独的快速路径，不使用正则；无关的行再经一次前缀比较即被跳过。
+"""
+import re
+import time
+from core.ring_buffer import RingBuffer
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+TREND_UP, TREND_FLAT, TREND_DOWN = 1, 0, -1
+TREND_ARROWS = {TREND_UP: "↑", TREND_FLAT: "→", TREND_DOWN: "↓"}
+# 表示会话因设备或连接问题结束的输出 (scrcpy 原文片段)
+_DISCONNECT_MARKERS = ('Device disconnected', 'Server connection failed', 'Demuxer error', 'Controller error',
+                       'Could not find any ADB device', 'Time limit reached')
+_DISCONNECT_RE = re.compile('|'.join(map(re.escape, _DISCONNECT_MARKERS)))
+_PREFIXES = ('INFO: ', 'WARN: ', 'ERROR: ', '[server] ')
+
+
+class SessionMetrics:
+    """
+    【按会话】运行指标
+    fps_series 为最近 HISTORY 个 (时间, fps) 采样 (scrcpy 每秒输出一次)；时间为 time.monotonic()。
+    last_fps_at 为最近一次输出帧率的时间，last_frame_at 为最近一次帧率大于 0 的时间 (画面卡住时 scrcpy 仍输出 0 fps)。
+    """
+    HISTORY = 600
+    # 趋势比较最近两个窗口的平均帧率，变化超过 TREND_THRESHOLD 才算上升/下降
+    TREND_WINDOW = 5
+    TREND_THRESHOLD = 0.1
+
+    __slots__ = ('session_id', 'hint', 'started_at', 'ended_at', 'returncode', 'fps_series', 'fps', 'last_fps_at',
+                 'last_frame_at', 'frames_skipped', 'renderer', 'texture', 'device', 'warnings', 'last_warning', 'errors',
+                 'last_error', 'disconnect_reason')
+
+    def __init__(self, session_id, hint='', now=None):
+        self.session_id = session_id
+        self.hint = hint
+        self.started_at = time.monotonic() if now is None else now
+        self.ended_at = None
+        self.returncode = None
+        self.fps_series = RingBuffer(self.HISTORY)
+        self.fps = None
+        self.last_fps_at = None
+        self.last_frame_at = None
+        self.frames_skipped = 0
+        self.renderer = None
+        self.texture = None
+        self.device = None
+        self.warnings = 0
+        self.last_warning = None
+        self.errors = 0
+        self.last_error = None
+        self.disconnect_reason = None
+
+    def feed(self, lines, now=None) -> bool:
+        """解析一批输出行 (同一批视为同一时刻)，返回是否有指标发生变化"""
+        now = time.monotonic() if now is None else now
+        changed = False
+        series = self.fps_series
+        for line in lines:
+            # fps 行 (每秒一行) 最先判断并就地记录；其余绝大多数行一次前缀比较即被跳过
+            if line.endswith(' fps') and line.startswith('INFO: ') and (value := line[6:-4]).isdigit():
+                self.fps = fps = int(value)
+                self.last_fps_at = now
+                if fps: self.last_frame_at = now
+                series.append((now, fps))
+                changed = True
+            elif line.startswith(_PREFIXES) and self._parse_line(line, now):
+                changed = True
+        return changed
+
+    def _parse_line(self, line, now) -> bool:
+        if line.startswith('INFO: '):
+            body = line[6:]
+            if ' fps (+' in body:
+                value, _, tail = body.partition(' fps (+')
+                skipped = tail.split(' ', 1)[0]
+                if not value.isdigit():
+                    return False
+                self._record_fps(int(value), int(skipped) if skipped.isdigit() else 0, now)
+            elif body.startswith('Renderer: '):
+                self.renderer = body[10:].strip()
+            elif body.startswith('Texture: '):
+                width, _, height = body[9:].strip().partition('x')
+                if not (width.isdigit() and height.isdigit()):
+                    return False
+                self.texture = (int(width), int(height))
+            elif body.startswith('Device: '):
+                self.device = body[8:].strip()
+            elif body.startswith(_DISCONNECT_MARKERS):
+                self.disconnect_reason = body.strip()
+            else:
+                return False
+        elif line.startswith('WARN: '):
+            self.warnings += 1
+            self.last_warning = line[6:].strip()
+            if _DISCONNECT_RE.search(line):
+                self.disconnect_reason = self.last_warning
+        elif line.startswith('ERROR: '):
+            self.errors += 1
+            self.last_error = line[7:].strip()
+            if self.disconnect_reason is None and _DISCONNECT_RE.search(line):
+                self.disconnect_reason = self.last_error
+        else:
+            # 服务端转发的日志
+            return line.startswith('[server] ') and self._parse_line(line[9:], now)
+        return True
+
+    def _record_fps(self, fps, skipped, now):
+        self.fps = fps
+        self.last_fps_at = now
+        if fps: self.last_frame_at = now
+        self.frames_skipped += skipped
+        self.fps_series.append((now, fps))
+
+    def finish(self, returncode, now=None):
+        self.ended_at = time.monotonic() if now is None else now
+        self.returncode = returncode
+        if self.disconnect_reason is None:
+            if self.last_error:
+                self.disconnect_reason = self.last_error
+            else:
+                self.disconnect_reason = "正常退出" if returncode == 0 else f"返回码 {returncode}"
+
+    def recent_fps(self, count: int) -> list:
+        return [sample[1] for sample in self.fps_series.snapshot(count)]
+
+    def trend(self) -> int:
+        """比较最近两个 TREND_WINDOW 窗口的平均帧率"""
+        window = self.TREND_WINDOW
+        samples = self.recent_fps(window * 2)
+        if len(samples) < window * 2:
+            return TREND_FLAT
+        before = sum(samples[:window]) / window
+        after = sum(samples[window:]) / window
+        if after > before * (1 + self.TREND_THRESHOLD):
+            return TREND_UP
+        if after < before * (1 - self.TREND_THRESHOLD):
+            return TREND_DOWN
+        return TREND_FLAT
+
+    def sparkline(self, count=12) -> str:
+        samples = self.recent_fps(count)
+        if not samples:
+            return ""
+        peak = max(max(samples), 1)
+        return "".join(SPARK_CHARS[min(len(SPARK_CHARS) - 1, fps * len(SPARK_CHARS) // (peak + 1))] for fps in samples)
+
+    def summary(self) -> str:
+        """会话列表中显示的一行状态"""
+        parts = [f"{self.fps} fps {TREND_ARROWS[self.trend()]} {self.sparkline()}" if self.fps is not None else "-- fps"]
+        if self.texture: parts.append(f"{self.texture[0]}x{self.texture[1]}")
+        if self.renderer: parts.append(self.renderer)
+        if self.frames_skipped: parts.append(f"跳帧 {self.frames_skipped}")
+        if self.warnings: parts.append(f"警告 {self.warnings}")
+        if self.errors: parts.append(f"错误 {self.errors}")
+        return " | ".join(parts)
+
+    def snapshot(self) -> dict:
+        samples = self.recent_fps(self.HISTORY)
+        return {
+            'session_id': self.session_id, 'hint': self.hint, 'fps': self.fps, 'trend': self.trend(),
+            'avg_fps': sum(samples) / len(samples) if samples else None, 'min_fps': min(samples, default=None),
+            'frames_skipped': self.frames_skipped, 'renderer': self.renderer, 'texture': self.texture,
+            'device': self.device, 'warnings': self.warnings, 'last_warning': self.last_warning,
+            'errors': self.errors, 'last_error': self.last_error, 'disconnect_reason': self.disconnect_reason,
+            'uptime': (self.ended_at or time.monotonic()) - self.started_at, 'returncode': self.returncode,
+        }
@@ -0,0 +1,131 @@
+"""
+会话看门狗：意外退出或卡顿的会话按重启策略自动重启，并按会话统计重启次数、停机时长与 MTTR。
+本模块只负责策略与统计，定时、进程与设备检查由 SessionEngine 驱动。
+"""
+import random
+import time
+from collections import deque
+from core.adb_client import AdbClient, AdbError
+
+
+def session_serial(cmd: list):
+    """从 scrcpy 命令行中取出 --serial / -s 指定的设备，没有指定时返回 None"""
+    for i, arg in enumerate(cmd):
+        if arg in ('-s', '--serial') and i + 1 < len(cmd):
+            return cmd[i + 1]
+        if arg.startswith('--serial='):
+            return arg[9:]
+    return None
+
+
+def device_online(serial=None, adb_client: AdbClient = None) -> bool:
+    """设备是否处于 device 状态；serial 为 None 时 (-d / -e / 默认设备) 只要有任一设备在线即可"""
+    client = adb_client or AdbClient()
+    try:
+        if serial:
+            return client.get_state(serial) == 'device'
+        return any(state == 'device' for _, state, _ in client.devices())
+    except (AdbError, OSError):
+        return False
+
+
+class RestartPolicy:
+    """
+    【按会话】重启策略
+    第 n 次连续重启前等待 base_delay * 2^n 秒 (不超过 max_delay)，再加减 jitter 比例的随机抖动，
+    避免多台设备同时掉线后又同时冲击 ADB 服务；window 秒内最多重启 max_restarts 次，超出即放弃。
+    会话稳定运行超过 stable_after 秒后，退避重新从 base_delay 开始。
+    stall_timeout 秒内没有画面帧 (--print-fps 输出的帧率一直为 0 或不再输出) 视为卡顿并重启，为 0 时不检测。
+    wait_for_device 为 True 时，重启前先等待设备重新出现在 ADB 设备列表中。
+    """
+
+    def __init__(self, base_delay=1.0, max_delay=60.0, jitter=0.2, max_restarts=5, window=600.0,
+                 stable_after=60.0, stall_timeout=15.0, wait_for_device=True):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.max_restarts = max_restarts
+        self.window = window
+        self.stable_after = stable_after
+        self.stall_timeout = stall_timeout
+        self.wait_for_device = wait_for_device
+
+    def delay(self, attempt: int, rand=random.random) -> float:
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return max(0.0, delay * (1 + self.jitter * (2 * rand() - 1)))
+
+
+class SessionHealth:
+    """
+    【按会话】可用性统计
+    一次停机从进程意外退出 (或判定卡顿) 开始，到重启后的进程启动为止；MTTR 为已恢复停机的平均时长。
+    """
+
+    def __init__(self, policy: RestartPolicy, clock=time.monotonic):
+        self.policy = policy
+        self.clock = clock
+        self.started_at = clock()
+        self.up_since = self.started_at
+        self.down_since = None
+        self.attempt = 0
+        self.restarts = 0
+        self.stalls = 0
+        self.downtime = 0.0
+        self.outages = []
+        self.last_reason = None
+        self._restart_times = deque()
+
+    @property
+    def is_down(self) -> bool:
+        return self.down_since is not None
+
+    def mark_down(self, reason):
+        now = self.clock()
+        if self.down_since is None:
+            self.down_since = now
+        if self.up_since is not None and now - self.up_since >= self.policy.stable_after:
+            self.attempt = 0
+        self.up_since = None
+        self.last_reason = reason
+
+    def next_delay(self):
+        """返回下一次重启前的等待秒数；window 内重启次数已达上限时返回 None (放弃重启)"""
+        now = self.clock()
+        while self._restart_times and now - self._restart_times[0] >= self.policy.window:
+            self._restart_times.popleft()
+        if len(self._restart_times) >= self.policy.max_restarts:
+            return None
+        return self.policy.delay(self.attempt)
+
+    def mark_restarted(self):
+        now = self.clock()
+        self.attempt += 1
+        self.restarts += 1
+        self._restart_times.append(now)
+        if self.down_since is not None:
+            outage = now - self.down_since
+            self.outages.append(outage)
+            self.downtime += outage
+            self.down_since = None
+        self.up_since = now
+
+    def mttr(self):
+        return sum(self.outages) / len(self.outages) if self.outages else None
+
+    def snapshot(self) -> dict:
+        now = self.clock()
+        downtime = self.downtime + (now - self.down_since if self.down_since is not None else 0)
+        lifetime = now - self.started_at
+        return {
+            'restarts': self.restarts, 'stalls': self.stalls, 'down': self.is_down,
+            'downtime': downtime, 'outages': len(self.outages) + (1 if self.is_down else 0), 'mttr': self.mttr(),
+            'availability': 1 - downtime / lifetime if lifetime > 0 else 1.0, 'last_reason': self.last_reason,
+        }
+
+    def summary(self) -> str:
+        """会话列表中追加的一段状态，没有发生过重启时为空"""
+        if not self.restarts and not self.is_down:
+            return ""
+        parts = [f"重启 {self.restarts} 次"]
+        if self.outages: parts.append(f"MTTR {self.mttr():.1f} 秒")
+        return " | ".join(parts)
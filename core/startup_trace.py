@@ -0,0 +1,134 @@
+"""
+可选的启动耗时追踪。设置环境变量 RIX_STARTUP_TRACE=<文件路径> 后，记录模块导入、面板构建、
+首次绘制与首次设备刷新的时间线，以 Chrome trace-event JSON 格式写入该文件
+(可在 chrome://tracing 或 https://ui.perfetto.dev 中打开)。未启用时各接口均为空操作。
+"""
+import builtins
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+TRACE_ENV = 'RIX_STARTUP_TRACE'
+
+
+class StartupTracer:
+    def __init__(self):
+        self.enabled = False
+        self.path = None
+        self.origin = time.perf_counter()
+        self.events = []
+        self.marks = {}
+        self.finished = False
+        self._original_import = None
+        self._pid = os.getpid()
+
+    def install_from_env(self):
+        path = os.environ.get(TRACE_ENV)
+        if path:
+            self.enable(path)
+
+    def enable(self, path):
+        self.enabled = True
+        self.path = path
+        self._install_import_hook()
+
+    def _now_us(self):
+        return (time.perf_counter() - self.origin) * 1e6
+
+    def _add(self, name, cat, ph, ts, **fields):
+        event = {'name': name, 'cat': cat, 'ph': ph, 'ts': round(ts, 1), 'pid': self._pid,
+                 'tid': threading.get_ident()}
+        event.update(fields)
+        self.events.append(event)
+
+    def span(self, name, cat='startup'):
+        """with tracer.span(...): 记录一段耗时；未启用时为空操作"""
+        if not self.enabled or self.finished:
+            return nullcontext()
+        return self._span(name, cat)
+
+    @contextmanager
+    def _span(self, name, cat):
+        started = self._now_us()
+        try:
+            yield
+        finally:
+            self._add(name, cat, 'X', started, dur=round(self._now_us() - started, 1))
+
+    def mark(self, name):
+        """记录一个时间点 (只记录第一次)，单位毫秒"""
+        if not self.enabled or self.finished or name in self.marks:
+            return
+        ts = self._now_us()
+        self.marks[name] = ts / 1000
+        self._add(name, 'mark', 'i', ts, s='g')
+
+    # ------------------------------------------------------------------
+    # 模块导入计时：包装 builtins.__import__，只计首次导入 (已在 sys.modules 中的直接放行)
+    # ------------------------------------------------------------------
+    def _install_import_hook(self):
+        if self._original_import:
+            return
+        original = self._original_import = builtins.__import__
+        tracer = self
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if level or name in sys.modules:
+                return original(name, globals, locals, fromlist, level)
+            with tracer._span(name, 'import'):
+                return original(name, globals, locals, fromlist, level)
+
+        builtins.__import__ = timed_import
+
+    def _remove_import_hook(self):
+        if self._original_import:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    # ------------------------------------------------------------------
+    def finish(self) -> str:
+        """停止记录并写出追踪文件，返回供日志显示的摘要；未启用时返回空字符串"""
+        if not self.enabled or self.finished:
+            return ''
+        self.finished = True
+        self._remove_import_hook()
+        trace = {'traceEvents': self.events, 'displayTimeUnit': 'ms',
+                 'otherData': {'marks_ms': self.marks}}
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(trace, f, ensure_ascii=False)
+            written = f"追踪文件: {self.path}"
+        except OSError as e:
+            written = f"无法写入追踪文件 {self.path}: {e}"
+        return f"{self.summary()}\n{written}"
+
+    def summary(self) -> str:
+        return summarize(self.events, self.marks)
+
+
+def summarize(events, marks, top=5) -> str:
+    """根据事件列表生成多行摘要 (也供基准脚本解析已写出的追踪文件使用)"""
+    imports = [event for event in events if event['cat'] == 'import']
+    # 只累加最外层的导入，嵌套导入已包含在外层耗时中
+    outermost, covered_until = [], -1.0
+    for event in sorted(imports, key=lambda event: event['ts']):
+        if event['ts'] >= covered_until:
+            outermost.append(event)
+            covered_until = event['ts'] + event['dur']
+    lines = [f"[启动追踪] 模块导入共 {sum(event['dur'] for event in outermost) / 1000:.1f} ms"]
+    slowest = sorted(outermost, key=lambda event: event['dur'], reverse=True)[:top]
+    if slowest:
+        lines.append("  最慢的导入: " + ", ".join(f"{event['name']} {event['dur'] / 1000:.1f} ms" for event in slowest))
+    panels = [event for event in events if event['cat'] == 'panel']
+    if panels:
+        lines.append("  面板构建: " + ", ".join(f"{event['name']} {event['dur'] / 1000:.1f} ms" for event in panels))
+    for name, label in (('window_shown', "窗口显示"), ('first_paint', "首次绘制"), ('first_device_refresh', "首次设备刷新")):
+        if name in marks:
+            lines.append(f"  {label}: {marks[name]:.1f} ms")
+    return "\n".join(lines)
+
+
+tracer = StartupTracer()
@@ -0,0 +1,51 @@
+from PyQt6.QtCore import QAbstractListModel, QModelIndex, Qt
+from core.app_index import AppSearchIndex
+
+
+class AppSearchModel(QAbstractListModel):
+    """
+    应用搜索结果模型：数据来自 AppSearchIndex，应用列表或查询变化时整体重置，而不是逐项插入。
+    limit 为 None 时不做筛选，按原顺序展示全部应用。
+    """
+
+    def __init__(self, limit=200, parent=None):
+        super().__init__(parent)
+        self.limit = limit
+        self.search_index = AppSearchIndex()
+        self.apps = []
+        self.query = ''
+        self._rows = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        app = self.apps[self._rows[index.row()]]
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return f"{app['name']} ({app['package']})"
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return app['package']
+        return None
+
+    def set_apps(self, apps):
+        self.beginResetModel()
+        self.apps = list(apps)
+        if self.limit is not None:
+            self.search_index.rebuild(self.apps)
+        self._rows = self._search(self.query)
+        self.endResetModel()
+
+    def set_query(self, query: str):
+        if query == self.query:
+            return
+        self.beginResetModel()
+        self.query = query
+        self._rows = self._search(query)
+        self.endResetModel()
+
+    def _search(self, query):
+        if self.limit is None:
+            return list(range(len(self.apps)))
+        return self.search_index.search(query, self.limit)
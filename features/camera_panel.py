@@ -1,7 +1,10 @@
+import os
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QFormLayout, QLineEdit,
                              QComboBox, QCheckBox, QGroupBox, QPushButton, QHBoxLayout)
-from PyQt6.QtCore import QThread
+from PyQt6.QtCore import QStandardPaths
+from core.adb_executor import PRIORITY_NORMAL
 from core.command_runner import AdbWorker
+from core.device_media import shared_media_cache, best_camera_mode, camera_mode_args, parse_resolution
 
 
 class CameraPanel(QWidget):
@@ -31,8 +34,8 @@ class CameraPanel(QWidget):
         self.list_camera_sizes_button = QPushButton("列出支持的尺寸")
         list_button_layout.addWidget(self.list_cameras_button)
         list_button_layout.addWidget(self.list_camera_sizes_button)
-        self.list_cameras_button.clicked.connect(lambda: self.run_list_command("--list-cameras"))
-        self.list_camera_sizes_button.clicked.connect(lambda: self.run_list_command("--list-camera-sizes"))
+        self.list_cameras_button.clicked.connect(lambda: self.query_cameras('cameras'))
+        self.list_camera_sizes_button.clicked.connect(lambda: self.query_cameras('sizes'))
 
         selection_layout.addRow("指定摄像头ID:", self.camera_id_input)
         selection_layout.addRow("或按朝向选择:", self.camera_facing_combo)
@@ -52,37 +55,153 @@ class CameraPanel(QWidget):
         self.camera_fps_input = QLineEdit()
         self.camera_fps_input.setPlaceholderText("例如: 60 (默认 30)")
 
+        self.camera_high_speed_check = QCheckBox("高速模式 (--camera-high-speed)")
+
         size_fps_layout.addRow("指定尺寸:", self.camera_size_input)
         size_fps_layout.addRow("或指定宽高比:", self.camera_ar_input)
         size_fps_layout.addRow("指定帧率:", self.camera_fps_input)
+        size_fps_layout.addRow(self.camera_high_speed_check)
         size_fps_group.setLayout(size_fps_layout)
 
+        # --- 分组3: 按目标推荐 ---
+        recommend_group = QGroupBox("按目标推荐最佳组合")
+        recommend_layout = QFormLayout()
+
+        self.target_resolution_input = QLineEdit()
+        self.target_resolution_input.setPlaceholderText("例如: 1920x1080 或 1080 (最长边)，留空不限")
+        self.target_fps_input = QLineEdit()
+        self.target_fps_input.setPlaceholderText("例如: 60 或 120，留空不限")
+        self.recommend_button = QPushButton("推荐并填入")
+        self.recommend_button.setToolTip("在设备支持的摄像头 / 尺寸 / 帧率组合中，选出满足目标且吞吐量最高的一组 (受上方朝向限制)")
+        self.recommend_button.clicked.connect(self.recommend_mode)
+
+        recommend_layout.addRow("目标分辨率:", self.target_resolution_input)
+        recommend_layout.addRow("目标帧率:", self.target_fps_input)
+        recommend_layout.addRow(self.recommend_button)
+        recommend_group.setLayout(recommend_layout)
+
         # --- 最终布局 ---
         main_layout.addWidget(selection_group)
         main_layout.addWidget(size_fps_group)
+        main_layout.addWidget(recommend_group)
         main_layout.addStretch()
         self.setLayout(main_layout)
 
         self.log_emitter = None
+        self.device_provider = None
+
+        # 摄像头能力矩阵与视频面板的编码器信息共用同一个按设备缓存
+        cache_dir = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.CacheLocation)
+        media_cache_dir = os.path.join(cache_dir, 'scrcpy-gui-cache')
+        os.makedirs(media_cache_dir, exist_ok=True)
+        self.media_cache = shared_media_cache(os.path.join(media_cache_dir, 'media_cache.json'))
+        self.camera_task = None
+        self.pending_action = None
+
+        self.worker = AdbWorker()
+        self.worker.task_done_signal.connect(self.on_camera_task_done)
 
     def set_log_emitter(self, log_emitter):
         self.log_emitter = log_emitter
 
-    def run_list_command(self, command):
-        """运行列出摄像头信息的命令，并将结果打印到日志"""
-        if self.log_emitter:
-            self.log_emitter(f"\n正在执行 scrcpy {command} ...")
-            # 注意：这里我们简化处理，直接运行一个阻塞命令
-            # 因为这个操作很快，且不需要复杂的线程管理
-            try:
-                # 构建一个基础的 scrcpy 命令
-                cmd = ['scrcpy', command]
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=10,
-                                        encoding='utf-8', errors='replace')
-                output = (result.stdout + "\n" + result.stderr).strip()
-                self.log_emitter(output or "命令执行完毕，无输出。")
-            except Exception as e:
-                self.log_emitter(f"执行命令时出错: {e}")
+    def set_device_provider(self, device_provider):
+        """device_provider() 返回当前选中设备的序列号 (可能为空)"""
+        self.device_provider = device_provider
+
+    def log(self, message):
+        if self.log_emitter: self.log_emitter(message)
+
+    def query_cameras(self, action, force=True):
+        """
+        action 为 'cameras' / 'sizes' 时把摄像头列表或完整能力矩阵打印到日志，为 'recommend' 时推荐并填入最佳组合。
+        缓存有效且不强制刷新时直接使用缓存，否则在后台执行 scrcpy --list-camera-sizes。
+        """
+        serial = self.device_provider() if self.device_provider else None
+        if not serial:
+            self.log("错误：请先在设备列表中选择一个设备！")
+            return
+        if not force and not self.media_cache.stale_kinds(serial, ('cameras',)):
+            self.run_action(serial, action)
+            return
+        self.pending_action = (serial, action)
+        if self.camera_task and not self.camera_task.done():
+            return
+        self.log(f"\n正在查询 {serial} 的摄像头能力...")
+        entry = self.media_cache.get(serial)
+        self.camera_task = self.worker.submit('probe_media', serial, ('cameras',), entry and entry.get('fingerprint'),
+                                              device=serial, priority=PRIORITY_NORMAL)
+        for button in (self.list_cameras_button, self.list_camera_sizes_button, self.recommend_button):
+            button.setEnabled(False)
+
+    def on_camera_task_done(self, task):
+        if task is not self.camera_task:
+            return
+        self.camera_task = None
+        for button in (self.list_cameras_button, self.list_camera_sizes_button, self.recommend_button):
+            button.setEnabled(True)
+        serial = task.args[0]
+        pending, self.pending_action = self.pending_action, None
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            self.log(f"查询 {serial} 的摄像头失败: {task.exception()}")
+            return
+        fingerprint, results = task.result()
+        self.media_cache.update(serial, fingerprint, results)
+        try:
+            self.media_cache.save()
+        except IOError:
+            self.log("警告：无法写入摄像头信息缓存文件。")
+        if pending and pending[0] == serial:
+            self.run_action(serial, pending[1])
+
+    def run_action(self, serial, action):
+        cameras = (self.media_cache.get(serial) or {}).get('cameras') or []
+        if not cameras:
+            self.log(f"{serial} 上没有可用的摄像头 (需要 Android 12 及以上)。")
+            return
+        if action == 'recommend':
+            self.apply_recommendation(cameras)
+            return
+        lines = [f"{serial} 共 {len(cameras)} 个摄像头:"]
+        for camera in cameras:
+            lines.append(f"  --camera-id={camera['id']}  ({camera['facing']}, {camera['width']}x{camera['height']}, "
+                         f"fps={camera['fps']})")
+            if action != 'sizes':
+                continue
+            lines.extend(f"      - {width}x{height}" for width, height in camera['sizes'])
+            if camera['high_speed']:
+                lines.append("      - 高速模式 (--camera-high-speed):")
+                lines.extend(f"          - {mode['width']}x{mode['height']} (fps={mode['fps']})"
+                             for mode in camera['high_speed'])
+        self.log("\n".join(lines))
+
+    def recommend_mode(self):
+        self.query_cameras('recommend', force=False)
+
+    def apply_recommendation(self, cameras):
+        try:
+            resolution = parse_resolution(self.target_resolution_input.text())
+            fps_text = self.target_fps_input.text().strip()
+            target_fps = int(fps_text) if fps_text else None
+        except ValueError:
+            self.log("错误：目标分辨率应为 宽x高 或 最长边像素数，目标帧率应为整数。")
+            return
+        facing = self.camera_facing_combo.currentText().split(' ')[0]
+        mode = best_camera_mode(cameras, resolution, target_fps, facing=None if facing == "任意" else facing)
+        if mode is None:
+            self.log("没有符合目标分辨率 (及朝向) 的摄像头模式。")
+            return
+        self.camera_id_input.setText(mode['camera_id'])
+        self.camera_size_input.setText(f"{mode['width']}x{mode['height']}")
+        self.camera_ar_input.clear()
+        self.camera_fps_input.setText(str(mode['fps']))
+        self.camera_high_speed_check.setChecked(mode['high_speed'])
+        summary = (f"推荐: 摄像头 {mode['camera_id']} ({mode['facing']}) {mode['width']}x{mode['height']} @ {mode['fps']} fps"
+                   f"{' 高速模式' if mode['high_speed'] else ''}，约 {mode['throughput'] / 1e6:.0f} M 像素/秒")
+        if not mode['meets_target']:
+            summary += f"\n注意：没有模式能达到 {target_fps} fps，已选择可达到的最高帧率。"
+        self.log(f"{summary}\n对应参数: {' '.join(camera_mode_args(mode))}")
 
     def get_args(self):
         args = []
@@ -101,9 +220,7 @@ class CameraPanel(QWidget):
 
         if fps := self.camera_fps_input.text().strip():
             args.extend(['--camera-fps', fps])
+        if self.camera_high_speed_check.isChecked():
+            args.append('--camera-high-speed')
 
         return args
-
-
-# 需要在文件顶部添加 import subprocess
-import subprocess
\ No newline at end of file
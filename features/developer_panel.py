@@ -1,7 +1,7 @@
-import subprocess
 import os
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QFormLayout, QGroupBox,
                              QCheckBox, QPushButton, QFileDialog, QMessageBox, QLabel, QLineEdit)
+from core.process_registry import registry
 
 
 class DeveloperPanel(QWidget):
@@ -111,10 +111,10 @@ class DeveloperPanel(QWidget):
             self.log_emitter("--- 启动独立 Server ---")
             try:
                 self.log_emitter("步骤1: 正在推送 server 文件...")
-                subprocess.run(['adb', 'push', server_path, '/data/local/tmp/scrcpy-server-manual.jar'], check=True)
+                registry.run(['adb', 'push', server_path, '/data/local/tmp/scrcpy-server-manual.jar'], check=True)
 
                 self.log_emitter("步骤2: 正在设置端口转发 (tcp:27185)...")
-                subprocess.run(['adb', 'forward', 'tcp:27185', 'localabstract:scrcpy'], check=True)
+                registry.run(['adb', 'forward', 'tcp:27185', 'localabstract:scrcpy'], check=True)
 
                 self.log_emitter("步骤3: 正在后台启动 server 进程...")
                 cmd = [
@@ -125,7 +125,7 @@ class DeveloperPanel(QWidget):
                     'tunnel_forward=true', 'audio=false', 'control=false',
                     'cleanup=false', 'raw_stream=true', 'max_size=1920'
                 ]
-                subprocess.Popen(cmd)
+                registry.popen(cmd)
 
                 self.log_emitter("\n独立 Server 已在后台启动！")
                 self.log_emitter("您现在可以使用VLC等播放器打开以下网络串流地址:")
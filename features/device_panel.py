@@ -1,13 +1,17 @@
 from PyQt6.QtWidgets import (QWidget, QHBoxLayout, QVBoxLayout, QLabel, QComboBox,
-                             QPushButton, QGroupBox, QLineEdit, QRadioButton)
-from PyQt6.QtCore import QThread
+                             QPushButton, QGroupBox, QLineEdit, QRadioButton, QListWidget, QListWidgetItem, QListView)
+from PyQt6.QtCore import Qt, pyqtSignal
+from core.adb_executor import PRIORITY_HIGH
 from core.command_runner import AdbWorker
+from core.qt_bridge import QtDeviceTracker
 
 
 class DevicePanel(QWidget):
     """
     【连接管理器版】设备面板
     """
+    # 每次“刷新”完成后发出 (设备列表)
+    devices_refreshed = pyqtSignal(list)
 
     def __init__(self):
         super().__init__()
@@ -40,8 +44,29 @@ class DevicePanel(QWidget):
         self.serial_radio.toggled.connect(lambda: self.set_selection_mode('serial'))
         self.usb_radio.toggled.connect(lambda: self.set_selection_mode('usb'))
         self.tcpip_radio.toggled.connect(lambda: self.set_selection_mode('tcpip'))
+
+        # 批量启动的设备：默认勾选全部，新接入的设备也默认勾选
+        fleet_layout = QHBoxLayout()
+        self.fleet_list = QListWidget()
+        self.fleet_list.setFlow(QListView.Flow.LeftToRight)
+        self.fleet_list.setWrapping(True)
+        self.fleet_list.setMaximumHeight(60)
+        self.fleet_list.setToolTip("批量启动时只在勾选的设备上启动")
+        self.fleet_select_all_button = QPushButton("全选")
+        self.fleet_select_all_button.clicked.connect(lambda: self.set_fleet_checked(True))
+        self.fleet_select_none_button = QPushButton("全不选")
+        self.fleet_select_none_button.clicked.connect(lambda: self.set_fleet_checked(False))
+        fleet_layout.addWidget(QLabel("批量启动:"))
+        fleet_layout.addWidget(self.fleet_list, 1)
+        fleet_layout.addWidget(self.fleet_select_all_button)
+        fleet_layout.addWidget(self.fleet_select_none_button)
+        # 取消勾选的序列号，设备断开后再接入仍保持不勾选
+        self._fleet_unchecked = set()
+        self.fleet_list.itemChanged.connect(self._on_fleet_item_changed)
+
         selection_layout.addLayout(device_list_layout)
         selection_layout.addLayout(mode_layout)
+        selection_layout.addLayout(fleet_layout)
         main_layout.addWidget(selection_group)
 
         # 分组2: 无线连接 (TCP/IP)
@@ -82,8 +107,20 @@ class DevicePanel(QWidget):
         self.auto_pair_button.clicked.connect(self.handle_auto_pair)
 
         self.log_emitter = None
-        self.thread = None
-        self.worker = None
+        # 所有 adb 操作都提交到共享执行器，本面板只保留一个信号适配对象
+        self.worker = AdbWorker()
+        self.worker.command_finished_signal.connect(self.on_generic_command_finished)
+        self.worker.auto_pair_step_signal.connect(self.log)
+        self.worker.auto_pair_finished_signal.connect(self.on_generic_command_finished)
+        self.worker.task_done_signal.connect(self.on_task_done)
+        self.pending_tasks = set()
+
+        # 设备跟踪：通过 track-devices 长连接实时更新设备列表
+        self.device_tracker = QtDeviceTracker(self)
+        self.device_tracker.device_added.connect(self.on_device_added)
+        self.device_tracker.device_removed.connect(self.on_device_removed)
+        self.device_tracker.device_state_changed.connect(self.on_device_state_changed)
+        self.device_tracker.start()
 
     def set_log_emitter(self, log_emitter):
         self.log_emitter = log_emitter
@@ -108,6 +145,43 @@ class DevicePanel(QWidget):
             return None
         return ['--serial', device_id]
 
+    def current_serial(self):
+        """返回设备列表中当前选中的序列号，没有时返回 None"""
+        return self.device_combo.currentText() or None
+
+    def available_serials(self):
+        """返回设备列表中的全部序列号"""
+        return [self.device_combo.itemText(i) for i in range(self.device_combo.count())]
+
+    def fleet_serials(self):
+        """返回批量启动列表中勾选的序列号 (按设备列表顺序)"""
+        return [serial for serial in self.available_serials() if serial not in self._fleet_unchecked]
+
+    def set_fleet_checked(self, checked: bool):
+        if checked:
+            self._fleet_unchecked.clear()
+        else:
+            self._fleet_unchecked.update(self.available_serials())
+        self._sync_fleet_list()
+
+    def _on_fleet_item_changed(self, item):
+        serial = item.text()
+        if item.checkState() == Qt.CheckState.Checked:
+            self._fleet_unchecked.discard(serial)
+        else:
+            self._fleet_unchecked.add(serial)
+
+    def _sync_fleet_list(self):
+        """设备列表变化后重建批量启动列表，保留各设备的勾选状态"""
+        self.fleet_list.blockSignals(True)
+        self.fleet_list.clear()
+        for serial in self.available_serials():
+            item = QListWidgetItem(serial)
+            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            item.setCheckState(Qt.CheckState.Unchecked if serial in self._fleet_unchecked else Qt.CheckState.Checked)
+            self.fleet_list.addItem(item)
+        self.fleet_list.blockSignals(False)
+
     def handle_connect(self):
         ip = self.ip_input.text().strip()
         if not ip:
@@ -139,45 +213,79 @@ class DevicePanel(QWidget):
     def handle_restart_server(self):
         self.run_generic_adb_command('restart_server', "正在重启 ADB 服务...")
 
-    def run_generic_adb_command(self, command_info, log_message: str):
-        if self.log_emitter: self.log_emitter(log_message)
-        self.set_all_buttons_enabled(False)
-        self.thread = QThread()
-        self.worker = AdbWorker()
-        self.worker.moveToThread(self.thread)
+    def log(self, message):
+        if self.log_emitter: self.log_emitter(message)
 
+    def run_generic_adb_command(self, command_info, log_message: str):
         if isinstance(command_info, tuple):
-            command_name, args = command_info
-            command_to_run = lambda: getattr(self.worker, command_name)(args)
-        else:
-            command_name = command_info
-            command_to_run = getattr(self.worker, command_name)
-
-        self.thread.started.connect(command_to_run)
-
-        if command_name == 'refresh_devices':
-            self.worker.refreshed_signal.connect(self.update_combo_box)
-        elif command_name == 'auto_pair_sequence':
-            self.worker.auto_pair_step_signal.connect(self.log_emitter)
-            self.worker.auto_pair_finished_signal.connect(self.on_generic_command_finished)
+            command_name, arg = command_info
+            args = (arg,)
         else:
-            self.worker.command_finished_signal.connect(self.on_generic_command_finished)
+            command_name, args = command_info, ()
+        device = args[0] if command_name in ('auto_pair_sequence', 'connect_to_device', 'disconnect_from_device') else None
+        # 刷新可能被多处同时触发，与进行中的刷新合并为一次 adb 调用
+        task = self.worker.submit(command_name, *args, device=device, priority=PRIORITY_HIGH,
+                                  coalesce=command_name == 'refresh_devices')
+        if task in self.pending_tasks:
+            return
+        self.log(log_message)
+        self.set_all_buttons_enabled(False)
+        self.pending_tasks.add(task)
 
-        self.thread.finished.connect(self.thread.deleteLater)
-        self.thread.finished.connect(self.worker.deleteLater)
-        self.thread.finished.connect(lambda: self.set_all_buttons_enabled(True))
-        self.thread.start()
+    def on_task_done(self, task):
+        # 合并的请求共用一个任务，每次 submit 都会登记一次完成回调，只处理第一次
+        if task not in self.pending_tasks:
+            return
+        self.pending_tasks.discard(task)
+        if not self.pending_tasks: self.set_all_buttons_enabled(True)
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            self.log(f"执行 {task.name} 失败: {task.exception()}")
+        elif task.name == 'refresh_devices':
+            self.update_combo_box(*task.result())
+        elif task.name in ('connect_to_device', 'disconnect_from_device'):
+            self.on_generic_command_finished(task.result() or "命令已执行。")
 
     def update_combo_box(self, devices, log_msg):
         current_selection = self.device_combo.currentText()
         self.device_combo.clear()
         if devices: self.device_combo.addItems(devices)
         if current_selection in devices: self.device_combo.setCurrentText(current_selection)
-        if self.log_emitter: self.log_emitter(log_msg)
-        if self.thread: self.thread.quit()
+        self._sync_fleet_list()
+        self.log(log_msg)
+        self.devices_refreshed.emit(devices)
 
     def on_generic_command_finished(self, log_msg: str):
-        if self.log_emitter: self.log_emitter(log_msg)
-        if self.thread: self.thread.quit()
+        self.log(log_msg)
+        # 设备跟踪在线时列表会自动更新，只有跟踪不可用时才需要手动刷新
+        if self.device_tracker.is_tracking: return
         if "配对完成" in log_msg or "连接到" in log_msg or "断开" in log_msg:
-            self.refresh_devices()
\ No newline at end of file
+            self.refresh_devices()
+
+    def on_device_added(self, serial, state):
+        if self.log_emitter: self.log_emitter(f"设备已接入: {serial} ({state})")
+        self._set_device_available(serial, state == 'device')
+
+    def on_device_removed(self, serial):
+        if self.log_emitter: self.log_emitter(f"设备已断开: {serial}")
+        self._set_device_available(serial, False)
+
+    def on_device_state_changed(self, serial, state):
+        if self.log_emitter: self.log_emitter(f"设备状态变化: {serial} -> {state}")
+        self._set_device_available(serial, state == 'device')
+
+    def _set_device_available(self, serial, available):
+        index = self.device_combo.findText(serial)
+        if available and index < 0:
+            self.device_combo.addItem(serial)
+        elif not available and index >= 0:
+            self.device_combo.removeItem(index)
+        else:
+            return
+        self._sync_fleet_list()
+
+    def shutdown(self):
+        for task in list(self.pending_tasks):
+            task.cancel()
+        self.device_tracker.stop()
\ No newline at end of file
@@ -0,0 +1,47 @@
+import importlib
+from PyQt6.QtWidgets import QWidget, QVBoxLayout
+from core.startup_trace import tracer
+
+
+class LazyPanel(QWidget):
+    """
+    【延迟加载】标签页占位
+    第一次显示 (切换到该标签页) 或第一次访问面板属性时，才导入模块并创建真正的面板。
+    创建之前 get_args() 返回 default_args，与新建面板未做任何修改时的结果一致。
+    """
+
+    def __init__(self, module_name: str, class_name: str, setup=None, default_args=(), parent=None):
+        super().__init__(parent)
+        self._module_name = module_name
+        self._class_name = class_name
+        self._setup = setup
+        self._panel = None
+        self.default_args = list(default_args)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+    @property
+    def is_built(self) -> bool:
+        return self._panel is not None
+
+    @property
+    def panel(self):
+        if self._panel is None:
+            with tracer.span(self._class_name, 'panel'):
+                panel_class = getattr(importlib.import_module(self._module_name), self._class_name)
+                self._panel = panel_class()
+            self.layout().addWidget(self._panel)
+            if self._setup: self._setup(self._panel)
+        return self._panel
+
+    def get_args(self):
+        return self._panel.get_args() if self._panel is not None else list(self.default_args)
+
+    def showEvent(self, event):
+        self.panel
+        super().showEvent(event)
+
+    def __getattr__(self, name):
+        # 仅在常规属性查找失败时调用：转发给真正的面板 (必要时先创建)
+        if name.startswith('_'): raise AttributeError(name)
+        return getattr(self.panel, name)
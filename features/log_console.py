@@ -0,0 +1,278 @@
+import re
+from PyQt6.QtWidgets import (QTableView, QAbstractItemView, QApplication, QHeaderView, QWidget, QHBoxLayout,
+                             QComboBox, QLineEdit, QLabel)
+from PyQt6.QtCore import QAbstractListModel, QModelIndex, Qt, QTimer, pyqtSignal
+from PyQt6.QtGui import QFontDatabase, QKeySequence
+from core.adb_executor import AdbExecutor
+from core.ring_buffer import RingBuffer
+from core.session_logs import (APP_CHANNEL, LEVEL_VERBOSE, LEVEL_INFO, LEVEL_WARN, LEVEL_ERROR, LogQuery,
+                               SessionLogStore, run_query, tag_lines)
+
+# 后台筛选结果每次送入视图的行数，两页之间事件循环可以处理绘制与输入
+LOG_PAGE_LINES = 5000
+
+
+class LogRingModel(QAbstractListModel):
+    """
+    以固定容量环形缓冲区为后端的日志模型，超出容量时丢弃最旧的行。
+    """
+
+    def __init__(self, max_lines=20000, parent=None):
+        super().__init__(parent)
+        self._lines = RingBuffer(max_lines)
+
+    @property
+    def max_lines(self) -> int:
+        return self._lines.capacity
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._lines)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole) and index.isValid():
+            return self._lines[index.row()]
+        return None
+
+    def line(self, row: int) -> str:
+        return self._lines[row]
+
+    def append_lines(self, lines: list):
+        capacity = self._lines.capacity
+        if len(lines) >= capacity:
+            self.beginResetModel()
+            self._lines.clear()
+            self._lines.extend(lines[-capacity:])
+            self.endResetModel()
+            return
+        overflow = len(self._lines) + len(lines) - capacity
+        if overflow > 0:
+            # 先以一次 removeRows 通知视图丢弃最旧的行，再整体插入新行
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            self._lines.discard_oldest(overflow)
+            self.endRemoveRows()
+        start = len(self._lines)
+        self.beginInsertRows(QModelIndex(), start, start + len(lines) - 1)
+        self._lines.extend(lines)
+        self.endInsertRows()
+
+    def set_max_lines(self, max_lines: int):
+        self.beginResetModel()
+        self._lines.resize(max_lines)
+        self.endResetModel()
+
+    def set_lines(self, lines: list):
+        self.beginResetModel()
+        self._lines.clear()
+        self._lines.extend(lines[-self._lines.capacity:])
+        self.endResetModel()
+
+    def clear(self):
+        self.beginResetModel()
+        self._lines.clear()
+        self.endResetModel()
+
+
+class LogConsole(QTableView):
+    """
+    【虚拟化】日志控制台
+    只绘制可见行；新日志先进入待刷新队列，由定时器成批写入模型，避免逐行重绘。
+    所有日志按会话保存在 SessionLogStore 中，视图只显示符合当前 LogQuery 的最新 max_lines 行：
+    只按会话切换时直接复制该会话缓冲区的末尾；带级别/正则条件或合并全部会话时在视图自己的筛选线程中进行，
+    结果分页送入视图 (不占用共享的 ADB 执行器)。新的筛选会取消尚未完成的上一次筛选，排队中的旧筛选直接丢弃。
+    """
+    # (筛选代数, 一页显示行, 是否最后一页)，由后台线程发出
+    _page_ready = pyqtSignal(int, list, bool)
+    # 视图状态说明 (筛选中 / 行数)
+    status_changed = pyqtSignal(str)
+
+    def __init__(self, max_lines=20000, flush_interval_ms=100, parent=None):
+        super().__init__(parent)
+        self.store = SessionLogStore()
+        self.query = LogQuery()
+        self._generation = 0
+        self._query_task = None
+        # 专用的单线程筛选执行器：同一时间最多一次筛选在运行
+        self._query_executor = AdbExecutor(max_workers=1, name='LogQuery')
+        self._loading = False
+        self._backlog = []
+        self._page_ready.connect(self._on_page_ready)
+        self.log_model = LogRingModel(max_lines, self)
+        self.setModel(self.log_model)
+        self.setFont(QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont))
+        # 固定行高的单列表格视图：布局与滚动只与可见行数相关，不会逐行测量
+        self.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.verticalHeader().setDefaultSectionSize(self.fontMetrics().height() + 2)
+        self.verticalHeader().hide()
+        self.horizontalHeader().setStretchLastSection(True)
+        self.horizontalHeader().hide()
+        self.setShowGrid(False)
+        self.setWordWrap(False)
+        self.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+
+        self._pending = []
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setInterval(flush_interval_ms)
+        self._flush_timer.timeout.connect(self.flush)
+        self._flush_timer.start()
+
+    def append(self, message: str):
+        self.append_lines(message.splitlines() or [''])
+
+    def append_lines(self, lines: list, session_id=APP_CHANNEL):
+        self.store.append(session_id, lines)
+        self._show(session_id, lines)
+
+    def append_session_output(self, batches: dict):
+        """{session_id: 行列表}，即 SessionManager.session_output_signal"""
+        for session_id, lines in batches.items():
+            self.store.append(session_id, lines)
+            self._show(session_id, lines)
+
+    def _show(self, session_id, lines):
+        query = self.query
+        if query.session_id is not None and session_id != query.session_id:
+            return
+        if query.filters_lines:
+            lines = query.filter_lines(lines)
+        if not lines:
+            return
+        # 后台筛选进行中：新日志先暂存，等筛选结果全部送入视图后再追加，保持时间顺序
+        target = self._backlog if self._loading else self._pending
+        target.extend(tag_lines(session_id, lines, query.tagged))
+        # 待刷新队列超过容量时，多出的部分反正会被丢弃
+        overflow = len(target) - self.log_model.max_lines
+        if overflow > 0:
+            del target[:overflow]
+
+    def set_query(self, query: LogQuery):
+        """切换视图：只按会话筛选时同步完成，其余情况提交到筛选线程，结果分页送达"""
+        if query == self.query:
+            return
+        self.query = query
+        self._generation += 1
+        if self._query_task: self._query_task.cancel()
+        self._query_task = None
+        self._pending = []
+        self._backlog = []
+        limit = self.log_model.max_lines
+        if query.session_id is not None and not query.filters_lines:
+            # 单个会话、不逐行筛选：复制缓冲区末尾即可，同步完成
+            self._loading = False
+            self.log_model.set_lines(self.store.lines(query.session_id, last=limit))
+            self.scrollToBottom()
+            self.status_changed.emit(f"{self.log_model.rowCount()} 行")
+            return
+        self._loading = True
+        self.log_model.clear()
+        self.status_changed.emit("筛选中...")
+        snapshots = self.store.snapshot(query.session_id, last=limit if not query.filters_lines else None)
+        self._query_task = self._query_executor.submit(self._run_query, self._generation, snapshots, query, limit,
+                                                       key='log_query', name='log_query')
+
+    def _run_query(self, generation, snapshots, query, limit):
+        # 在筛选线程中运行：筛选合并后分页发出 (run_query 在任务被取消时抛出 TaskCancelled)
+        results = run_query(snapshots, query, limit)
+        for start in range(0, len(results), LOG_PAGE_LINES):
+            self._page_ready.emit(generation, results[start:start + LOG_PAGE_LINES],
+                                  start + LOG_PAGE_LINES >= len(results))
+        if not results:
+            self._page_ready.emit(generation, [], True)
+
+    def _on_page_ready(self, generation, lines, last):
+        if generation != self._generation:
+            return
+        if lines:
+            self.log_model.append_lines(lines)
+        if last:
+            self._loading = False
+            self._query_task = None
+            self._pending.extend(self._backlog)
+            self._backlog = []
+            self.scrollToBottom()
+            self.status_changed.emit(f"{self.log_model.rowCount()} 行")
+
+    def shutdown(self):
+        """取消进行中的筛选并停止筛选线程 (应用退出时调用)"""
+        self._generation += 1
+        self._query_executor.shutdown(wait=False)
+
+    def flush(self):
+        if not self._pending:
+            return
+        lines, self._pending = self._pending, []
+        scrollbar = self.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum()
+        self.log_model.append_lines(lines)
+        if at_bottom:
+            self.scrollToBottom()
+
+    def set_max_lines(self, max_lines: int):
+        self.flush()
+        self.log_model.set_max_lines(max_lines)
+
+    def clear(self):
+        """清空当前视图与全部会话的日志缓冲区"""
+        self._pending = []
+        self._backlog = []
+        self.store.clear()
+        self.log_model.clear()
+
+    def keyPressEvent(self, event):
+        if event.matches(QKeySequence.StandardKey.Copy):
+            rows = sorted(index.row() for index in self.selectedIndexes())
+            QApplication.clipboard().setText('\n'.join(self.log_model.line(row) for row in rows))
+            return
+        super().keyPressEvent(event)
+
+
+class LogFilterBar(QWidget):
+    """日志视图的筛选条：会话、最低级别与正则，正则输入停顿片刻后才应用"""
+    LEVELS = (("全部级别", LEVEL_VERBOSE), ("信息及以上", LEVEL_INFO), ("警告及以上", LEVEL_WARN), ("仅错误", LEVEL_ERROR))
+
+    def __init__(self, console: LogConsole, parent=None):
+        super().__init__(parent)
+        self.console = console
+        self.session_combo = QComboBox()
+        self.session_combo.addItem("全部会话", None)
+        self.session_combo.addItem("应用消息", APP_CHANNEL)
+        self.level_combo = QComboBox()
+        for text, level in self.LEVELS:
+            self.level_combo.addItem(text, level)
+        self.pattern_edit = QLineEdit()
+        self.pattern_edit.setPlaceholderText("正则筛选 (不区分大小写)...")
+        self.pattern_edit.setClearButtonEnabled(True)
+        self.status_label = QLabel()
+
+        self._apply_timer = QTimer(self)
+        self._apply_timer.setSingleShot(True)
+        self._apply_timer.setInterval(300)
+        self._apply_timer.timeout.connect(self.apply)
+        self.session_combo.currentIndexChanged.connect(self.apply)
+        self.level_combo.currentIndexChanged.connect(self.apply)
+        self.pattern_edit.textChanged.connect(self._apply_timer.start)
+        console.status_changed.connect(self.status_label.setText)
+
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.session_combo)
+        layout.addWidget(self.level_combo)
+        layout.addWidget(self.pattern_edit, 1)
+        layout.addWidget(self.status_label)
+
+    def add_session(self, session_id: str, *_):
+        if self.session_combo.findData(session_id) < 0:
+            self.session_combo.addItem(session_id, session_id)
+
+    def apply(self):
+        self._apply_timer.stop()
+        try:
+            query = LogQuery(self.session_combo.currentData(), self.level_combo.currentData(), self.pattern_edit.text())
+        except re.error as e:
+            self.pattern_edit.setStyleSheet("QLineEdit { border: 1px solid #d9534f; }")
+            self.pattern_edit.setToolTip(f"无效的正则表达式: {e}")
+            return
+        self.pattern_edit.setStyleSheet("")
+        self.pattern_edit.setToolTip("")
+        self.console.set_query(query)
@@ -0,0 +1,349 @@
+import time
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableView, QAbstractItemView, QHeaderView,
+                             QLineEdit, QPushButton, QLabel)
+from PyQt6.QtCore import QAbstractItemModel, QAbstractTableModel, QModelIndex, QTimer, Qt
+from core.resource_sampler import format_resources
+from core.session_metrics import TREND_ARROWS
+
+COLUMNS = ("会话", "设备", "运行时长", "帧率", "CPU", "内存", "状态")
+COL_SESSION, COL_DEVICE, COL_UPTIME, COL_FPS, COL_CPU, COL_MEMORY, COL_STATE = range(len(COLUMNS))
+# 排序使用的原始值 (数字列按数值而非显示文本排序)
+SORT_ROLE = Qt.ItemDataRole.UserRole
+# 视图收到超过约 200 个单元格的 dataChanged 时直接重绘整个视口，更大的范围拆成多段发出，只重绘其中可见的部分
+MAX_CHANGED_CELLS = 200
+
+
+def format_uptime(seconds: float) -> str:
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    return f"{hours}:{rest // 60:02d}:{rest % 60:02d}" if hours else f"{rest // 60}:{rest % 60:02d}"
+
+
+def session_state(info: dict, health) -> str:
+    """会话的运行状态文本，info 为 SessionEngine.active_sessions 中的一项"""
+    if info.get('stopping'):
+        state = "停止中"
+    elif info.get('stalled'):
+        state = "卡顿，重启中"
+    elif info['pid'] is None:
+        state = "等待设备" if info.get('waiting_device') else "等待重启"
+    else:
+        state = "运行中"
+    summary = health.summary() if health else ""
+    return f"{state} | {summary}" if summary else state
+
+
+class _Row:
+    __slots__ = ('session_id', 'hint', 'started_at', 'cells', 'search_text')
+
+    def __init__(self, session_id, hint, started_at):
+        self.session_id = session_id
+        self.hint = hint
+        self.started_at = started_at
+        self.cells = None
+        self.search_text = None
+
+
+class SessionTableModel(QAbstractTableModel):
+    """
+    【原地更新】活动会话表
+    每行的单元格 (显示文本, 排序值) 缓存在模型中；指标或资源变化只标记会话，由 refresh() 统一重新计算。
+    排序与筛选在模型内部完成 (不经过 QSortFilterProxyModel，后者每次 dataChanged 都要逐格回调 data() 重新比较)：
+    显示顺序没有变化时，把内容真正变化的连续行合并为一次 dataChanged；顺序变化时发出一次 layoutChanged，
+    并更新持久索引以保留选中状态。运行时长每秒变化一次，同样在 refresh() 中批量更新。
+    manager 需提供 active_sessions、metrics(id)、resources(id)、health(id) (即 SessionManager)。
+    """
+
+    def __init__(self, manager, parent=None):
+        super().__init__(parent)
+        self.manager = manager
+        self._all = {}
+        self._visible = []
+        self._dirty = set()
+        self._uptime_second = None
+        self.sort_column = COL_SESSION
+        self.sort_order = Qt.SortOrder.AscendingOrder
+        self.filter_text = ''
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._visible)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._visible[index.row()].cells[index.column()][0]
+        if role == SORT_ROLE:
+            return self._visible[index.row()].cells[index.column()][1]
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return self._tooltip(self._visible[index.row()].session_id, index.column())
+        return None
+
+    def _tooltip(self, session_id, column):
+        """提示只在鼠标悬停时才需要，按需生成而不随每次刷新计算"""
+        if column == COL_FPS:
+            metrics = self.manager.metrics(session_id)
+            return f"最近警告: {metrics.last_warning}" if metrics and metrics.last_warning else None
+        if column in (COL_CPU, COL_MEMORY):
+            sample = self.manager.resources(session_id)
+            return format_resources(sample) if sample else None
+        if column == COL_STATE:
+            health = self.manager.health(session_id)
+            return f"上次中断: {health.last_reason}" if health and health.last_reason else None
+        return None
+
+    @property
+    def total_count(self) -> int:
+        return len(self._all)
+
+    def session_id(self, row: int) -> str:
+        return self._visible[row].session_id
+
+    def add_session(self, session_id: str, hint: str):
+        if session_id in self._all:
+            return
+        now = time.monotonic()
+        row = self._all[session_id] = _Row(session_id, hint, now)
+        row.cells = self._compute(row, now)
+        if not self._matches(row):
+            return
+        position = len(self._visible)
+        key = self._sort_key
+        # 新会话总是排在相同排序值的已有会话之后，与 _ordered() 的稳定排序一致
+        if self.sort_order == Qt.SortOrder.AscendingOrder:
+            position = next((i for i, other in enumerate(self._visible) if key(other) > key(row)), position)
+        else:
+            position = next((i for i, other in enumerate(self._visible) if key(other) < key(row)), position)
+        self.beginInsertRows(QModelIndex(), position, position)
+        self._visible.insert(position, row)
+        self.endInsertRows()
+
+    def remove_session(self, session_id: str):
+        row = self._all.pop(session_id, None)
+        if row is None:
+            return
+        self._dirty.discard(session_id)
+        if row in self._visible:
+            position = self._visible.index(row)
+            self.beginRemoveRows(QModelIndex(), position, position)
+            del self._visible[position]
+            self.endRemoveRows()
+
+    def mark_dirty(self, session_ids):
+        self._dirty.update(session_ids)
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self.sort_column = column
+        self.sort_order = order
+        self._relayout()
+
+    def set_filter(self, text: str):
+        """按任意列的显示文本筛选 (不区分大小写)"""
+        text = text.strip().lower()
+        if text == self.filter_text:
+            return
+        self.beginResetModel()
+        self.filter_text = text
+        self._visible = self._ordered()
+        self.endResetModel()
+
+    def refresh(self, now=None):
+        """
+        重新计算被标记的行 (运行时长跨秒时为所有行的运行时长列)，顺序不变时只对内容真正变化的连续行
+        发出 dataChanged (列范围限于变化的列)，否则重新排列
+        """
+        now = time.monotonic() if now is None else now
+        second = int(now)
+        all_rows = second != self._uptime_second
+        self._uptime_second = second
+        if not all_rows and not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, set()
+        # id(行) -> 变化前的单元格 (只有运行时长列变化时为 None)
+        changed = {}
+        for row in self._all.values():
+            if row.session_id in dirty:
+                cells = self._compute(row, now)
+            elif all_rows:
+                uptime = now - row.started_at
+                cell = (format_uptime(uptime), int(uptime))
+                if cell != row.cells[COL_UPTIME]:
+                    row.cells = row.cells[:COL_UPTIME] + [cell] + row.cells[COL_UPTIME + 1:]
+                    row.search_text = None
+                    changed[id(row)] = None
+                continue
+            else:
+                continue
+            if cells != row.cells:
+                changed[id(row)] = row.cells
+                row.cells = cells
+                row.search_text = None
+        if not changed:
+            return
+        ordered = self._ordered()
+        if ordered != self._visible:
+            self._relayout(ordered)
+            return
+        # 顺序未变：连续的变化行合并为一次 dataChanged (列范围为其中变化的列)，视图只重绘其中可见的部分
+        start = first = last = None
+        for position, row in enumerate(self._visible + [None]):
+            if row is None or id(row) not in changed:
+                if start is not None:
+                    self._emit_changed(start, position - 1, first, last)
+                    start = None
+                continue
+            old = changed[id(row)]
+            if old is None:
+                span = (COL_UPTIME, COL_UPTIME)
+            else:
+                columns = [column for column, cell in enumerate(row.cells) if cell != old[column]]
+                span = (columns[0], columns[-1])
+            if start is None:
+                start, (first, last) = position, span
+            else:
+                first, last = min(first, span[0]), max(last, span[1])
+
+    def _emit_changed(self, top, bottom, first, last):
+        step = max(1, MAX_CHANGED_CELLS // (last - first + 1))
+        for start in range(top, bottom + 1, step):
+            self.dataChanged.emit(self.index(start, first), self.index(min(bottom, start + step - 1), last))
+
+    def _sort_key(self, row):
+        return row.cells[self.sort_column][1]
+
+    def _matches(self, row) -> bool:
+        if not self.filter_text:
+            return True
+        if row.search_text is None:
+            row.search_text = " ".join(cell[0] for cell in row.cells).lower()
+        return self.filter_text in row.search_text
+
+    def _ordered(self) -> list:
+        rows = [row for row in self._all.values() if self._matches(row)]
+        rows.sort(key=self._sort_key, reverse=self.sort_order == Qt.SortOrder.DescendingOrder)
+        return rows
+
+    def _relayout(self, ordered=None):
+        ordered = self._ordered() if ordered is None else ordered
+        if len(ordered) != len(self._visible) or set(map(id, ordered)) != set(map(id, self._visible)):
+            # 筛选结果变化 (如状态文本变化后不再匹配)：行数不同，只能整体重置
+            self.beginResetModel()
+            self._visible = ordered
+            self.endResetModel()
+            return
+        self.layoutAboutToBeChanged.emit([], QAbstractItemModel.LayoutChangeHint.VerticalSortHint)
+        old_indexes = self.persistentIndexList()
+        old_rows = [(self._visible[index.row()], index.column()) for index in old_indexes]
+        self._visible = ordered
+        positions = {id(row): i for i, row in enumerate(ordered)}
+        self.changePersistentIndexList(old_indexes, [self.index(positions[id(row)], column) for row, column in old_rows])
+        self.layoutChanged.emit([], QAbstractItemModel.LayoutChangeHint.VerticalSortHint)
+
+    def _compute(self, row, now):
+        session_id = row.session_id
+        manager = self.manager
+        info = manager.active_sessions.get(session_id)
+        metrics = manager.metrics(session_id)
+        sample = manager.resources(session_id)
+        health = manager.health(session_id)
+        uptime = now - row.started_at
+        if metrics is not None and metrics.fps is not None:
+            fps = (f"{metrics.fps} {TREND_ARROWS[metrics.trend()]}", metrics.fps)
+        else:
+            fps = ("--", -1)
+        running = info is not None and info['pid'] is not None
+        if sample is not None and running:
+            cpu = (f"{sample['cpu_percent']:.0f}%", sample['cpu_percent'])
+            memory = (f"{sample['rss'] / 1048576:.0f} MB", sample['rss'])
+        else:
+            cpu, memory = ("--", -1.0), ("--", -1)
+        state = session_state(info, health) if info is not None else "已结束"
+        return [(session_id, session_id), (row.hint, row.hint), (format_uptime(uptime), int(uptime)), fps, cpu, memory,
+                (state, state)]
+
+
+class SessionTable(QWidget):
+    """
+    活动会话列表：可排序、按任意列筛选的会话表，支持多选后一并停止。
+    """
+
+    def __init__(self, manager, refresh_interval_ms=500, parent=None):
+        super().__init__(parent)
+        self.manager = manager
+        self.session_model = SessionTableModel(manager, self)
+
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("筛选会话 / 设备 / 状态...")
+        self.filter_edit.setClearButtonEnabled(True)
+        self.filter_edit.textChanged.connect(self.session_model.set_filter)
+        self.count_label = QLabel()
+        self.stop_selected_button = QPushButton("停止所选")
+        self.stop_selected_button.setEnabled(False)
+        self.stop_selected_button.clicked.connect(self.stop_selected)
+
+        self.table_view = QTableView()
+        self.table_view.setModel(self.session_model)
+        self.table_view.setSortingEnabled(True)
+        self.table_view.sortByColumn(COL_SESSION, Qt.SortOrder.AscendingOrder)
+        self.table_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table_view.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.table_view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table_view.setWordWrap(False)
+        self.table_view.verticalHeader().hide()
+        self.table_view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.table_view.verticalHeader().setDefaultSectionSize(self.fontMetrics().height() + 6)
+        self.table_view.horizontalHeader().setStretchLastSection(True)
+        self.table_view.selectionModel().selectionChanged.connect(self._update_buttons)
+
+        options_layout = QHBoxLayout()
+        options_layout.addWidget(self.filter_edit)
+        options_layout.addWidget(self.count_label)
+        options_layout.addWidget(self.stop_selected_button)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addLayout(options_layout)
+        layout.addWidget(self.table_view)
+
+        for signal in (self.session_model.rowsInserted, self.session_model.rowsRemoved, self.session_model.modelReset):
+            signal.connect(self._update_count)
+        self._update_count()
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setInterval(refresh_interval_ms)
+        self._refresh_timer.timeout.connect(self.session_model.refresh)
+        self._refresh_timer.start()
+
+    def add_session(self, session_id: str, hint: str):
+        self.session_model.add_session(session_id, hint)
+
+    def remove_session(self, session_id: str):
+        self.session_model.remove_session(session_id)
+
+    def mark_dirty(self, session_ids):
+        self.session_model.mark_dirty(session_ids)
+
+    def selected_sessions(self) -> list:
+        rows = sorted(index.row() for index in self.table_view.selectionModel().selectedRows())
+        return [self.session_model.session_id(row) for row in rows]
+
+    def stop_selected(self):
+        session_ids = self.selected_sessions()
+        for session_id in session_ids:
+            self.manager.stop_session(session_id)
+        self.mark_dirty(session_ids)
+
+    def _update_buttons(self, *_):
+        self.stop_selected_button.setEnabled(self.table_view.selectionModel().hasSelection())
+
+    def _update_count(self, *_):
+        total = self.session_model.total_count
+        shown = self.session_model.rowCount()
+        self.count_label.setText(f"{shown}/{total}" if shown != total else f"{total} 个会话")
+        self._update_buttons()
@@ -1,6 +1,15 @@
-import subprocess
+import os
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QFormLayout, QGroupBox,
                              QLineEdit, QComboBox, QCheckBox, QPushButton, QHBoxLayout)
+from PyQt6.QtCore import QStandardPaths
+from core.adb_executor import PRIORITY_NORMAL
+from core.command_runner import AdbWorker
+from core.device_media import shared_media_cache
+from core.link_probe import LinkProbeCache, recommend_video_settings, connection_type
+from core.encoder_bench import benchmark_candidates, candidate_label, TRIAL_SECONDS
+
+DEFAULT_CODECS = ["h264", "h265", "av1"]
+MEDIA_KINDS = ('encoders', 'displays')
 
 
 class VideoPanel(QWidget):
@@ -25,32 +34,57 @@ class VideoPanel(QWidget):
         self.max_fps_input = QLineEdit()
         self.max_fps_input.setPlaceholderText("例如: 30, 60")
         self.print_fps_check = QCheckBox("在控制台打印帧率 (--print-fps)")
+        # 按实测链路带宽与延迟填写上面三项，避免无线连接时码率超出链路能力导致卡顿
+        link_layout = QHBoxLayout()
+        self.link_probe_button = QPushButton("测速并自动填写")
+        self.link_probe_button.setToolTip("通过 adb exec-out 测量到当前设备的延迟与持续吞吐量，据此填写尺寸、码率与帧率")
+        self.link_probe_button.clicked.connect(lambda: self.refresh_link(force=True))
+        self.auto_link_check = QCheckBox("选择设备时自动填写")
+        self.auto_link_check.setToolTip("使用该设备 (及连接方式) 的测速缓存，没有或已过期时在后台重新测速")
+        self.auto_link_check.toggled.connect(lambda checked: checked and self.refresh_link())
+        link_layout.addWidget(self.link_probe_button)
+        link_layout.addWidget(self.auto_link_check)
         basic_layout.addRow("最大尺寸 (-m):", self.max_size_input)
         basic_layout.addRow("视频码率 (-b):", self.bitrate_input)
         basic_layout.addRow("最大帧率:", self.max_fps_input)
+        basic_layout.addRow(link_layout)
         basic_layout.addRow(self.print_fps_check)
 
         # --- 分组2: 编码与显示器 ---
         encoder_group = QGroupBox("编码与显示器")
         encoder_layout = QFormLayout(encoder_group)
         self.video_codec_combo = QComboBox()
-        self.video_codec_combo.addItems(["h264 (默认)", "h265", "av1"])
-        self.video_encoder_input = QLineEdit()
-        self.video_encoder_input.setPlaceholderText("手动指定编码器名称")
-        self.display_id_input = QLineEdit()
-        self.display_id_input.setPlaceholderText("例如: 1 (可通过下方按钮列出)")
+        self.video_codec_combo.addItems(self._codec_labels(DEFAULT_CODECS))
+        self.video_codec_combo.currentTextChanged.connect(self.update_encoder_items)
+        # 只有用户亲手选择 (activated 不会被程序设置触发) 才算手动指定，之后不再用测试结果覆盖
+        self.codec_chosen = False
+        self.video_codec_combo.activated.connect(lambda *_: setattr(self, 'codec_chosen', True))
+        # 编码器与显示器可从设备查询结果中选择，也可以手动输入
+        self.video_encoder_combo = QComboBox()
+        self.video_encoder_combo.setEditable(True)
+        self.video_encoder_combo.lineEdit().setPlaceholderText("自动 (可手动指定编码器名称)")
+        self.display_id_combo = QComboBox()
+        self.display_id_combo.setEditable(True)
+        self.display_id_combo.lineEdit().setPlaceholderText("例如: 1 (可通过下方按钮列出)")
 
         list_buttons_layout = QHBoxLayout()
         self.list_encoders_button = QPushButton("列出编码器")
         self.list_displays_button = QPushButton("列出显示器")
         list_buttons_layout.addWidget(self.list_encoders_button)
         list_buttons_layout.addWidget(self.list_displays_button)
-        self.list_encoders_button.clicked.connect(lambda: self.run_list_command("--list-encoders"))
-        self.list_displays_button.clicked.connect(lambda: self.run_list_command("--list-displays"))
+        self.list_encoders_button.clicked.connect(lambda: self.refresh_media(force='encoders'))
+        self.list_displays_button.clicked.connect(lambda: self.refresh_media(force='displays'))
+
+        # 逐个试跑编码格式 / 编码器组合，找出该设备上帧率最高的一个，之后选择该设备时默认使用
+        self.benchmark_button = QPushButton("测试最快的编码器")
+        self.benchmark_button.setToolTip(f"对每个组合以无界面模式运行 scrcpy 约 {TRIAL_SECONDS} 秒并统计帧率 "
+                                         "(使用上方的最大尺寸)，结果按设备保存")
+        self.benchmark_button.clicked.connect(self.toggle_encoder_benchmark)
+        list_buttons_layout.addWidget(self.benchmark_button)
 
         encoder_layout.addRow("视频编码器:", self.video_codec_combo)
-        encoder_layout.addRow("指定编码器名称:", self.video_encoder_input)
-        encoder_layout.addRow("指定显示器ID:", self.display_id_input)
+        encoder_layout.addRow("指定编码器名称:", self.video_encoder_combo)
+        encoder_layout.addRow("指定显示器ID:", self.display_id_combo)
         encoder_layout.addRow(list_buttons_layout)
 
         # --- 分组3: 方向、裁剪与缓冲 ---
@@ -86,22 +120,268 @@ class VideoPanel(QWidget):
         self.setLayout(main_layout)
 
         self.log_emitter = None
+        self.device_provider = None
+
+        # 编码器 / 显示器信息按设备缓存，再次打开本页时直接填充，过期后才在后台重新查询
+        cache_dir = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.CacheLocation)
+        media_cache_dir = os.path.join(cache_dir, 'scrcpy-gui-cache')
+        os.makedirs(media_cache_dir, exist_ok=True)
+        self.media_cache = shared_media_cache(os.path.join(media_cache_dir, 'media_cache.json'))
+        self.media_serial = None
+        self.media_task = None
+        self.media_log_request = None
+
+        self.link_cache = LinkProbeCache(os.path.join(media_cache_dir, 'link_cache.json'))
+        self.link_cache.load()
+        self.link_task = None
+
+        self.worker = AdbWorker()
+        self.worker.task_done_signal.connect(self.on_media_task_done)
+        self.worker.task_done_signal.connect(self.on_link_task_done)
+        self.worker.task_done_signal.connect(self.on_benchmark_done)
+        self.worker.command_finished_signal.connect(self.log)
+        self.benchmark_task = None
 
     def set_log_emitter(self, log_emitter):
         self.log_emitter = log_emitter
 
-    def run_list_command(self, command):
-        """运行列出信息的命令，并将结果打印到日志"""
-        if not self.log_emitter: return
-        self.log_emitter(f"\n--- 正在执行 scrcpy {command} ---")
+    def log(self, message):
+        if self.log_emitter: self.log_emitter(message)
+
+    def set_device_provider(self, device_provider):
+        """device_provider() 返回当前选中设备的序列号 (可能为空)"""
+        self.device_provider = device_provider
+
+    def on_device_changed(self, serial):
+        if self.auto_link_check.isChecked(): self.refresh_link()
+        # 不在当前标签页时，等下次显示再刷新
+        if self.isVisible(): self.refresh_media()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh_media()
+
+    def refresh_media(self, force=None):
+        """
+        显示当前设备的编码器与显示器 (先用缓存填充)，并在后台查询已过期的部分。
+        force 为 'encoders' / 'displays' 时无论是否过期都重新查询该项，完成后把结果打印到日志。
+        """
+        serial = self.device_provider() if self.device_provider else None
+        if not serial:
+            if force and self.log_emitter: self.log_emitter("错误：请先在设备列表中选择一个设备！")
+            return
+        if serial != self.media_serial:
+            self.show_media(serial)
+        stale = set(self.media_cache.stale_kinds(serial, MEDIA_KINDS))
+        if force:
+            stale.add(force)
+            self.media_log_request = (serial, force)
+            if self.log_emitter:
+                self.log_emitter(f"\n--- 正在查询 {serial} 的{'编码器' if force == 'encoders' else '显示器'} ---")
+        if not stale:
+            if force: self.log_media(serial, force)
+            return
+        entry = self.media_cache.get(serial)
+        fresh = tuple(kind for kind in MEDIA_KINDS if kind not in stale)
+        self.media_task = self.worker.submit('probe_media', serial, MEDIA_KINDS, entry and entry.get('fingerprint'),
+                                             fresh, device=serial, priority=PRIORITY_NORMAL, coalesce=True)
+        self.list_encoders_button.setEnabled(False)
+        self.list_displays_button.setEnabled(False)
+
+    def on_media_task_done(self, task):
+        if task is not self.media_task:
+            return
+        self.media_task = None
+        self.list_encoders_button.setEnabled(True)
+        self.list_displays_button.setEnabled(True)
+        serial = task.args[0]
+        request, self.media_log_request = self.media_log_request, None
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            if self.log_emitter: self.log_emitter(f"查询 {serial} 的编码器/显示器失败: {task.exception()}")
+            return
+        fingerprint, results = task.result()
+        self.media_cache.update(serial, fingerprint, results)
+        try:
+            self.media_cache.save()
+        except IOError:
+            if self.log_emitter: self.log_emitter("警告：无法写入编码器/显示器缓存文件。")
+        current = self.device_provider() if self.device_provider else None
+        if serial == current:
+            self.show_media(serial)
+        if request and request[0] == serial:
+            self.log_media(serial, request[1])
+
+    def refresh_link(self, force=False):
+        """按当前设备的链路测速结果填写尺寸、码率与帧率；没有有效缓存或 force 为 True 时先在后台测速"""
+        serial = self.device_provider() if self.device_provider else None
+        if not serial:
+            if force and self.log_emitter: self.log_emitter("错误：请先在设备列表中选择一个设备！")
+            return
+        if not force and (measurement := self.link_cache.get(serial)):
+            self.apply_link(serial, measurement)
+            return
+        if self.link_task and not self.link_task.done():
+            return
+        if self.log_emitter:
+            self.log_emitter(f"正在测量到 {serial} 的链路 ({'无线' if connection_type(serial) == 'tcp' else 'USB'})...")
+        self.link_task = self.worker.submit('probe_link', serial, device=serial, priority=PRIORITY_NORMAL)
+        self.link_probe_button.setEnabled(False)
+
+    def on_link_task_done(self, task):
+        if task is not self.link_task:
+            return
+        self.link_task = None
+        self.link_probe_button.setEnabled(True)
+        serial = task.args[0]
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            if self.log_emitter: self.log_emitter(f"链路测速失败: {task.exception()}")
+            return
+        measurement = self.link_cache.put(serial, task.result())
         try:
-            cmd = ['scrcpy', command]
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=10,
-                                    encoding='utf-8', errors='replace')
-            output = (result.stdout + "\n" + result.stderr).strip()
-            self.log_emitter(output or "命令执行完毕，无输出。")
-        except Exception as e:
-            self.log_emitter(f"执行命令时出错: {e}")
+            self.link_cache.save()
+        except IOError:
+            if self.log_emitter: self.log_emitter("警告：无法写入链路测速缓存文件。")
+        if serial == (self.device_provider() if self.device_provider else None):
+            self.apply_link(serial, measurement)
+
+    def apply_link(self, serial, measurement):
+        displays = (self.media_cache.get(serial) or {}).get('displays') or []
+        main_display = next((display for display in displays if display['id'] == 0 and display['width']), None)
+        display_size = (main_display['width'], main_display['height']) if main_display else None
+        settings = recommend_video_settings(measurement, display_size)
+        self.max_size_input.setText(str(settings['max_size']) if settings['max_size'] else "")
+        self.bitrate_input.setText(settings['video_bit_rate'])
+        self.max_fps_input.setText(str(settings['max_fps']))
+        if self.log_emitter:
+            self.log_emitter(f"{serial} 链路: 延迟 {measurement['rtt_ms']:.1f} ms，吞吐 {measurement['throughput_bps'] / 1e6:.1f} Mbit/s"
+                             f" -> 码率 {settings['video_bit_rate']}，最大尺寸 {settings['max_size'] or '不限'}，"
+                             f"最大帧率 {settings['max_fps']}")
+
+    def toggle_encoder_benchmark(self):
+        if self.benchmark_task:
+            self.benchmark_task.cancel()
+            return
+        serial = self.device_provider() if self.device_provider else None
+        if not serial:
+            self.log("错误：请先在设备列表中选择一个设备！")
+            return
+        encoders = (self.media_cache.get(serial) or {}).get('encoders') or []
+        candidates = benchmark_candidates(encoders)
+        max_size = self.max_size_input.text().strip()
+        max_size = int(max_size) if max_size.isdigit() else None
+        self.log(f"\n--- 开始测试 {serial} 的 {len(candidates)} 个编码组合 (最大尺寸 {max_size or '不限'})，"
+                 f"约需 {len(candidates) * (TRIAL_SECONDS + 2)} 秒 ---")
+        self.benchmark_task = self.worker.submit('benchmark_encoders', serial, candidates, max_size,
+                                                 device=serial, priority=PRIORITY_NORMAL)
+        self.benchmark_button.setText("停止测试")
+
+    def on_benchmark_done(self, task):
+        if task is not self.benchmark_task:
+            return
+        self.benchmark_task = None
+        self.benchmark_button.setText("测试最快的编码器")
+        serial = task.args[0]
+        if task.cancelled():
+            self.log("编码器测试已停止。")
+            return
+        if task.exception() is not None:
+            self.log(f"编码器测试失败: {task.exception()}")
+            return
+        fingerprint, ranking = task.result()
+        self.media_cache.update(serial, fingerprint, {'encoder_ranking': ranking})
+        try:
+            self.media_cache.save()
+        except IOError:
+            self.log("警告：无法写入编码器缓存文件。")
+        lines = [f"  {index}. {candidate_label(result):<32} "
+                 + (f"{result['fps']:g} fps (最低 {result['min_fps']})" if result['error'] is None
+                    else f"失败: {result['error']}")
+                 for index, result in enumerate(ranking, 1)]
+        self.log(f"{serial} 编码器测试结果:\n" + "\n".join(lines))
+        if serial != (self.device_provider() if self.device_provider else None):
+            return
+        if not self.codec_chosen:
+            self.apply_fastest_encoder(serial)
+        elif ranking and ranking[0]['error'] is None:
+            self.log(f"已保留手动选择的编码格式，如需使用测试最快的 {candidate_label(ranking[0])} 请手动选择。")
+
+    def apply_fastest_encoder(self, serial):
+        """
+        选中该设备测试结果中最快的编码格式与编码器；没有成功的测试结果，或用户已手动选择过编码格式时不做改动
+        """
+        ranking = (self.media_cache.get(serial) or {}).get('encoder_ranking') or []
+        if self.codec_chosen or not ranking or ranking[0]['error'] is not None:
+            return False
+        winner = ranking[0]
+        codecs = [self.video_codec_combo.itemText(i).split(' ')[0] for i in range(self.video_codec_combo.count())]
+        if winner['codec'] not in codecs:
+            return False
+        self.video_codec_combo.setCurrentIndex(codecs.index(winner['codec']))
+        self.update_encoder_items()
+        self.video_encoder_combo.setEditText(winner['encoder'] or "")
+        self.log(f"{serial} 默认使用测试最快的编码器: {candidate_label(winner)} ({winner['fps']:g} fps)")
+        return True
+
+    def log_media(self, serial, kind):
+        if not self.log_emitter: return
+        entry = self.media_cache.get(serial) or {}
+        if kind == 'encoders':
+            encoders = entry.get('encoders') or []
+            lines = [f"  [{encoder['type']}] {encoder['codec']:<5} {encoder['name']}"
+                     f"{' (' + encoder['mode'] + ')' if encoder['mode'] else ''}"
+                     f"{' -> ' + encoder['alias'] if encoder['alias'] else ''}" for encoder in encoders]
+            self.log_emitter(f"{serial} 共 {len(encoders)} 个编码器:\n" + "\n".join(lines))
+        else:
+            displays = entry.get('displays') or []
+            lines = [f"  --display-id={display['id']}  {self._display_size(display)}" for display in displays]
+            self.log_emitter(f"{serial} 共 {len(displays)} 个显示器:\n" + "\n".join(lines))
+
+    def show_media(self, serial):
+        """用缓存中该设备的信息填充编码格式、编码器与显示器下拉框，保留用户当前的选择"""
+        self.media_serial = serial
+        entry = self.media_cache.get(serial) or {}
+        encoders = [encoder for encoder in entry.get('encoders') or [] if encoder['type'] == 'video']
+        codecs = list(dict.fromkeys(encoder['codec'] for encoder in encoders)) or DEFAULT_CODECS
+        current_codec = self.video_codec_combo.currentText().split(' ')[0]
+        self.video_codec_combo.blockSignals(True)
+        self.video_codec_combo.clear()
+        self.video_codec_combo.addItems(self._codec_labels(codecs))
+        self.video_codec_combo.setCurrentIndex(codecs.index(current_codec) if current_codec in codecs else 0)
+        self.video_codec_combo.blockSignals(False)
+        self.update_encoder_items()
+
+        self._set_items(self.display_id_combo,
+                        [f"{display['id']} {self._display_size(display)}".strip() for display in entry.get('displays') or []])
+        # 没有手动指定编码格式与编码器时，默认使用该设备测试最快的组合
+        if not self.video_encoder_combo.currentText().strip(): self.apply_fastest_encoder(serial)
+
+    def update_encoder_items(self, *_):
+        entry = self.media_cache.get(self.media_serial) or {}
+        codec = self.video_codec_combo.currentText().split(' ')[0]
+        self._set_items(self.video_encoder_combo,
+                        [f"{encoder['name']}{' (' + encoder['mode'] + ')' if encoder['mode'] else ''}"
+                         for encoder in entry.get('encoders') or []
+                         if encoder['type'] == 'video' and encoder['codec'] == codec and not encoder['alias']])
+
+    @staticmethod
+    def _set_items(combo, items):
+        text = combo.currentText()
+        combo.clear()
+        combo.addItems([""] + items)
+        combo.setCurrentIndex(-1)
+        combo.setEditText(text)
+
+    @staticmethod
+    def _codec_labels(codecs):
+        return [f"{codec} (默认)" if codec == "h264" else codec for codec in codecs]
+
+    @staticmethod
+    def _display_size(display):
+        return f"({display['width']}x{display['height']})" if display['width'] else ""
 
     def get_args(self):
         """获取该面板对应的 scrcpy 命令行参数"""
@@ -119,9 +399,9 @@ class VideoPanel(QWidget):
         codec = self.video_codec_combo.currentText().split(' ')[0]
         if codec != "h264":  # h264是默认值
             args.extend(['--video-codec', codec])
-        if val := self.video_encoder_input.text().strip():
+        if val := self.video_encoder_combo.currentText().strip().split(' ')[0]:
             args.extend(['--video-encoder', val])
-        if val := self.display_id_input.text().strip():
+        if val := self.display_id_combo.currentText().strip().split(' ')[0]:
             args.extend(['--display-id', val])
 
         orientation = self.orientation_combo.currentText()
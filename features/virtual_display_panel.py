@@ -1,9 +1,28 @@
-import json
 import os
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QFormLayout, QLineEdit,
                              QComboBox, QCheckBox, QGroupBox, QPushButton, QHBoxLayout, QCompleter, QLabel)
-from PyQt6.QtCore import QThread, Qt, QStandardPaths
+from PyQt6.QtCore import QObject, QThread, Qt, QStandardPaths, pyqtSignal
+from core.adb_executor import PRIORITY_NORMAL
 from core.command_runner import AdbWorker
+from core.app_cache import AppListCache
+from features.app_search_model import AppSearchModel
+
+
+class AppCacheLoader(QObject):
+    """在后台线程中读取并解析应用列表缓存文件，避免阻塞界面"""
+    loaded_signal = pyqtSignal(object)
+
+    def __init__(self, cache_file):
+        super().__init__()
+        self.cache_file = cache_file
+
+    def run(self):
+        cache = AppListCache(self.cache_file)
+        try:
+            cache.load()
+        except (ValueError, IOError):
+            cache = None
+        self.loaded_signal.emit(cache)
 
 
 class VirtualDisplayPanel(QWidget):
@@ -15,11 +34,12 @@ class VirtualDisplayPanel(QWidget):
     def __init__(self):
         super().__init__()
 
-        # 定义缓存文件路径
+        # 定义缓存文件路径 (按设备序列号分别缓存)
         cache_dir = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.CacheLocation)
         app_cache_dir = os.path.join(cache_dir, 'scrcpy-gui-cache')
         os.makedirs(app_cache_dir, exist_ok=True)
-        self.cache_file = os.path.join(app_cache_dir, 'app_list.json')
+        self.cache_file = os.path.join(app_cache_dir, 'app_cache.json')
+        self.app_cache = AppListCache(self.cache_file)
 
         # 统一的 UI 初始化
         self.initUI()
@@ -27,10 +47,18 @@ class VirtualDisplayPanel(QWidget):
         self.toggle_options(False)
         self.log_emitter = None
         self.full_app_list_data = []
-        self.thread = None
-        self.worker = None
-
-        # 程序启动时，尝试从缓存加载
+        # adb 操作提交到共享执行器；一次只保留一个同步任务，新的同步会取消尚未完成的旧任务
+        self.worker = AdbWorker()
+        self.worker.command_finished_signal.connect(self.on_worker_log)
+        self.worker.packages_synced_signal.connect(self.on_packages_synced)
+        self.worker.task_done_signal.connect(self.on_task_done)
+        self.sync_task = None
+        self.device_provider = None
+        self.current_serial = None
+        self.cache_thread = None
+        self.cache_loader = None
+
+        # 面板创建后在后台读取缓存
         self.load_app_list_from_cache()
 
     def initUI(self):
@@ -60,11 +88,17 @@ class VirtualDisplayPanel(QWidget):
         self.start_app_combo.setEditable(True)
         self.start_app_combo.setPlaceholderText("输入应用名或包名进行筛选...")
         self.start_app_combo.lineEdit().setClearButtonEnabled(True)
-
-        self.completer = QCompleter(self)
-        self.completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
-        self.completer.setFilterMode(Qt.MatchFlag.MatchContains)
-        self.start_app_combo.setCompleter(self.completer)
+        # 下拉列表展示全部应用；输入时的补全由索引模型排序筛选，QCompleter 只负责弹出显示
+        self.all_apps_model = AppSearchModel(limit=None, parent=self)
+        self.start_app_combo.setModel(self.all_apps_model)
+        self.start_app_combo.setInsertPolicy(QComboBox.InsertPolicy.NoInsert)
+
+        self.app_search_model = AppSearchModel(parent=self)
+        self.completer = QCompleter(self.app_search_model, self)
+        self.completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        self.completer.setMaxVisibleItems(15)
+        self.start_app_combo.lineEdit().setCompleter(self.completer)
+        self.start_app_combo.lineEdit().textEdited.connect(self.on_app_search_edited)
 
         self.get_apps_button = QPushButton("获取应用列表")
         self.get_apps_button.clicked.connect(self.fetch_app_list)
@@ -108,66 +142,108 @@ class VirtualDisplayPanel(QWidget):
     def set_log_emitter(self, log_emitter):
         self.log_emitter = log_emitter
 
+    def set_device_provider(self, device_provider):
+        """device_provider() 返回当前选中设备的序列号 (可能为空)"""
+        self.device_provider = device_provider
+
     def load_app_list_from_cache(self):
-        if os.path.exists(self.cache_file):
-            try:
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    cached_data = json.load(f)
-                if cached_data:
-                    self.populate_app_list(cached_data, from_cache=True)
-                    if self.log_emitter:
-                        self.log_emitter(f"已从缓存加载 {len(cached_data)} 个应用。")
-            except (json.JSONDecodeError, IOError):
-                if self.log_emitter:
-                    self.log_emitter("缓存文件已损坏，请重新获取。")
-
-    def run_adb_task(self, command_name, log_message):
+        self.cache_thread = QThread()
+        self.cache_loader = AppCacheLoader(self.cache_file)
+        self.cache_loader.moveToThread(self.cache_thread)
+        self.cache_loader.loaded_signal.connect(self.on_cache_loaded)
+        self.cache_thread.started.connect(self.cache_loader.run)
+        self.cache_thread.finished.connect(self.cache_thread.deleteLater)
+        self.cache_thread.finished.connect(self.cache_loader.deleteLater)
+        self.cache_thread.start()
+
+    def on_cache_loaded(self, cache):
+        self.cache_thread.quit()
+        self.cache_thread.wait()
+        self.cache_thread = None
+        if cache is None:
+            if self.log_emitter:
+                self.log_emitter("缓存文件已损坏，请重新获取。")
+            return
+        # 读取期间可能已经完成了一次同步，以内存中较新的数据为准
+        for serial, entry in cache.devices.items():
+            self.app_cache.devices.setdefault(serial, entry)
+        self.show_device_apps(self.device_provider() if self.device_provider else None)
+
+    def on_device_changed(self, serial):
+        self.show_device_apps(serial)
+
+    def show_device_apps(self, serial):
+        """切换到指定设备的应用列表 (来自缓存)"""
+        self.current_serial = serial or None
+        cached_data = self.app_cache.apps(self.current_serial)
+        self.populate_app_list(cached_data, from_cache=True)
+        self.get_apps_button.setText("刷新列表" if cached_data else "获取应用列表")
+        if cached_data and self.log_emitter:
+            self.log_emitter(f"已从缓存加载 {self.current_serial} 的 {len(cached_data)} 个应用。")
+
+    def run_adb_task(self, command_name, log_message, *args):
         if self.log_emitter: self.log_emitter(log_message)
         self.get_apps_button.setEnabled(False)
         self.get_apps_button.setText("获取中...")
 
-        self.thread = QThread()
-        self.worker = AdbWorker()
-        self.worker.moveToThread(self.thread)
-        self.worker.command_finished_signal.connect(self.log_emitter)
-
-        if command_name == 'list_packages_with_names':
-            self.worker.packages_listed_signal.connect(self.populate_app_list)
+        if self.sync_task and not self.sync_task.done():
+            self.sync_task.cancel()
+        self.sync_task = self.worker.submit(command_name, *args, device=args[0] if args else None,
+                                            priority=PRIORITY_NORMAL)
 
-        self.thread.started.connect(getattr(self.worker, command_name))
-        self.thread.finished.connect(self.thread.deleteLater)
-        self.thread.finished.connect(self.worker.deleteLater)
-        self.thread.finished.connect(lambda: self.get_apps_button.setEnabled(True))
+    def on_worker_log(self, message):
+        if self.log_emitter: self.log_emitter(message)
 
-        self.thread.start()
+    def on_task_done(self, task):
+        if task is not self.sync_task:
+            return
+        self.sync_task = None
+        self.get_apps_button.setEnabled(True)
+        if task.cancelled() or task.exception() is not None:
+            if task.exception() is not None and self.log_emitter:
+                self.log_emitter(f"获取应用列表失败: {task.exception()}")
+            self.get_apps_button.setText("刷新列表" if self.full_app_list_data else "获取应用列表")
 
     def fetch_app_list(self):
-        self.run_adb_task('list_packages_with_names', "正在后台获取应用列表 (首次加载可能需要数分钟)...")
+        serial = self.device_provider() if self.device_provider else None
+        if not serial:
+            if self.log_emitter: self.log_emitter("错误：请先在设备列表中选择一个设备！")
+            return
+        self.current_serial = serial
+        self.run_adb_task('list_packages_incremental', f"正在后台同步 {serial} 的应用列表...",
+                          serial, self.app_cache.fingerprints(serial))
+
+    def on_packages_synced(self, serial, listing, labels):
+        if listing is None:
+            self.get_apps_button.setText("刷新列表" if self.full_app_list_data else "获取应用列表")
+            return
+        added, changed, removed = self.app_cache.apply_sync(serial, listing, labels)
+        try:
+            self.app_cache.save()
+            if self.log_emitter:
+                self.log_emitter(f"应用列表已同步: 新增 {added}，更新 {changed}，移除 {removed}。")
+        except IOError:
+            if self.log_emitter:
+                self.log_emitter("警告：无法写入应用列表缓存文件。")
+        if serial == self.current_serial:
+            self.populate_app_list(self.app_cache.apps(serial))
 
     def populate_app_list(self, app_list_data, from_cache=False):
         self.full_app_list_data = app_list_data
-        display_list = [f"{app['name']} ({app['package']})" for app in app_list_data]
 
         current_text = self.start_app_combo.currentText()
-        self.start_app_combo.clear()
-        self.start_app_combo.addItems(display_list)
+        self.all_apps_model.set_apps(app_list_data)
+        self.app_search_model.set_apps(app_list_data)
+        self.start_app_combo.setCurrentIndex(-1)
         self.start_app_combo.lineEdit().setText(current_text)
-        self.completer.setModel(self.start_app_combo.model())
 
         if not from_cache:
-            try:
-                with open(self.cache_file, 'w', encoding='utf-8') as f:
-                    json.dump(app_list_data, f, ensure_ascii=False, indent=2)
-                if self.log_emitter:
-                    self.log_emitter("应用列表已成功缓存到本地。")
-            except IOError:
-                if self.log_emitter:
-                    self.log_emitter("警告：无法写入应用列表缓存文件。")
-
-        self.get_apps_button.setText("刷新列表")
-
-        if not from_cache and self.thread:
-            self.thread.quit()
+            self.get_apps_button.setText("刷新列表")
+
+    def on_app_search_edited(self, text):
+        self.app_search_model.set_query(text)
+        if text.strip():
+            self.completer.complete()
 
     def on_no_decorations_toggled(self, checked):
         if checked:
@@ -1,34 +1,52 @@
+import os
 import sys
+# 启动追踪需在其他模块导入之前启用 (设置 RIX_STARTUP_TRACE=<文件路径> 时生效)
+from core.startup_trace import tracer
+tracer.install_from_env()
+
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-                             QPushButton, QTextEdit, QTabWidget, QLabel, QGroupBox, QScrollArea,
-                             QRadioButton, QSplitter, QStyleFactory)
-from PyQt6.QtCore import QThread, Qt
-from PyQt6.QtGui import QIcon
+                             QPushButton, QTabWidget, QLabel, QGroupBox,
+                             QRadioButton, QSplitter, QStyleFactory, QSpinBox, QDoubleSpinBox, QCheckBox)
+from PyQt6.QtCore import QTimer, Qt, pyqtSignal, QStandardPaths, QUrl
+from PyQt6.QtGui import QIcon, QDesktopServices
 
 # -----------------------------------------------------------------------------
 # 导入所有核心与功能模块
 # -----------------------------------------------------------------------------
+from core.adb_executor import default_executor
+from core.log_archive import LogArchive, APP_CHANNEL
+from core.process_registry import registry
 from core.session_manager import SessionManager
+from core.session_watchdog import RestartPolicy
 from features.device_panel import DevicePanel
-from features.audio_panel import AudioPanel
-from features.video_panel import VideoPanel
-from features.camera_panel import CameraPanel
-from features.keyboard_panel import KeyboardPanel
-from features.mouse_panel import MousePanel
-from features.gamepad_panel import GamepadPanel
-from features.recording_panel import RecordingPanel
-from features.control_panel import ControlPanel
-from features.window_panel import WindowPanel
-from features.shortcuts_panel import ShortcutsPanel
-from features.virtual_display_panel import VirtualDisplayPanel
-from features.v4l2_panel import V4l2Panel
-from features.developer_panel import DeveloperPanel
+from features.lazy_panel import LazyPanel
+from features.log_console import LogConsole, LogFilterBar
+from features.session_table import SessionTable
+
+# (属性名, 标签页标题, 模块, 类名)，按标签页顺序排列
+TAB_PANELS = [
+    ('audio_panel', "音频", 'features.audio_panel', 'AudioPanel'),
+    ('video_panel', "视频", 'features.video_panel', 'VideoPanel'),
+    ('camera_panel', "摄像头", 'features.camera_panel', 'CameraPanel'),
+    ('recording_panel', "录制", 'features.recording_panel', 'RecordingPanel'),
+    ('control_panel', "控制", 'features.control_panel', 'ControlPanel'),
+    ('keyboard_panel', "键盘", 'features.keyboard_panel', 'KeyboardPanel'),
+    ('mouse_panel', "鼠标", 'features.mouse_panel', 'MousePanel'),
+    ('gamepad_panel', "游戏手柄", 'features.gamepad_panel', 'GamepadPanel'),
+    ('window_panel', "窗口", 'features.window_panel', 'WindowPanel'),
+    ('shortcuts_panel', "快捷键", 'features.shortcuts_panel', 'ShortcutsPanel'),
+    ('virtual_display_panel', "虚拟显示", 'features.virtual_display_panel', 'VirtualDisplayPanel'),
+    ('v4l2_panel', "V4L2", 'features.v4l2_panel', 'V4l2Panel'),
+    ('developer_panel', "开发者", 'features.developer_panel', 'DeveloperPanel'),
+]
 
 
 class ScrcpyMainMenu(QMainWindow):
     """
     Scrcpy 控制中心主窗口 (UI 优化最终版)。
     """
+    # 窗口第一次绘制完成后发出，此后才执行设备扫描等非必需的启动工作
+    first_painted = pyqtSignal()
 
     def __init__(self):
         super().__init__()
@@ -36,10 +54,20 @@ class ScrcpyMainMenu(QMainWindow):
         self.setGeometry(200, 200, 700, 800)
         self.setWindowIcon(QIcon('RIXHC.ico'))
 
-        self.session_manager = SessionManager()
-        self.initUI()
+        with tracer.span('SessionManager'):
+            self.session_manager = SessionManager()
+            # 所有日志另行压缩归档，退出后仍可排查；目录创建与清理都在归档线程中进行
+            cache_dir = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.CacheLocation)
+            self.log_archive = LogArchive(os.path.join(cache_dir, 'scrcpy-gui-cache', 'logs'))
+            self.session_manager.set_archive(self.log_archive)
+        with tracer.span('initUI'):
+            self.initUI()
         self.connect_manager_signals()
-        self.device_panel.refresh_devices()
+        self._first_paint_done = False
+        self.first_painted.connect(self.device_panel.refresh_devices)
+        self.first_painted.connect(self.session_manager.prefetch_capabilities)
+        if tracer.enabled:
+            self.device_panel.devices_refreshed.connect(self.on_first_device_refresh)
 
     def initUI(self):
         central_widget = QWidget()
@@ -54,9 +82,11 @@ class ScrcpyMainMenu(QMainWindow):
         left_layout = QVBoxLayout(left_widget)
         left_layout.setContentsMargins(0, 0, 0, 0)
 
-        self.device_panel = self._create_device_panel()
+        with tracer.span('DevicePanel', 'panel'):
+            self.device_panel = self._create_device_panel()
         self.source_group = self._create_source_panel()
-        self.tab_widget = self._create_tabs_panel()
+        with tracer.span('_create_tabs_panel'):
+            self.tab_widget = self._create_tabs_panel()
 
         left_layout.addWidget(self.device_panel)
         left_layout.addWidget(self.source_group)
@@ -68,7 +98,8 @@ class ScrcpyMainMenu(QMainWindow):
 
         right_splitter = QSplitter(Qt.Orientation.Vertical)
         self.session_group = self._create_session_panel()
-        self.log_group = self._create_log_panel()
+        with tracer.span('LogConsole', 'panel'):
+            self.log_group = self._create_log_panel()
 
         right_splitter.addWidget(self.session_group)
         right_splitter.addWidget(self.log_group)
@@ -104,37 +135,11 @@ class ScrcpyMainMenu(QMainWindow):
 
     def _create_tabs_panel(self):
         tabs = QTabWidget()
-        self.audio_panel = AudioPanel()
-        self.video_panel = VideoPanel()
-        self.camera_panel = CameraPanel()
-        self.camera_panel.set_log_emitter(self.log)
-        self.keyboard_panel = KeyboardPanel()
-        self.mouse_panel = MousePanel()
-        self.gamepad_panel = GamepadPanel()
-        self.recording_panel = RecordingPanel()
-        self.control_panel = ControlPanel()
-        self.window_panel = WindowPanel()
-        self.shortcuts_panel = ShortcutsPanel()
-        self.virtual_display_panel = VirtualDisplayPanel()
-        self.virtual_display_panel.set_log_emitter(self.log)
-        self.v4l2_panel = V4l2Panel()
-        self.v4l2_panel.set_log_emitter(self.log)
-        self.developer_panel = DeveloperPanel()
-        self.developer_panel.set_log_emitter(self.log)
-
-        tabs.addTab(self.audio_panel, "音频")
-        tabs.addTab(self.video_panel, "视频")
-        tabs.addTab(self.camera_panel, "摄像头")
-        tabs.addTab(self.recording_panel, "录制")
-        tabs.addTab(self.control_panel, "控制")
-        tabs.addTab(self.keyboard_panel, "键盘")
-        tabs.addTab(self.mouse_panel, "鼠标")
-        tabs.addTab(self.gamepad_panel, "游戏手柄")
-        tabs.addTab(self.window_panel, "窗口")
-        tabs.addTab(self.shortcuts_panel, "快捷键")
-        tabs.addTab(self.virtual_display_panel, "虚拟显示")
-        tabs.addTab(self.v4l2_panel, "V4L2")
-        tabs.addTab(self.developer_panel, "开发者")
+        # 各功能面板在第一次切换到对应标签页时才导入并创建，缩短启动时间
+        for attr, title, module_name, class_name in TAB_PANELS:
+            panel = LazyPanel(module_name, class_name, setup=self._setup_panel)
+            setattr(self, attr, panel)
+            tabs.addTab(panel, title)
 
         if not sys.platform.startswith('linux'):
             v4l2_index = tabs.indexOf(self.v4l2_panel)
@@ -143,26 +148,51 @@ class ScrcpyMainMenu(QMainWindow):
 
         return tabs
 
+    def _setup_panel(self, panel):
+        """面板被真正创建时调用"""
+        if hasattr(panel, 'set_log_emitter'):
+            panel.set_log_emitter(self.log)
+        if hasattr(panel, 'set_device_provider'):
+            panel.set_device_provider(self.device_panel.current_serial)
+        if hasattr(panel, 'on_device_changed'):
+            self.device_panel.device_combo.currentTextChanged.connect(panel.on_device_changed)
+
     def _create_session_panel(self):
         group = QGroupBox("活动会话")
         layout = QVBoxLayout(group)
-        self.session_list_layout = QVBoxLayout()
-        self.session_list_layout.setContentsMargins(5, 5, 5, 5)
-        self.session_list_layout.setSpacing(5)
-        self.session_list_layout.addStretch()
-        self.session_list_widget = QWidget()
-        self.session_list_widget.setLayout(self.session_list_layout)
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setWidget(self.session_list_widget)
-        layout.addWidget(scroll_area)
+        self.session_table = SessionTable(self.session_manager)
+        layout.addWidget(self.session_table)
         return group
 
     def _create_log_panel(self):
         group = QGroupBox("日志输出")
         layout = QVBoxLayout(group)
-        self.log_output = QTextEdit()
-        self.log_output.setReadOnly(True)
+        self.log_output = LogConsole(max_lines=20000)
+        self.log_filter_bar = LogFilterBar(self.log_output)
+
+        options_layout = QHBoxLayout()
+        self.log_max_lines_spin = QSpinBox()
+        self.log_max_lines_spin.setRange(1000, 1000000)
+        self.log_max_lines_spin.setSingleStep(10000)
+        self.log_max_lines_spin.setValue(self.log_output.log_model.max_lines)
+        self.log_max_lines_spin.setToolTip("日志窗口最多显示的行数 (每个会话另外保留最近 10 万行供筛选)")
+        self.log_max_lines_spin.editingFinished.connect(
+            lambda: self.log_output.set_max_lines(self.log_max_lines_spin.value()))
+        clear_log_button = QPushButton("清空")
+        clear_log_button.clicked.connect(self.log_output.clear)
+        archive_button = QPushButton("归档目录")
+        archive = self.log_archive
+        archive_button.setToolTip(f"所有日志按会话压缩保存在 {archive.directory} ({archive.compression})，"
+                                  f"保留 {archive.max_age / 86400:g} 天、最多 {archive.max_total_bytes >> 20} MB")
+        archive_button.clicked.connect(self.open_log_archive)
+        options_layout.addWidget(QLabel("最大行数:"))
+        options_layout.addWidget(self.log_max_lines_spin)
+        options_layout.addStretch()
+        options_layout.addWidget(archive_button)
+        options_layout.addWidget(clear_log_button)
+
+        layout.addWidget(self.log_filter_bar)
+        layout.addLayout(options_layout)
         layout.addWidget(self.log_output)
         return group
 
@@ -175,12 +205,51 @@ class ScrcpyMainMenu(QMainWindow):
         self.start_otg_button.clicked.connect(self.start_otg_session)
         layout.addWidget(self.start_button)
         layout.addWidget(self.start_otg_button)
+
+        self.start_fleet_button = QPushButton("📱 批量启动")
+        self.start_fleet_button.setToolTip("以当前设置在设备面板“批量启动”中勾选的每台设备上启动镜像会话 (默认全部勾选)")
+        self.start_fleet_button.clicked.connect(self.start_fleet_sessions)
+        self.fleet_concurrency_spin = QSpinBox()
+        self.fleet_concurrency_spin.setRange(1, 64)
+        self.fleet_concurrency_spin.setValue(4)
+        self.fleet_concurrency_spin.setToolTip("同时处于启动中的设备数上限")
+        self.fleet_stagger_spin = QDoubleSpinBox()
+        self.fleet_stagger_spin.setRange(0.0, 30.0)
+        self.fleet_stagger_spin.setSingleStep(0.1)
+        self.fleet_stagger_spin.setValue(0.5)
+        self.fleet_stagger_spin.setSuffix(" 秒")
+        self.fleet_stagger_spin.setToolTip("相邻两台设备开始启动的最小间隔")
+        layout.addWidget(self.start_fleet_button)
+        layout.addWidget(QLabel("并发:"))
+        layout.addWidget(self.fleet_concurrency_spin)
+        layout.addWidget(QLabel("间隔:"))
+        layout.addWidget(self.fleet_stagger_spin)
+
+        self.auto_restart_check = QCheckBox("自动重启")
+        self.auto_restart_check.setToolTip("会话意外退出 (如设备断开、scrcpy 崩溃) 或画面卡顿时，等待设备重新连接后自动重启")
+        self.stall_timeout_spin = QSpinBox()
+        self.stall_timeout_spin.setRange(0, 600)
+        self.stall_timeout_spin.setValue(15)
+        self.stall_timeout_spin.setSuffix(" 秒")
+        self.stall_timeout_spin.setSpecialValueText("不检测")
+        self.stall_timeout_spin.setToolTip("超过这么久没有画面帧即视为卡顿并重启")
+        self.stall_timeout_spin.setEnabled(False)
+        self.auto_restart_check.toggled.connect(self.stall_timeout_spin.setEnabled)
+        layout.addWidget(self.auto_restart_check)
+        layout.addWidget(QLabel("卡顿:"))
+        layout.addWidget(self.stall_timeout_spin)
         return group
 
     def connect_manager_signals(self):
         self.session_manager.log_signal.connect(self.log)
-        self.session_manager.session_started.connect(self.add_session_to_ui)
-        self.session_manager.session_stopped.connect(self.remove_session_from_ui)
+        self.session_manager.session_output_signal.connect(self.log_output.append_session_output)
+        self.session_manager.session_started.connect(self.log_filter_bar.add_session)
+        self.session_manager.session_started.connect(self.session_table.add_session)
+        self.session_manager.session_stopped.connect(self.session_table.remove_session)
+        self.session_manager.metrics_updated.connect(self.session_table.mark_dirty)
+        self.session_manager.resources_updated.connect(self.session_table.mark_dirty)
+        self.session_manager.session_restarting.connect(lambda session_id, *_: self.session_table.mark_dirty([session_id]))
+        self.session_manager.session_restarted.connect(lambda session_id: self.session_table.mark_dirty([session_id]))
 
     def on_source_changed(self, is_display_checked):
         is_camera_checked = not is_display_checked
@@ -189,7 +258,8 @@ class ScrcpyMainMenu(QMainWindow):
         self.tab_widget.setTabEnabled(self.tab_widget.indexOf(self.camera_panel), is_camera_checked)
         if is_camera_checked:
             self.audio_panel.audio_source_combo.setCurrentText("mic (麦克风)")
-        else:
+        elif self.audio_panel.is_built:
+            # 未创建的音频面板本来就是默认值，无需为此提前创建
             self.audio_panel.audio_source_combo.setCurrentText("output (内部声音, 默认)")
 
     def start_new_session(self):
@@ -201,7 +271,25 @@ class ScrcpyMainMenu(QMainWindow):
             session_name_hint = "TCP/IP"
         else:
             session_name_hint = device_args[1]
-        cmd_args = list(device_args)
+        cmd_args = list(device_args) + self.get_session_args()
+        self.session_manager.start_session(session_name_hint, cmd_args, is_otg=False,
+                                           restart_policy=self.restart_policy())
+
+    def start_fleet_sessions(self):
+        serials = self.device_panel.fleet_serials()
+        self.session_manager.start_fleet(serials, self.get_session_args(), is_otg=False,
+                                         concurrency=self.fleet_concurrency_spin.value(),
+                                         stagger=self.fleet_stagger_spin.value(),
+                                         restart_policy=self.restart_policy())
+
+    def restart_policy(self):
+        if not self.auto_restart_check.isChecked():
+            return None
+        return RestartPolicy(stall_timeout=self.stall_timeout_spin.value())
+
+    def get_session_args(self):
+        """收集除设备选择外的全部镜像会话参数"""
+        cmd_args = []
         if self.source_camera_radio.isChecked():
             cmd_args.append('--video-source=camera')
             cmd_args.extend(self.camera_panel.get_args())
@@ -220,7 +308,7 @@ class ScrcpyMainMenu(QMainWindow):
         cmd_args.extend(self.gamepad_panel.get_args())
         cmd_args.extend(self.keyboard_panel.get_args())
         cmd_args.extend(self.mouse_panel.get_args())
-        self.session_manager.start_session(session_name_hint, cmd_args, is_otg=False)
+        return cmd_args
 
     def start_otg_session(self):
         device_args = self.device_panel.get_args()
@@ -239,37 +327,41 @@ class ScrcpyMainMenu(QMainWindow):
         gamepad_args = self.gamepad_panel.get_args()
         if '--gamepad=aoa' in gamepad_args: cmd_args.append('--gamepad=aoa')
         self.log("注意：OTG 模式将忽略除设备选择、键鼠手柄之外的所有设置。")
-        self.session_manager.start_session(session_name_hint, cmd_args, is_otg=True)
-
-    def add_session_to_ui(self, session_id: str, device_id_hint: str):
-        widget = QWidget()
-        h_layout = QHBoxLayout(widget)
-        h_layout.setContentsMargins(5, 5, 5, 5)
-        label = QLabel(f"[{session_id}] 设备: {device_id_hint}")
-        stop_btn = QPushButton("停止")
-        stop_btn.setFixedSize(60, 25)
-        stop_btn.clicked.connect(lambda: self.session_manager.stop_session(session_id))
-        h_layout.addWidget(label)
-        h_layout.addStretch()
-        h_layout.addWidget(stop_btn)
-        widget.setObjectName(session_id)
-        self.session_list_layout.insertWidget(self.session_list_layout.count() - 1, widget)
-        self.log(f"UI添加会话显示: {session_id}")
-
-    def remove_session_from_ui(self, session_id: str):
-        widget_to_remove = self.session_list_widget.findChild(QWidget, session_id)
-        if widget_to_remove:
-            self.session_list_layout.removeWidget(widget_to_remove)
-            widget_to_remove.deleteLater()
-            self.log(f"UI移除会话显示: {session_id}")
+        self.session_manager.start_session(session_name_hint, cmd_args, is_otg=True,
+                                           restart_policy=self.restart_policy())
 
     def log(self, message: str):
-        self.log_output.append(message.strip())
-        self.log_output.verticalScrollBar().setValue(self.log_output.verticalScrollBar().maximum())
+        message = message.strip()
+        self.log_output.append(message)
+        self.log_archive.submit(APP_CHANNEL, message.splitlines())
+
+    def open_log_archive(self):
+        os.makedirs(self.log_archive.directory, exist_ok=True)
+        QDesktopServices.openUrl(QUrl.fromLocalFile(self.log_archive.directory))
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._first_paint_done:
+            self._first_paint_done = True
+            tracer.mark('first_paint')
+            # 排队到本次绘制结束之后再执行
+            QTimer.singleShot(0, self.first_painted.emit)
+
+    def on_first_device_refresh(self, devices):
+        self.device_panel.devices_refreshed.disconnect(self.on_first_device_refresh)
+        tracer.mark('first_device_refresh')
+        for line in tracer.finish().splitlines():
+            self.log(line)
 
     def closeEvent(self, event):
         self.log("正在关闭应用程序，清理所有活动会话...")
-        self.session_manager.stop_all_sessions()
+        self.session_manager.shutdown()
+        self.log_archive.close()
+        self.device_panel.shutdown()
+        self.log_output.shutdown()
+        default_executor().shutdown(timeout=2.0)
+        # 兜底：结束仍未退出的 adb / scrcpy 进程树
+        registry.kill_all()
         event.accept()
 
 
@@ -279,6 +371,8 @@ class ScrcpyMainMenu(QMainWindow):
 if __name__ == '__main__':
     app = QApplication(sys.argv)
     app.setStyle(QStyleFactory.create('Fusion'))
-    main_menu = ScrcpyMainMenu()
+    with tracer.span('ScrcpyMainMenu'):
+        main_menu = ScrcpyMainMenu()
     main_menu.show()
+    tracer.mark('window_shown')
     sys.exit(app.exec())
\ No newline at end of file